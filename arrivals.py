@@ -0,0 +1,398 @@
+"""
+Modèles d'arrivée des commandes et de délais de livraison.
+
+Le générateur de commandes (voir orders) demande à son modèle d'arrivée le délai avant la prochaine commande, et
+chaque commande tire son délai de livraison de son modèle de délais. Les modèles tirent leurs nombres du générateur
+aléatoire du jeu : une partie reste entièrement déterminée par son germe (voir replay), et l'état des modèles fait
+partie des instantanés (voir Game.snapshot).
+
+À chaque livraison, la partie multiplie l'accélération du générateur (voir le paramètre order_acceleration de Game);
+les modèles d'arrivée divisent leurs délais par cette accélération, plafonnée par leur paramètre cap s'il est donné
+(sans plafond, l'arrivée des commandes s'accélère sans fin dans une longue partie).
+
+Un modèle se décrit par une spécification texte, son nom suivi de ses paramètres (voir parse_arrivals et
+parse_deadlines) :
+    uniform:minimum=20,maximum=45      délais uniformes (le modèle d'origine, par défaut)
+    poisson:rate=2                     processus de Poisson (commandes par minute)
+    bursty:calm_rate=1.5,burst_rate=6,calm_time=120,burst_time=30
+                                       processus de Poisson modulé (MMPP) : périodes calmes et rafales, de durées
+                                       exponentielles (en secondes)
+    ramp:start_rate=1,end_rate=6,duration=600
+                                       processus de Poisson dont le taux passe linéairement de start_rate à end_rate
+    (tous acceptent cap, par exemple poisson:rate=2,cap=3)
+    trace:path=peak.csv,scale=0.5      commandes enregistrées, rejouées à leurs instants (voir order_trace)
+
+    uniform:minimum=60,maximum=240     délais de livraison uniformes (par défaut)
+    fixed:time=120                     délai de livraison fixe
+    normal:mean=150,deviation=40,minimum=30
+                                       délais de livraison normaux, jamais sous le minimum
+
+Exemple : python batch_simulation.py --arrivals poisson:rate=2,cap=3 --deadlines normal:mean=150,deviation=40
+"""
+import random
+
+
+class ModelError(ValueError):
+    """
+    Spécification de modèle invalide.
+    """
+    pass
+
+
+class _Model:
+    """
+    Modèle décrit par une spécification texte (voir spec).
+    """
+
+    NAME = None
+
+    def __init__(self, **parameters) -> None:
+        self.__parameters = parameters  # paramètres, dans l'ordre de la spécification
+
+    @property
+    def spec(self) -> str:
+        """ Spécification du modèle (voir parse_arrivals et parse_deadlines). """
+        values = ','.join(f'{name}={value:.12g}' if isinstance(value, float) else f'{name}={value}'
+                          for name, value in self.__parameters.items() if value is not None)
+        return f'{self.NAME}:{values}' if values else self.NAME
+
+
+class ArrivalModel(_Model):
+    """
+    Modèle d'arrivée des commandes.
+    """
+
+    __TIME_BEFORE_FIRST_ORDER = 2  # en secondes (la première commande arrive dans les 2 secondes suivantes)
+
+    def __init__(self, cap: float = None, **parameters) -> None:
+        """
+        Initialise le modèle.
+        :param cap: accélération maximale (None pour ne pas la plafonner)
+        :param parameters: paramètres du modèle (pour sa spécification)
+        """
+        if cap is not None and cap <= 0.0:
+            raise ModelError(f"plafond d'accélération invalide : {cap}")
+        super().__init__(**parameters, cap=cap)
+        self.__cap = cap
+
+    def first_gap(self, acceleration: float) -> float or None:
+        """
+        Tire le délai avant la première commande de la partie.
+        :param acceleration: accélération courante du générateur de commandes
+        :return: délai (en secondes), None si le modèle n'a aucune commande
+        """
+        first_delay = random.uniform(self.__TIME_BEFORE_FIRST_ORDER, self.__TIME_BEFORE_FIRST_ORDER + 2)
+        return first_delay / acceleration
+
+    def next_gap(self, acceleration: float) -> float or None:
+        """
+        Tire le délai avant la prochaine commande.
+        :param acceleration: accélération courante du générateur de commandes
+        :return: délai (en secondes), None si le modèle n'a plus de commandes
+        """
+        if self.__cap is not None:
+            acceleration = min(acceleration, self.__cap)
+        return self._gap(acceleration)
+
+    def next_order(self) -> tuple:
+        """
+        Fournit la composition de la commande dont le délai vient d'être écoulé.
+        :return: (repas, délai de livraison en secondes), chacun None pour le tirer au hasard (voir orders.Order)
+        """
+        return None, None
+
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état du modèle (voir Game.snapshot).
+        :return: état du modèle
+        """
+        return ()
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état du modèle (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        pass
+
+    def reset(self) -> None:
+        """ Revient à l'état initial du modèle (nouveau départ). """
+        pass
+
+    def _gap(self, acceleration: float) -> float:
+        """ Tire le délai avant la prochaine commande, pour l'accélération (déjà plafonnée) spécifiée. """
+        raise NotImplementedError
+
+
+class UniformArrivals(ArrivalModel):
+    """
+    Délais uniformes entre deux bornes, divisés par l'accélération.
+    """
+
+    NAME = 'uniform'
+
+    def __init__(self, minimum: float = 20.0, maximum: float = 45.0, cap: float = None) -> None:
+        """
+        Initialise le modèle.
+        :param minimum: délai minimal (en secondes, sans accélération)
+        :param maximum: délai maximal (en secondes, sans accélération)
+        :param cap: accélération maximale (None pour ne pas la plafonner)
+        """
+        if not 0.0 < minimum <= maximum:
+            raise ModelError(f"délais invalides : de {minimum} à {maximum} s")
+        super().__init__(cap, minimum=minimum, maximum=maximum)
+        self.__minimum = minimum
+        self.__maximum = maximum
+
+    def _gap(self, acceleration: float) -> float:
+        return random.uniform(self.__minimum, self.__maximum) / acceleration
+
+
+class PoissonArrivals(ArrivalModel):
+    """
+    Processus de Poisson : délais exponentiels, de taux multiplié par l'accélération.
+    """
+
+    NAME = 'poisson'
+
+    def __init__(self, rate: float = 2.0, cap: float = None) -> None:
+        """
+        Initialise le modèle.
+        :param rate: commandes par minute (sans accélération)
+        :param cap: accélération maximale (None pour ne pas la plafonner)
+        """
+        if rate <= 0.0:
+            raise ModelError(f"taux invalide : {rate} commandes par minute")
+        super().__init__(cap, rate=rate)
+        self.__rate = rate / 60.0
+
+    def _gap(self, acceleration: float) -> float:
+        return random.expovariate(self.__rate * acceleration)
+
+
+class BurstyArrivals(ArrivalModel):
+    """
+    Processus de Poisson modulé par une chaîne de Markov à deux états (MMPP) : des périodes calmes et des rafales
+    alternent, chacune d'une durée exponentielle, avec leur propre taux d'arrivée. La partie commence calme.
+    """
+
+    NAME = 'bursty'
+
+    def __init__(self, calm_rate: float = 1.5, burst_rate: float = 6.0, calm_time: float = 120.0,
+                 burst_time: float = 30.0, cap: float = None) -> None:
+        """
+        Initialise le modèle.
+        :param calm_rate: commandes par minute pendant les périodes calmes (sans accélération)
+        :param burst_rate: commandes par minute pendant les rafales (sans accélération)
+        :param calm_time: durée moyenne (en secondes) d'une période calme
+        :param burst_time: durée moyenne (en secondes) d'une rafale
+        :param cap: accélération maximale (None pour ne pas la plafonner)
+        """
+        if min(calm_rate, burst_rate, calm_time, burst_time) <= 0.0:
+            raise ModelError("les taux et les durées doivent être positifs")
+        super().__init__(cap, calm_rate=calm_rate, burst_rate=burst_rate, calm_time=calm_time, burst_time=burst_time)
+        self.__rates = calm_rate / 60.0, burst_rate / 60.0
+        self.__times = calm_time, burst_time
+        self.__bursting = False
+        self.__remaining = None  # temps restant à la période en cours (tiré à la première commande)
+
+    def snapshot(self) -> tuple:
+        return self.__bursting, self.__remaining
+
+    def restore(self, state: tuple) -> None:
+        self.__bursting, self.__remaining = state
+
+    def reset(self) -> None:
+        self.__bursting = False
+        self.__remaining = None
+
+    def _gap(self, acceleration: float) -> float:
+        if self.__remaining is None:
+            self.__remaining = random.expovariate(1.0 / self.__times[0])
+
+        # les délais exponentiels sont sans mémoire : une arrivée qui dépasse la fin de la période est simplement
+        # tirée à nouveau dans la période suivante
+        gap = 0.0
+        while True:
+            candidate = random.expovariate(self.__rates[self.__bursting] * acceleration)
+            if candidate < self.__remaining:
+                self.__remaining -= candidate
+                return gap + candidate
+            gap += self.__remaining
+            self.__bursting = not self.__bursting
+            self.__remaining = random.expovariate(1.0 / self.__times[self.__bursting])
+
+
+class RampArrivals(ArrivalModel):
+    """
+    Processus de Poisson dont le taux passe linéairement de start_rate à end_rate pendant duration secondes (comptées
+    depuis la première commande tirée du modèle), puis reste à end_rate.
+    """
+
+    NAME = 'ramp'
+
+    def __init__(self, start_rate: float = 1.0, end_rate: float = 6.0, duration: float = 600.0,
+                 cap: float = None) -> None:
+        """
+        Initialise le modèle.
+        :param start_rate: commandes par minute au départ (sans accélération)
+        :param end_rate: commandes par minute à la fin de la rampe (sans accélération)
+        :param duration: durée (en secondes) de la rampe
+        :param cap: accélération maximale (None pour ne pas la plafonner)
+        """
+        if min(start_rate, end_rate, duration) <= 0.0:
+            raise ModelError("les taux et la durée doivent être positifs")
+        super().__init__(cap, start_rate=start_rate, end_rate=end_rate, duration=duration)
+        self.__start_rate = start_rate / 60.0
+        self.__end_rate = end_rate / 60.0
+        self.__duration = duration
+        self.__time = 0.0  # temps écoulé sur la rampe (somme des délais tirés)
+
+    def snapshot(self) -> tuple:
+        return self.__time,
+
+    def restore(self, state: tuple) -> None:
+        self.__time, = state
+
+    def reset(self) -> None:
+        self.__time = 0.0
+
+    def _gap(self, acceleration: float) -> float:
+        # amincissement : arrivées tirées au taux maximal, gardées avec la probabilité taux courant / taux maximal
+        max_rate = max(self.__start_rate, self.__end_rate) * acceleration
+        time = self.__time
+        while True:
+            time += random.expovariate(max_rate)
+            progress = min(1.0, time / self.__duration)
+            rate = (self.__start_rate + (self.__end_rate - self.__start_rate) * progress) * acceleration
+            if random.random() * max_rate <= rate:
+                gap, self.__time = time - self.__time, time
+                return gap
+
+
+class DeadlineModel(_Model):
+    """
+    Modèle de délais de livraison des commandes.
+    """
+
+    def draw(self) -> float:
+        """
+        Tire le délai de livraison d'une nouvelle commande.
+        :return: délai (en secondes)
+        """
+        raise NotImplementedError
+
+
+class UniformDeadlines(DeadlineModel):
+    """
+    Délais uniformes entre deux bornes.
+    """
+
+    NAME = 'uniform'
+
+    def __init__(self, minimum: float = 60.0, maximum: float = 240.0) -> None:
+        """
+        Initialise le modèle.
+        :param minimum: délai minimal (en secondes)
+        :param maximum: délai maximal (en secondes)
+        """
+        if not 0.0 < minimum <= maximum:
+            raise ModelError(f"délais invalides : de {minimum} à {maximum} s")
+        super().__init__(minimum=minimum, maximum=maximum)
+        self.__minimum = minimum
+        self.__maximum = maximum
+
+    def draw(self) -> float:
+        return random.uniform(self.__minimum, self.__maximum)
+
+
+class FixedDeadlines(DeadlineModel):
+    """
+    Même délai pour toutes les commandes.
+    """
+
+    NAME = 'fixed'
+
+    def __init__(self, time: float = 120.0) -> None:
+        """
+        Initialise le modèle.
+        :param time: délai (en secondes)
+        """
+        if time <= 0.0:
+            raise ModelError(f"délai invalide : {time} s")
+        super().__init__(time=time)
+        self.__time = time
+
+    def draw(self) -> float:
+        return self.__time
+
+
+class NormalDeadlines(DeadlineModel):
+    """
+    Délais normaux, jamais sous un minimum.
+    """
+
+    NAME = 'normal'
+
+    def __init__(self, mean: float = 150.0, deviation: float = 40.0, minimum: float = 30.0) -> None:
+        """
+        Initialise le modèle.
+        :param mean: délai moyen (en secondes)
+        :param deviation: écart type (en secondes)
+        :param minimum: délai minimal (en secondes)
+        """
+        if minimum <= 0.0 or deviation < 0.0:
+            raise ModelError(f"délais invalides : minimum {minimum} s, écart type {deviation} s")
+        super().__init__(mean=mean, deviation=deviation, minimum=minimum)
+        self.__mean = mean
+        self.__deviation = deviation
+        self.__minimum = minimum
+
+    def draw(self) -> float:
+        return max(self.__minimum, random.gauss(self.__mean, self.__deviation))
+
+
+_ARRIVAL_MODELS = {model.NAME: model for model in (UniformArrivals, PoissonArrivals, BurstyArrivals, RampArrivals)}
+_DEADLINE_MODELS = {model.NAME: model for model in (UniformDeadlines, FixedDeadlines, NormalDeadlines)}
+
+
+def parse_arrivals(spec: str) -> ArrivalModel:
+    """
+    Construit un modèle d'arrivée à partir de sa spécification.
+    :param spec: spécification (ex.: 'poisson:rate=2,cap=3', voir le module)
+    :return: modèle d'arrivée
+    """
+    if spec.strip().partition(':')[0] == 'trace':
+        from order_trace import TraceArrivals  # importé à la demande : order_trace dépend de ce module
+        return _parse(spec, {TraceArrivals.NAME: TraceArrivals})
+    return _parse(spec, _ARRIVAL_MODELS)
+
+
+def parse_deadlines(spec: str) -> DeadlineModel:
+    """
+    Construit un modèle de délais de livraison à partir de sa spécification.
+    :param spec: spécification (ex.: 'normal:mean=150,deviation=40', voir le module)
+    :return: modèle de délais
+    """
+    return _parse(spec, _DEADLINE_MODELS)
+
+
+def _parse(spec: str, models: dict) -> _Model:
+    """ Construit un modèle à partir de sa spécification, parmi les modèles offerts (nom -> classe). """
+    name, _, arguments = spec.strip().partition(':')
+    if name not in models:
+        raise ModelError(f"modèle inconnu : {name!r} (offerts : {', '.join(models)})")
+
+    parameters = {}
+    for argument in filter(None, arguments.split(',')):
+        parameter, _, value = argument.partition('=')
+        try:
+            parameters[parameter.strip()] = float(value)
+        except ValueError:
+            parameters[parameter.strip()] = value.strip()  # texte (ex.: chemin d'une trace), validé par le modèle
+
+    try:
+        return models[name](**parameters)
+    except TypeError:  # paramètre inconnu, ou texte là où un nombre est attendu
+        raise ModelError(f"{spec} : paramètres invalides pour le modèle {name!r}") from None
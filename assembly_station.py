@@ -1,17 +1,25 @@
 import pygame
 
+import metrics
+import surface_pool
 import settings
+import snapshot
 
 from burger import Burger
 from ingredients import Ingredient, IngredientType
 
 
 
-class AssemblyStation(pygame.sprite.Sprite):
+class AssemblyStation(surface_pool.PooledSprite):
     """
     Station d'assemblage pour les hambourgeois.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('AssemblyStation')  # compteur des reconstructions d'images
+
+    WIDTH = 60
+    HEIGHT = 60
+
     def __init__(self, pos: tuple) -> None:
         """
         Initialise la station d'assemblage.
@@ -35,6 +43,21 @@ class AssemblyStation(pygame.sprite.Sprite):
         self.__burger = None
         self.image = self.__build_surface()
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de la station d'assemblage (voir Game.snapshot).
+        :return: état de la station
+        """
+        return snapshot.encode_food(self.__burger),
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état de la station d'assemblage (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.__burger = snapshot.decode_food(state[0])
+        self.image = self.__build_surface()
 
     ########################################## A1 ##########################################
 
@@ -70,13 +93,19 @@ class AssemblyStation(pygame.sprite.Sprite):
     
     ########################################## A1 ##########################################
 
+    @property
+    def burger(self) -> Burger or None:
+        """ Hambourgeois en cours d'assemblage (None si la station est vide). """
+        return self.__burger
+
 
     def __build_surface(self) -> pygame.Surface:
         """
         Construit l'image représentant la station d'assemblage
         :return: la surface (image) construite
         """
-        surface = pygame.Surface((60, 60), flags=pygame.SRCALPHA)
+        AssemblyStation.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((AssemblyStation.WIDTH, AssemblyStation.HEIGHT))
         surface.fill(settings.PAPER_COLOR_1)
 
         for y in range(5):
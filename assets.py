@@ -0,0 +1,215 @@
+"""
+Images du jeu.
+
+Les images sont décodées une seule fois, puis gardées en mémoire. Le décodage (et la mise à l'échelle des images
+plein écran) peut être fait d'avance par une tâche en arrière-plan pendant que l'écran titre est affiché
+(voir preload); la conversion au format de l'écran, qui doit suivre l'ouverture de la fenêtre, est faite au premier
+usage de chaque image.
+
+Pour ne pas dépendre de la vitesse de décodage des PNG au démarrage, les images peuvent être empaquetées d'avance
+dans un paquet (settings.ASSET_BUNDLE) : pixels RGBA déjà décodés, aux tailles utilisées. Le paquet est projeté en
+mémoire (mmap) et les images l'utilisent directement, sans copie ni décodage. Une image absente du paquet (ou une
+taille d'écran non prévue) est décodée à partir de son PNG, comme s'il n'y avait pas de paquet.
+
+Les images plein écran sont à la résolution logique du jeu (settings.SCREEN_WIDTH x SCREEN_HEIGHT) : c'est la seule
+taille à prévoir, quel que soit l'écran.
+
+Exemple : python assets.py (à refaire chaque fois qu'une image change)
+"""
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+
+import pygame
+
+import settings
+
+
+class AssetError(ValueError):
+    """
+    Paquet d'images invalide.
+    """
+    pass
+
+
+# nom de l'image -> fichier
+IMAGES = {
+    'title': 'img/undercooked1.png',
+    'game_over': 'img/gameover.png',
+    'heart': 'img/heart.png',
+}
+
+# images affichées plein écran (mises à l'échelle de l'écran)
+FULL_SCREEN_IMAGES = ('title', 'game_over')
+
+_BUNDLE_MAGIC = b'UCAB'
+_BUNDLE_VERSION = 1
+_BUNDLE_HEADER = struct.Struct('<4sHH')  # signature, version, nombre d'images
+_BUNDLE_ENTRY = struct.Struct('<32sBHHQ')  # nom, mise à l'échelle (0 ou 1), largeur, hauteur, position des pixels
+_BUNDLE_ALIGNMENT = 64  # alignement (en octets) des pixels de chaque image dans le paquet
+
+__decoded = {}  # (nom, taille ou None) -> image décodée, pas encore convertie
+__converted = {}  # (nom, taille ou None) -> image convertie au format de l'écran
+__lock = threading.Lock()
+__preloading = None  # tâche de préchargement en cours
+__preload_time = 0.0
+__bundle = None  # (projection du paquet, (nom, taille ou None) -> (position, largeur, hauteur)), chargé au besoin
+
+
+def __decode(name: str, size: tuple or None) -> pygame.Surface:
+    """ Décode une image (et la met à l'échelle si une taille est spécifiée), une seule fois. """
+    key = name, size
+    with __lock:
+        if key in __decoded:
+            return __decoded[key]
+
+    bundled = __bundled_images().get(key)
+    if bundled:
+        offset, width, height = bundled
+        pixels = memoryview(__bundle[0])[offset:offset + width * height * 4]
+        image = pygame.image.frombuffer(pixels, (width, height), 'RGBA')  # sans copie
+    else:
+        image = pygame.image.load(IMAGES[name])
+        if size:
+            image = pygame.transform.scale(image, size)
+
+    with __lock:
+        return __decoded.setdefault(key, image)
+
+
+def __bundled_images() -> dict:
+    """ Images du paquet (ouvert et projeté en mémoire au premier appel), vide s'il n'y a pas de paquet. """
+    global __bundle
+    with __lock:
+        if __bundle is None:
+            __bundle = __open_bundle(settings.ASSET_BUNDLE) if os.path.exists(settings.ASSET_BUNDLE) else (None, {})
+        return __bundle[1]
+
+
+def __open_bundle(path: str) -> tuple:
+    """ Projette un paquet en mémoire et lit son index. """
+    with open(path, 'rb') as file:
+        projection = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        magic, version, count = _BUNDLE_HEADER.unpack_from(projection)
+        if magic != _BUNDLE_MAGIC or version != _BUNDLE_VERSION:
+            raise AssetError(f"{path} : ce n'est pas un paquet d'images (version {_BUNDLE_VERSION})")
+
+        images = {}
+        for i in range(count):
+            raw_name, scaled, width, height, offset = _BUNDLE_ENTRY.unpack_from(
+                projection, _BUNDLE_HEADER.size + i * _BUNDLE_ENTRY.size)
+            if offset + width * height * 4 > len(projection):
+                raise AssetError(f"{path} : paquet tronqué")
+            name = raw_name.rstrip(b'\0').decode()
+            images[name, (width, height) if scaled else None] = offset, width, height
+    except struct.error as error:
+        raise AssetError(f"{path} : paquet illisible ({error})") from error
+
+    return projection, images
+
+
+def build_bundle(path: str, sizes: list) -> int:
+    """
+    Empaquette toutes les images, décodées en pixels RGBA : chacune à sa taille d'origine, et les images plein écran
+    aussi à chacune des tailles d'écran spécifiées.
+    :param path: fichier du paquet à écrire
+    :param sizes: tailles d'écran à prévoir
+    :return: nombre d'images empaquetées
+    """
+    entries = []  # (nom, mise à l'échelle, image)
+    for name, image_path in IMAGES.items():
+        image = pygame.image.load(image_path)
+        entries.append((name, False, image))
+        if name in FULL_SCREEN_IMAGES:
+            entries.extend((name, True, pygame.transform.scale(image, size)) for size in sizes)
+
+    offset = _BUNDLE_HEADER.size + len(entries) * _BUNDLE_ENTRY.size
+    index = [_BUNDLE_HEADER.pack(_BUNDLE_MAGIC, _BUNDLE_VERSION, len(entries))]
+    pixels = []
+    for name, scaled, image in entries:
+        padding = -offset % _BUNDLE_ALIGNMENT
+        pixels.append(bytes(padding))
+        offset += padding
+
+        width, height = image.get_size()
+        index.append(_BUNDLE_ENTRY.pack(name.encode(), scaled, width, height, offset))
+        data = pygame.image.tobytes(image, 'RGBA')
+        pixels.append(data)
+        offset += len(data)
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(b''.join(index + pixels))
+    os.replace(temporary_path, path)  # un jeu déjà lancé garde sa projection de l'ancien paquet
+
+    return len(entries)
+
+
+def __preload(size: tuple) -> None:
+    """ Corps de la tâche de préchargement. """
+    global __preload_time
+    start_time = time.perf_counter()
+    for name in IMAGES:
+        __decode(name, size if name in FULL_SCREEN_IMAGES else None)
+    __preload_time = time.perf_counter() - start_time
+
+
+def preload(size: tuple) -> None:
+    """
+    Démarre le décodage de toutes les images dans une tâche en arrière-plan.
+    :param size: taille de l'écran (pour les images plein écran)
+    :return: aucun
+    """
+    global __preloading
+    if not __preloading:
+        __preloading = threading.Thread(target=__preload, args=(size,), daemon=True)
+        __preloading.start()
+
+
+def wait() -> float:
+    """
+    Attend la fin du préchargement, s'il y en a un.
+    :return: temps (en secondes) pris par le préchargement
+    """
+    if __preloading:
+        __preloading.join()
+    return __preload_time
+
+
+def get(name: str, size: tuple = None) -> pygame.Surface:
+    """
+    Retourne une image prête à afficher (décodée au besoin, puis convertie au format de l'écran).
+    :param name: nom de l'image (voir IMAGES)
+    :param size: taille de l'image mise à l'échelle, None pour sa taille d'origine
+    :return: image
+    """
+    key = name, size
+    image = __converted.get(key)
+    if image is None:
+        image = __decode(name, size).convert_alpha()
+        __converted[key] = image
+    return image
+
+
+def __assets() -> None:
+    """ Point d'entrée de la ligne de commande : construit le paquet d'images. """
+    parser = argparse.ArgumentParser(description="Construction du paquet d'images pré-décodées")
+    parser.add_argument('--size', action='append', default=[],
+                        help="taille d'écran à prévoir pour les images plein écran (ex.: 1920x1080), répétable")
+    parser.add_argument('--output', default=settings.ASSET_BUNDLE, help='fichier du paquet')
+    arguments = parser.parse_args()
+
+    sizes = [tuple(int(v) for v in size.lower().split('x')) for size in arguments.size]
+    sizes = sizes or [(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)]
+
+    count = build_bundle(arguments.output, sizes)
+    print(f"{arguments.output} : {count} images, {os.path.getsize(arguments.output) / 1e6:.1f} Mo")
+
+
+if __name__ == '__main__':
+    __assets()
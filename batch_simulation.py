@@ -0,0 +1,256 @@
+"""
+Simulations en lot.
+
+Lance un grand nombre de parties sans affichage, en temps simulé et avec des germes aléatoires différents,
+réparties sur tous les cœurs à l'aide d'un bassin de processus. Chaque partie est menée par une politique scriptée.
+Les résultats (pourboires, commandes manquées, latence des commandes, utilisation des appareils) sont agrégés
+dans un seul rapport.
+
+Chaque processus initialise Pygame une seule fois et enchaîne ensuite les parties qui lui sont confiées.
+Le temps réel de calcul de chaque trame est aussi mesuré pour détecter les régressions de performance.
+
+Exemple : python batch_simulation.py --sessions 2000 --duration 3600 --acceleration 1.2 --policy bots
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
+os.environ['SDL_VIDEODRIVER'] = 'dummy'  # aucune fenêtre : les parties ne sont pas affichées
+import pygame
+
+import arrivals
+import settings
+import timers
+from bots import BotTeam
+from game import Game
+from session_stats import SessionStats
+
+
+class IdlePolicy:
+    """
+    Politique qui ne fait rien : mesure la charge de commandes sans aucune livraison.
+    """
+
+    def act(self, game: Game) -> None:
+        """
+        Agit sur la partie avant chaque trame (en plaçant des événements dans la queue de Pygame).
+        :param game: partie à mener
+        :return: aucun
+        """
+        pass
+
+
+class BotPolicy:
+    """
+    Politique où chaque chef cuisinier est mené par un bot de référence (voir bots.OrderBot).
+    """
+
+    def __init__(self) -> None:
+        self.__team = None
+
+    def act(self, game: Game) -> None:
+        """
+        Fait agir les bots avant chaque trame.
+        :param game: partie à mener
+        :return: aucun
+        """
+        if not self.__team:
+            self.__team = BotTeam(game)
+        self.__team.act()
+
+
+# politiques disponibles, par nom
+POLICIES = {
+    'idle': IdlePolicy,
+    'bots': BotPolicy,
+}
+
+__FRAME_RATE = 90  # trames simulées par seconde (même cadence que le jeu)
+
+__screen = None  # écran virtuel du processus de simulation
+
+
+def __init_worker() -> None:
+    """ Initialise un processus de simulation : Pygame et l'écran virtuel sont réutilisés d'une partie à l'autre. """
+    global __screen
+    pygame.display.init()
+    pygame.font.init()
+    __screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+
+
+def __run_session(session: tuple) -> SessionStats:
+    """
+    Joue une partie complète sans affichage, en temps simulé.
+    :param session: germe aléatoire, durée (en secondes), nom de la politique, facteur d'accélération des commandes,
+                    fichier de disposition de la cuisine, nombre de chefs cuisiniers et spécifications des modèles
+                    d'arrivée et de délais des commandes (voir arrivals)
+    :return: statistiques de la partie
+    """
+    seed, duration, policy_name, acceleration, layout, chef_count, arrivals_spec, deadlines_spec = session
+
+    random.seed(seed)
+    pygame.event.clear()
+
+    simulated_timers = timers.SimulatedTimers()
+    timers.use(simulated_timers)
+
+    game = Game(__screen, headless=True, order_acceleration=acceleration, layout=layout,
+                chef_count=chef_count, arrivals=arrivals.parse_arrivals(arrivals_spec),
+                deadlines=arrivals.parse_deadlines(deadlines_spec))
+    policy = POLICIES[policy_name]()
+    frame_time = 1.0 / __FRAME_RATE
+
+    game.start()
+    for _ in range(round(duration * __FRAME_RATE)):
+        frame_start = time.perf_counter()
+        policy.act(game)
+        simulated_timers.advance(frame_time)
+        game.step(frame_time)
+        game.stats.record_frame_time(time.perf_counter() - frame_start)
+    game.stop()
+
+    return game.stats
+
+
+def __percentile(values: list, percentage: float) -> float:
+    """ Retourne le percentile demandé d'une liste de valeurs (0.0 si la liste est vide). """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentage / 100.0))]
+
+
+def __histogram_percentile(histogram: list, percentage: float) -> float:
+    """ Retourne le percentile demandé (en secondes) d'un histogramme de temps de trame. """
+    total = sum(histogram)
+    threshold = total * percentage / 100.0
+    count = 0
+    for bucket, bucket_count in enumerate(histogram):
+        count += bucket_count
+        if count >= threshold and count > 0:
+            return (bucket + 1) * SessionStats.FRAME_TIME_BUCKET
+    return 0.0
+
+
+def __build_report(results: list, wall_time: float) -> dict:
+    """
+    Agrège les statistiques de toutes les parties.
+    :param results: statistiques de chaque partie
+    :param wall_time: temps réel (en secondes) pris par la simulation
+    :return: rapport agrégé
+    """
+    hours = [stats.duration / 3600.0 for stats in results]
+    simulated_hours = sum(hours)
+
+    def per_hour(values: list) -> dict:
+        rates = [value / hour for value, hour in zip(values, hours) if hour > 0]
+        return {'mean': statistics.fmean(rates) if rates else 0.0,
+                'stdev': statistics.stdev(rates) if len(rates) > 1 else 0.0}
+
+    latencies = [latency for stats in results for latency in stats.order_latencies]
+
+    frame_time_histogram = [sum(counts) for counts in zip(*[stats.frame_time_histogram for stats in results])]
+
+    station_utilization = {}
+    for stats in results:
+        for name, utilization in stats.station_utilization().items():
+            station_utilization.setdefault(name, []).append(utilization)
+
+    return {
+        'sessions': len(results),
+        'simulated_hours': simulated_hours,
+        'wall_time': wall_time,
+        'speedup': simulated_hours * 3600.0 / wall_time if wall_time > 0 else 0.0,
+        'tips_per_hour': per_hour([stats.tips for stats in results]),
+        'delivered_orders_per_hour': per_hour([stats.delivered_orders for stats in results]),
+        'missed_orders_per_hour': per_hour([stats.missed_orders for stats in results]),
+        'game_overs_per_hour': per_hour([stats.game_overs for stats in results]),
+        'order_latency': {
+            'count': len(latencies),
+            'mean': statistics.fmean(latencies) if latencies else 0.0,
+            'p50': __percentile(latencies, 50),
+            'p90': __percentile(latencies, 90),
+            'p99': __percentile(latencies, 99),
+        },
+        'station_utilization': {name: statistics.fmean(values) for name, values in station_utilization.items()},
+        'frame_time_ms': {
+            'p50': __histogram_percentile(frame_time_histogram, 50) * 1000.0,
+            'p99': __histogram_percentile(frame_time_histogram, 99) * 1000.0,
+            'p999': __histogram_percentile(frame_time_histogram, 99.9) * 1000.0,
+            'max': max((stats.max_frame_time for stats in results), default=0.0) * 1000.0,
+        },
+    }
+
+
+def __print_report(report: dict) -> None:
+    """ Affiche le rapport agrégé sous forme de texte. """
+    print(f"Parties : {report['sessions']} ({report['simulated_hours']:.1f} h simulées "
+          f"en {report['wall_time']:.1f} s, {report['speedup']:.0f}x le temps réel)")
+
+    for key, label in [('tips_per_hour', 'Pourboires / heure'),
+                       ('delivered_orders_per_hour', 'Commandes livrées / heure'),
+                       ('missed_orders_per_hour', 'Commandes manquées / heure'),
+                       ('game_overs_per_hour', 'Fins de partie / heure')]:
+        print(f"{label:<28}{report[key]['mean']:10.2f} ± {report[key]['stdev']:.2f}")
+
+    latency = report['order_latency']
+    print(f"Latence des commandes (s)   moyenne {latency['mean']:.1f}, p50 {latency['p50']:.1f}, "
+          f"p90 {latency['p90']:.1f}, p99 {latency['p99']:.1f} ({latency['count']} livraisons)")
+
+    frame_time = report['frame_time_ms']
+    print(f"Temps de trame (ms)         p50 {frame_time['p50']:.1f}, p99 {frame_time['p99']:.1f}, "
+          f"p99.9 {frame_time['p999']:.1f}, max {frame_time['max']:.1f}")
+
+    print("Utilisation des appareils")
+    for name, utilization in sorted(report['station_utilization'].items()):
+        print(f"  {name:<26}{utilization * 100.0:9.1f} %")
+
+
+def __batch_simulation() -> None:
+    """ Point d'entrée de la ligne de commande. """
+    parser = argparse.ArgumentParser(description='Simulations en lot de parties sans affichage')
+    parser.add_argument('--sessions', type=int, default=100, help='nombre de parties à simuler')
+    parser.add_argument('--duration', type=float, default=3600.0, help='durée de chaque partie (en secondes)')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='bots', help='politique qui mène les parties')
+    parser.add_argument('--acceleration', type=float, default=1.2,
+                        help="facteur d'accélération des commandes à chaque livraison")
+    parser.add_argument('--arrivals', default='uniform',
+                        help="modèle d'arrivée des commandes (ex.: poisson:rate=2,cap=3, voir arrivals.py)")
+    parser.add_argument('--deadlines', default='uniform',
+                        help='modèle de délais de livraison des commandes (ex.: fixed:time=120, voir arrivals.py)')
+    parser.add_argument('--layout', default=settings.KITCHEN_LAYOUT, help='fichier de disposition de la cuisine')
+    parser.add_argument('--chefs', type=int, default=len(Game.CHEF_KEYS), help='nombre de chefs cuisiniers')
+    parser.add_argument('--seed', type=int, default=0, help='germe de la première partie (les suivantes incrémentent)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='nombre de processus de simulation')
+    parser.add_argument('--json', action='store_true', help='affiche le rapport en JSON')
+    arguments = parser.parse_args()
+    try:
+        arrivals.parse_arrivals(arguments.arrivals)
+        arrivals.parse_deadlines(arguments.deadlines)
+    except arrivals.ModelError as error:
+        parser.error(str(error))
+
+    sessions = [(arguments.seed + i, arguments.duration, arguments.policy, arguments.acceleration,
+                 arguments.layout, arguments.chefs, arguments.arrivals, arguments.deadlines)
+                for i in range(arguments.sessions)]
+    chunk_size = max(1, len(sessions) // (arguments.workers * 4))
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=arguments.workers, initializer=__init_worker) as executor:
+        results = list(executor.map(__run_session, sessions, chunksize=chunk_size))
+    report = __build_report(results, time.perf_counter() - start_time)
+
+    if arguments.json:
+        print(json.dumps(report, indent=2))
+    else:
+        __print_report(report)
+
+
+if __name__ == '__main__':
+    __batch_simulation()
@@ -67,6 +67,9 @@ class Beverage(Food):
 
         surface.blit(self.buffer_surface, pos)
 
+    def beverage_type(self) -> BeverageType:
+        return self.__type
+
     def color(self) -> tuple:
         return self.__color
 
@@ -0,0 +1,434 @@
+"""
+Chefs cuisiniers automatisés (bots).
+
+Un bot contrôle un chef par le même chemin qu'un joueur : il place des commandes de chef (Game.CHEF_EVENT) dans la
+queue de Pygame, que la partie traite exactement comme les touches de déplacement et la barre d'espacement. Les
+déplacements, les interactions avec les appareils et la livraison passent donc par Game.handle_space_key, les
+méthodes interact_with_* et Chef.deliver_meal, comme au clavier. Un bot peut ainsi mener un chef qui n'a pas de
+touches de déplacement.
+
+Les bots sont appelés une fois par trame, avant que la partie traite ses événements.
+"""
+import pygame
+
+from assembly_station import AssemblyStation
+from beverage import Beverage
+from burger import Burger
+from chef import Chef
+from cutting_station import CuttingStation
+from filling_station import FillingStation
+from fridge import Fridge
+from fries import Fries
+from fryer import Fryer
+from game import Game
+from grill import Grill
+from ingredients import Ingredient, IngredientType
+from meal import Meal
+from platter import Platter
+from trash import Trash
+
+
+class ChefBot:
+    """
+    Bot qui contrôle un chef cuisinier : marcher jusqu'à un appareil, interagir, livrer.
+    """
+
+    __ARRIVAL_TOLERANCE = 2  # distance (en pixels) à partir de laquelle le chef est arrivé (inférieure à sa vitesse)
+
+    def __init__(self, chef: Chef, chef_index: int) -> None:
+        """
+        Initialise le bot.
+        :param chef: chef cuisinier contrôlé par le bot
+        :param chef_index: indice du chef (dans Game.chefs)
+        """
+        self.__chef = chef
+        self.__chef_index = chef_index
+
+        self.__target = None  # rectangle vers lequel marcher
+        self.__held_keys = set()  # directions en cours (comme des touches enfoncées)
+
+    def walk_to(self, rect: pygame.Rect or None) -> None:
+        """
+        Indique où marcher : le chef sera centré sur le rectangle spécifié.
+        :param rect: rectangle à rejoindre (None pour s'arrêter)
+        :return: aucun
+        """
+        self.__target = rect
+
+    def has_arrived(self) -> bool:
+        """
+        Vérifie si le chef est centré sur le rectangle à rejoindre.
+        :return: True si le chef est arrivé, False sinon
+        """
+        if not self.__target:
+            return False
+
+        horizontal, vertical = self.__directions()
+        return horizontal == 0 and vertical == 0
+
+    def update(self) -> None:
+        """
+        Enfonce ou relâche les touches de déplacement pour se diriger vers le rectangle à rejoindre.
+        :return: aucun
+        """
+        horizontal, vertical = self.__directions()
+
+        # relâcher d'abord, puis enfoncer : le chef ne retient que la dernière direction reçue sur chaque axe
+        wanted = set()
+        if horizontal:
+            wanted.add('left' if horizontal < 0 else 'right')
+        if vertical:
+            wanted.add('up' if vertical < 0 else 'down')
+
+        for direction in sorted(self.__held_keys - wanted):
+            self.__post(direction, False)
+        for direction in sorted(wanted - self.__held_keys):
+            self.__post(direction, True)
+
+        self.__held_keys = wanted
+
+    def interact(self) -> None:
+        """
+        Interagit avec ce qui se trouve sous le chef (appareil ou commande à livrer), après s'être arrêté.
+        :return: aucun
+        """
+        for direction in sorted(self.__held_keys):
+            self.__post(direction, False)
+        self.__held_keys = set()
+
+        self.__post('interact', True)
+
+    def __directions(self) -> tuple:
+        """ Directions horizontale et verticale (-1, 0 ou 1) à prendre pour rejoindre le rectangle visé. """
+        if not self.__target:
+            return 0, 0
+
+        dx = self.__target.centerx - self.__chef.rect.centerx
+        dy = self.__target.centery - self.__chef.rect.centery
+
+        horizontal = 0 if abs(dx) <= ChefBot.__ARRIVAL_TOLERANCE else (1 if dx > 0 else -1)
+        vertical = 0 if abs(dy) <= ChefBot.__ARRIVAL_TOLERANCE else (1 if dy > 0 else -1)
+        return horizontal, vertical
+
+    def __post(self, action: str, pressed: bool) -> None:
+        """ Place une commande du chef dans la queue de Pygame. """
+        pygame.event.post(pygame.event.Event(Game.CHEF_EVENT, chef=self.__chef_index, action=action, pressed=pressed))
+
+    @property
+    def chef(self) -> Chef:
+        return self.__chef
+
+
+class OrderBot(ChefBot):
+    """
+    Bot de référence : choisit la plus ancienne commande libre du tableau d'affichage, la prépare au complet
+    (hambourgeois, boisson, frites) sur une assiette de service et la livre. Plusieurs bots peuvent travailler
+    ensemble en partageant leurs réservations (commandes et appareils).
+    """
+
+    # ingrédients à découper : ingrédient découpé -> ingrédient pris au réfrigérateur
+    __CUT_FROM = {
+        IngredientType.ONION_SLICES: IngredientType.UNPREPARED_ONION,
+        IngredientType.LETTUCE_SLICES: IngredientType.UNPREPARED_LETTUCE,
+        IngredientType.TOMATO_SLICES: IngredientType.UNPREPARED_TOMATO,
+        IngredientType.PICKLE_SLICE: IngredientType.UNPREPARED_PICKLE,
+        IngredientType.POTATO_SLICES: IngredientType.POTATO,
+    }
+
+    __BURGER_BASE = [IngredientType.BOTTOM_BUN, IngredientType.COOKED_PATTY, IngredientType.TOP_BUN]
+
+    def __init__(self, game: Game, chef_index: int, reservations: dict) -> None:
+        """
+        Initialise le bot.
+        :param game: partie dans laquelle travailler
+        :param chef_index: indice du chef contrôlé (dans Game.chefs)
+        :param reservations: réservations partagées entre les bots (commande ou appareil -> bot)
+        """
+        super().__init__(game.chefs[chef_index], chef_index)
+
+        self.__game = game
+        self.__reservations = reservations
+
+        self.__order = None
+        self.__platter = None
+        self.__assembly_station = None
+
+        # appareils où le bot a laissé quelque chose en cours (cuisson, découpe, friture, remplissage)
+        self.__grill = None
+        self.__cutting_station = None
+        self.__fryer = None
+        self.__filling_station = None
+
+    def act(self) -> None:
+        """
+        Décide de la prochaine action et place les événements clavier correspondants. À appeler à chaque trame.
+        :return: aucun
+        """
+        self.__release_finished_stations()
+        if not self.__claim_order():
+            self.__go_to(self.__trash() if self.chef.food else None, interact=bool(self.chef.food))
+            return
+
+        where, interact = self.__next_target() or (None, False)
+        self.__go_to(where, interact)
+
+    def __go_to(self, where, interact: bool) -> None:
+        """ Marche vers un appareil (ou un rectangle) et interagit une fois arrivé, s'il y a lieu. """
+        if where is None:
+            self.walk_to(None)
+            self.update()
+            return
+
+        rect = where if isinstance(where, pygame.Rect) else where.rect
+        self.walk_to(rect)
+        if self.has_arrived():
+            if interact:
+                self.__remember(where)
+                self.interact()
+        else:
+            self.update()
+
+    ############################################ réservations ############################################
+
+    def __claim_order(self) -> bool:
+        """ Garde la commande en cours ou réserve la plus ancienne commande libre avec une assiette et une station. """
+        waiting_orders = self.__game.order_board.waiting_orders
+
+        if self.__order and self.__order in waiting_orders:
+            return True
+        if self.__order:
+            self.__release_all()
+
+        for order in waiting_orders:
+            if self.__reservations.get(order.order_id, self) is not self:
+                continue
+
+            platter = self.__closest(Platter, lambda p: not (p.burger or p.beverage or p.fries))
+            assembly_station = self.__closest(AssemblyStation, lambda a: a.burger is None)
+            if not platter or not assembly_station:
+                return False
+
+            self.__order = order
+            self.__platter = platter
+            self.__assembly_station = assembly_station
+            for reserved in [order.order_id, platter, assembly_station]:
+                self.__reservations[reserved] = self
+            return True
+
+        return False
+
+    def __release_all(self) -> None:
+        """ Libère toutes les réservations du bot (commande livrée, expirée ou partie recommencée). """
+        for key in [key for key, bot in self.__reservations.items() if bot is self]:
+            del self.__reservations[key]
+
+        self.__order = self.__platter = self.__assembly_station = None
+        self.__grill = self.__cutting_station = self.__fryer = self.__filling_station = None
+
+    def __reserve(self, station) -> None:
+        self.__reservations[station] = self
+
+    def __release(self, station) -> None:
+        if self.__reservations.get(station) is self:
+            del self.__reservations[station]
+
+    def __remember(self, station) -> None:
+        """ Retient l'appareil où le chef s'apprête à laisser quelque chose en cours. """
+        food = self.chef.food
+
+        if isinstance(station, Grill) and isinstance(food, Ingredient):
+            self.__grill = station
+        elif isinstance(station, Fryer) and isinstance(food, Ingredient):
+            self.__fryer = station
+        elif isinstance(station, CuttingStation) and isinstance(food, Ingredient):
+            self.__cutting_station = station
+        elif isinstance(station, FillingStation) and food is None and station.is_available():
+            self.__filling_station = station
+        else:
+            return
+
+        self.__reserve(station)
+
+    def __release_finished_stations(self) -> None:
+        """ Oublie les appareils qui ont été vidés (nourriture récupérée ou perdue). """
+        if self.__grill and self.__grill.is_available():
+            self.__release(self.__grill)
+            self.__grill = None
+        if self.__fryer and self.__fryer.is_available():
+            self.__release(self.__fryer)
+            self.__fryer = None
+        if self.__cutting_station and self.__cutting_station.is_available():
+            self.__release(self.__cutting_station)
+            self.__cutting_station = None
+        if self.__filling_station and self.__filling_station.is_available():
+            self.__release(self.__filling_station)
+            self.__filling_station = None
+
+    ############################################ décisions ############################################
+
+    def __next_target(self) -> tuple or None:
+        """
+        Choisit où aller et s'il faut interagir une fois arrivé.
+        :return: (appareil ou rectangle, interagir) ou None pour attendre sur place
+        """
+        if self.chef.food:
+            return self.__place(self.chef.food)
+
+        order, platter = self.__order, self.__platter
+        needs_burger = platter.burger is None
+        needs_beverage = order.beverage is not None and platter.beverage is None
+        needs_fries = order.fries is not None and platter.fries is None
+
+        if not (needs_burger or needs_beverage or needs_fries):
+            return platter, True
+
+        # récupérer d'abord ce qui risque de brûler, puis ce qui est prêt
+        if self.__fryer and not self.__fryer.is_available() and not self.__is_frying(self.__fryer):
+            return self.__fryer, True
+        if self.__grill and (self.__grill.has_cooked_patty() or self.__grill.has_overcooked_or_burnt_patty()):
+            return self.__grill, True
+        if self.__cutting_station and self.__cutting_station.is_ready():
+            return self.__cutting_station, True
+        if self.__filling_station and self.__filling_station.is_ready():
+            return self.__filling_station, True
+
+        # lancer ensuite les préparations les plus longues
+        if needs_beverage and not self.__filling_station:
+            filling_station = self.__closest(
+                FillingStation, lambda f: f.is_available() and f.beverage_type() == order.beverage.beverage_type())
+            if filling_station:
+                return filling_station, True
+        if needs_fries and not self.__fryer and not self.__cutting_station:
+            return self.__fetch(IngredientType.POTATO_SLICES)
+
+        if needs_burger:
+            burger = self.__assembly_station.burger
+            if burger and burger.ingredients[-1].ingredient_type() == IngredientType.TOP_BUN:
+                return self.__assembly_station, True
+            return self.__fetch(self.__next_burger_ingredient(burger))
+
+        # rien d'autre à faire : attendre près de ce qui est en cours
+        for station in [self.__fryer, self.__grill, self.__cutting_station, self.__filling_station]:
+            if station:
+                return station, False
+
+        return None
+
+    def __next_burger_ingredient(self, burger: Burger or None) -> IngredientType:
+        """ Prochain ingrédient à ajouter au hambourgeois en cours d'assemblage pour respecter la commande. """
+        present = [ingredient.ingredient_type() for ingredient in burger.ingredients] if burger else []
+        wanted = [ingredient.ingredient_type() for ingredient in self.__order.burger.ingredients]
+
+        if IngredientType.BOTTOM_BUN not in present:
+            return IngredientType.BOTTOM_BUN
+        if IngredientType.COOKED_PATTY not in present:
+            return IngredientType.COOKED_PATTY
+
+        # le fromage doit être placé directement sur une boulette
+        for ingredient_type in wanted:
+            if ingredient_type not in present and ingredient_type not in OrderBot.__BURGER_BASE:
+                return ingredient_type
+
+        return IngredientType.TOP_BUN
+
+    def __fetch(self, ingredient_type: IngredientType) -> tuple or None:
+        """ Va chercher (ou attend) un ingrédient, en passant par le grill ou la découpe s'il le faut. """
+        if ingredient_type == IngredientType.COOKED_PATTY:
+            if self.__grill:
+                return self.__grill, False
+            ingredient_type = IngredientType.RAW_PATTY
+        elif ingredient_type in OrderBot.__CUT_FROM:
+            if self.__cutting_station:
+                return self.__cutting_station, False  # une seule découpe à la fois
+            ingredient_type = OrderBot.__CUT_FROM[ingredient_type]
+
+        fridge = self.__closest(Fridge, lambda f: f.ingredient_type() == ingredient_type)
+        return (fridge, True) if fridge else None
+
+    def __place(self, food) -> tuple or None:
+        """ Choisit où déposer la nourriture transportée (la poubelle si elle ne sert à rien). """
+        order, platter = self.__order, self.__platter
+
+        if isinstance(food, Meal):
+            if self.chef.matches_order(food, order):
+                rect = self.__game.order_board.get_order_rect(order.order_id)
+                return (rect, True) if rect else None
+        elif isinstance(food, Burger):
+            if platter.burger is None:
+                return platter, True
+        elif isinstance(food, Beverage):
+            if order.beverage and platter.beverage is None and food.color() == order.beverage.color():
+                return platter, True
+        elif isinstance(food, Fries):
+            if order.fries and platter.fries is None:
+                return platter, True
+        elif isinstance(food, Ingredient):
+            return self.__place_ingredient(food)
+
+        return self.__trash(), True
+
+    def __place_ingredient(self, ingredient: Ingredient) -> tuple or None:
+        """ Choisit où déposer un ingrédient : grill, friteuse, découpe ou station d'assemblage. """
+        ingredient_type = ingredient.ingredient_type()
+
+        if ingredient_type == IngredientType.RAW_PATTY:
+            return self.__use_free(Grill, lambda g: g.is_available())
+        if ingredient_type == IngredientType.POTATO_SLICES:
+            return self.__use_free(Fryer, lambda f: f.is_available())
+        if ingredient.is_for_cutting():
+            return self.__use_free(CuttingStation, lambda c: c.is_available())
+
+        burger = self.__assembly_station.burger
+        if ingredient.is_for_burger() and (burger.can_add_ingredient(ingredient) if burger else
+                                           ingredient_type == IngredientType.BOTTOM_BUN):
+            return self.__assembly_station, True
+
+        return self.__trash(), True
+
+    def __use_free(self, station_type: type, is_free) -> tuple or None:
+        """ Se dirige vers l'appareil libre le plus proche du type donné (attend sur place s'il n'y en a pas). """
+        station = self.__closest(station_type, is_free)
+        return (station, True) if station else None
+
+    ############################################ cuisine ############################################
+
+    def __closest(self, station_type: type, accept) -> object or None:
+        """ Appareil non réservé par un autre bot le plus proche du chef, parmi ceux qui sont acceptés. """
+        x, y = self.chef.rect.center
+        candidates = [station for station in self.__game.stations
+                      if isinstance(station, station_type)
+                      and self.__reservations.get(station, self) is self
+                      and accept(station)]
+        if not candidates:
+            return None
+
+        return min(candidates, key=lambda s: (s.rect.centerx - x) ** 2 + (s.rect.centery - y) ** 2)
+
+    def __trash(self) -> Trash:
+        return next(station for station in self.__game.stations if isinstance(station, Trash))
+
+    @staticmethod
+    def __is_frying(fryer: Fryer) -> bool:
+        """ Une friteuse occupée qui n'a pas encore de frites à récupérer est en train de frire. """
+        return not fryer.has_fryed_fries() and not fryer.has_overfryed_or_burnt_fries()
+
+
+class BotTeam:
+    """
+    Équipe de bots de référence, un par chef cuisinier de la partie, qui se partagent leurs réservations.
+    """
+
+    def __init__(self, game: Game, count: int = None) -> None:
+        """
+        Initialise l'équipe.
+        :param game: partie dans laquelle travailler
+        :param count: nombre de bots (par défaut, un par chef cuisinier)
+        """
+        reservations = {}
+        count = len(game.chefs) if count is None else min(count, len(game.chefs))
+        self.__bots = [OrderBot(game, i, reservations) for i in range(count)]
+
+    def act(self) -> None:
+        """ Fait agir chaque bot de l'équipe. À appeler à chaque trame. """
+        for bot in self.__bots:
+            bot.act()
@@ -0,0 +1,85 @@
+import numpy as np
+import pygame
+import settings
+from chef import Chef
+
+
+class Brigade:
+    """
+    Brigade de chefs cuisiniers. Les positions, directions de déplacement et orientations de tous les chefs sont
+    tenues dans des tableaux NumPy : chaque trame déplace toute la brigade en une seule opération vectorisée, puis
+    seuls les sprites des chefs qui ont bougé sont mis à jour.
+    """
+
+    def __init__(self, positions: list) -> None:
+        """
+        Initialise la brigade.
+        :param positions: position initiale (centre) de chaque chef cuisinier à l'écran
+        """
+        count = len(positions)
+        self.__positions = np.zeros((count, 2), dtype=np.int32)  # coins supérieurs gauches
+        self.__walking = np.zeros((count, 2), dtype=np.int32)  # directions de déplacement (-1, 0 ou 1)
+        self.__facings = np.zeros(count, dtype=np.int32)
+        self.__previous_positions = self.__positions.copy()  # positions avant la dernière mise à jour (interpolation)
+
+        self.__chefs = [Chef(pos, (self.__positions[i], self.__walking[i], self.__facings[i:i + 1]))
+                        for i, pos in enumerate(positions)]
+
+        screen_size = np.array([settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT])
+        self.__limits = screen_size - np.array([chef.rect.size for chef in self.__chefs]).reshape(count, 2)
+
+        self.settle()
+
+    def update(self) -> None:
+        """
+        Déplace tous les chefs cuisiniers et ajuste l'apparence de ceux qui ont bougé.
+        :return: aucun
+        """
+        self.__previous_positions[:] = self.__positions
+        changed = Chef.walk(self.__positions, self.__walking, self.__facings, self.__limits)
+        for index in np.flatnonzero(changed):
+            self.__chefs[index].sync()
+
+    def draw(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
+        """
+        Dessine tous les chefs cuisiniers sur la surface spécifiée, entre leurs deux dernières positions.
+        :param surface: surface sur laquelle dessiner les chefs cuisiniers
+        :param alpha: fraction du chemin parcouru depuis la position précédente (1.0 pour la position actuelle)
+        :return: aucun
+        """
+        surface.blits(self.blits(alpha), doreturn=False)
+
+    def blits(self, alpha: float = 1.0) -> list:
+        """
+        Retourne les paires (image, position) des chefs cuisiniers, entre leurs deux dernières positions (voir draw).
+        :param alpha: fraction du chemin parcouru depuis la position précédente (1.0 pour la position actuelle)
+        :return: paires à soumettre à Surface.blits
+        """
+        positions = self.__previous_positions + (self.__positions - self.__previous_positions) * alpha
+        return list(zip([chef.image for chef in self.__chefs], np.rint(positions).tolist()))
+
+    def settle(self) -> None:
+        """
+        Oublie les positions précédentes : les chefs cuisiniers sont dessinés à leur position actuelle jusqu'à la
+        prochaine mise à jour (après un déplacement instantané, ex.: Game.restore).
+        :return: aucun
+        """
+        self.__previous_positions[:] = self.__positions
+
+    def reset(self, positions: list) -> None:
+        """
+        Réinitialise tous les chefs cuisiniers.
+        :param positions: position initiale (coin supérieur gauche) de chaque chef cuisinier à l'écran
+        :return: aucun
+        """
+        for chef, position in zip(self.__chefs, positions):
+            chef.reset(position)
+
+    @property
+    def moving(self) -> bool:
+        """ True si un chef cuisinier marche ou vient de s'arrêter (son dessin n'a pas rejoint sa position). """
+        return bool(self.__walking.any() or (self.__previous_positions != self.__positions).any())
+
+    @property
+    def chefs(self) -> list:
+        return self.__chefs
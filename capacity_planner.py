@@ -0,0 +1,806 @@
+"""
+Planificateur de capacité : simulation à événements discrets d'une cuisine, sans Pygame.
+
+La cuisine est un réseau de files d'attente. Les commandes arrivent selon un modèle d'arrivée (voir arrivals), les
+chefs cuisiniers les préparent en suivant la même marche que les bots de référence (voir bots.OrderBot) et les
+appareils sont des serveurs dont les durées sont celles du jeu (voir settings). Rien n'est dessiné et aucune trame
+n'est simulée : le temps saute d'un événement au suivant (voir timers.SimulatedTimers), des milliers de fois plus vite
+que le temps réel. On peut ainsi comparer des dispositions (une troisième friteuse vaut-elle la peine?) ou des tailles
+de brigade avant de les essayer dans le jeu (voir batch_simulation).
+
+Le modèle simplifie le jeu :
+ - les chefs marchent en ligne droite vers le centre des appareils (à la vitesse du jeu sur chaque axe), sans se
+   bloquer entre eux, et chaque interaction prend un pas de simulation;
+ - comme les bots, un chef ne met qu'une boulette dans un hambourgeois (la commande compare les ingrédients présents);
+ - une commande expirée est abandonnée sur-le-champ : ce qu'elle occupait (assiette, station d'assemblage, appareils)
+   est vidé;
+ - les commandes manquées ne mettent pas fin à la partie, pour que la charge reste celle demandée;
+ - une commande que la disposition ne permet pas de préparer (ingrédient, boisson ou appareil manquant) n'est prise
+   par aucun chef : elle est comptée à part, comme impossible, et non comme manquée.
+
+Le rapport donne, pour chaque disposition et chaque taille de brigade, le débit (commandes livrées et manquées par
+heure), la distribution de la latence des commandes (de l'arrivée à la livraison), l'utilisation de chaque type
+d'appareil (fraction du temps où il est occupé, comme batch_simulation) et des chefs (fraction du temps où ils ont une
+commande), l'attente des chefs pour un appareil libre et le goulot d'étranglement : la ressource la plus utilisée
+(à égalité, celle que les chefs attendent le plus, sinon toutes celles à égalité).
+
+Exemple : python capacity_planner.py --layout layouts/default.json three_fryers.json --chefs 2 3 \
+              --arrivals poisson:rate=4
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import arrivals
+import settings
+import timers
+
+
+class PlannerError(ValueError):
+    """
+    Disposition de cuisine que le planificateur ne peut pas lire.
+    """
+    pass
+
+
+_CHEF_SPEED = settings.CHEF_SPEED * settings.TICK_RATE  # en pixels par seconde, sur chaque axe
+_INTERACTION_TIME = 1.0 / settings.TICK_RATE  # une interaction est traitée au pas de simulation suivant
+_ARRIVAL_TOLERANCE = 2  # distance (en pixels) à partir de laquelle un chef est arrivé (comme bots.ChefBot)
+_REPLAN_TIME = 0.5  # en secondes : un chef qui marche revoit sa décision au moins aussi souvent
+_POLL_TIME = 0.25  # en secondes : un chef qui attend un appareil libre regarde à nouveau après ce délai
+
+_CHEFS_PER_ROW = 16  # disposition des chefs au départ (comme Game)
+_CHEF_ROW_SPACING = 50
+
+_BOARD_LEFT, _BOARD_TOP, _BOARD_SPACING = 10, 10, 70  # tableau des commandes (voir order_board et order_sprite)
+_ORDER_WIDTH, _ORDER_HEIGHT = 60, 70
+
+# taille (en pixels) de chaque type d'appareil de la disposition, et nom de sa classe dans le jeu
+_STATION_TYPES = {
+    'platter': ('Platter', 60, 60),
+    'filling_station': ('FillingStation', 50, 70),
+    'fryer': ('Fryer', 50, 50),
+    'grill': ('Grill', 50, 50),
+    'fridge': ('Fridge', 50, 40),
+    'assembly_station': ('AssemblyStation', 60, 60),
+    'cutting_station': ('CuttingStation', 60, 60),
+    'trash': ('Trash', 32, 40),
+}
+_PARAMETERS = {'filling_station': 'beverage', 'fridge': 'ingredient'}
+
+# appareils dont on mesure l'utilisation (ceux de batch_simulation, plus ceux qu'une commande réserve)
+_MEASURED = ('AssemblyStation', 'CuttingStation', 'FillingStation', 'Fryer', 'Grill', 'Platter')
+_BOTTLENECK_TOLERANCE = 0.001  # écart d'utilisation en deçà duquel deux ressources sont à égalité (0.1 %)
+
+_OPTIONS = ('CHEESE_SLICE', 'ONION_SLICES', 'LETTUCE_SLICES', 'TOMATO_SLICES', 'PICKLE_SLICE')
+_BEVERAGES = ('COLA', 'ORANGE_SODA', 'LEMON_SODA', 'LEMONADE', 'PINK_LEMONADE')
+
+# ingrédients à découper : ingrédient découpé -> ingrédient pris au réfrigérateur (comme bots.OrderBot)
+_CUT_FROM = {
+    'ONION_SLICES': 'UNPREPARED_ONION',
+    'LETTUCE_SLICES': 'UNPREPARED_LETTUCE',
+    'TOMATO_SLICES': 'UNPREPARED_TOMATO',
+    'PICKLE_SLICE': 'UNPREPARED_PICKLE',
+    'POTATO_SLICES': 'POTATO',
+}
+_CUT_INTO = {unprepared: cut for cut, unprepared in _CUT_FROM.items()}
+_BURGER_BASE = ('BOTTOM_BUN', 'COOKED_PATTY', 'TOP_BUN')
+
+
+class _Station:
+    """
+    Appareil de la cuisine : ce qu'il contient, quand c'est prêt, quand ça brûle et qui l'a réservé.
+    """
+
+    def __init__(self, kind: str, center: tuple, value: str or None) -> None:
+        self.kind = kind  # nom de la classe de l'appareil dans le jeu (ex.: 'Grill')
+        self.center = center
+        self.value = value  # ingrédient d'un réfrigérateur, boisson d'une station de remplissage
+        self.food = None  # nourriture en préparation ou prête
+        self.ready_time = 0.0
+        self.burn_time = None  # moment où la nourriture prête commence à brûler (None si elle ne brûle pas)
+        self.contents = []  # ingrédients d'une station d'assemblage, ou repas d'une assiette
+        self.owner = None  # chef qui a réservé l'appareil
+        self.busy_since = None  # début de l'occupation en cours
+        self.busy_time = 0.0  # temps occupé cumulé
+
+    def is_free(self) -> bool:
+        return self.busy_since is None
+
+    def is_ready(self, now: float) -> bool:
+        return self.food is not None and now >= self.ready_time
+
+    def occupy(self, now: float) -> None:
+        if self.busy_since is None:
+            self.busy_since = now
+
+    def clear(self, now: float) -> None:
+        """ Vide l'appareil et cumule le temps où il a été occupé. """
+        if self.busy_since is not None:
+            self.busy_time += now - self.busy_since
+        self.food = self.burn_time = self.owner = self.busy_since = None
+        self.contents = []
+
+    def take(self, now: float) -> str:
+        """ Récupère la nourriture prête (brûlée si on a trop attendu) et vide l'appareil. """
+        food = self.food
+        if self.burn_time is not None and now >= self.burn_time:
+            food = 'BURNT'
+        owner = self.owner
+        self.clear(now)
+        self.owner = owner  # la réservation est libérée par le chef (voir _Chef.__release_finished)
+        return food
+
+
+class _Order:
+    """
+    Commande : sa composition et son sort.
+    """
+
+    def __init__(self, arrival_time: float, deadline: float, toppings: tuple, beverage: str or None,
+                 fries: bool) -> None:
+        self.arrival_time = arrival_time
+        self.deadline = deadline
+        self.toppings = toppings  # ingrédients du hambourgeois en plus du pain et de la boulette
+        self.beverage = beverage
+        self.fries = fries
+        self.missed = False
+        self.unservable = False  # True si la disposition ne permet pas de la préparer (voir _Kitchen.missing)
+
+
+class _Kitchen:
+    """
+    Cuisine simulée : appareils, commandes en attente et statistiques.
+    """
+
+    def __init__(self, stations: list, acceleration: float, deadlines: arrivals.DeadlineModel) -> None:
+        self.stations = stations
+        self.trash = next(station for station in stations if station.kind == 'Trash')
+        self.scheduler = timers.SimulatedTimers()
+        self.waiting_orders = []  # commandes en attente, de la plus ancienne à la plus récente
+        self.reservations = set()  # commandes réservées par un chef
+
+        self.deadlines = deadlines
+        self.acceleration = 1.0
+        self.acceleration_increment = acceleration
+
+        self.latencies = []
+        self.missed_orders = 0
+        self.unservable_orders = 0
+        self.unservable_items = set()  # ingrédients, boissons et appareils qui ont manqué pour préparer une commande
+        self.station_wait = {}  # type d'appareil -> temps (en secondes) passé par les chefs à en attendre un libre
+
+    @property
+    def now(self) -> float:
+        return self.scheduler.now
+
+    def missing(self, order: _Order) -> list:
+        """ Ingrédients (au réfrigérateur), boissons et appareils qui manquent à la disposition pour une commande. """
+        kinds = {station.kind for station in self.stations}
+        fridges = {station.value for station in self.stations if station.kind == 'Fridge'}
+        beverages = {station.value for station in self.stations if station.kind == 'FillingStation'}
+
+        needed = [('BOTTOM_BUN', 'BOTTOM_BUN' in fridges), ('TOP_BUN', 'TOP_BUN' in fridges),
+                  ('RAW_PATTY', 'RAW_PATTY' in fridges), ('Grill', 'Grill' in kinds)]
+        for topping in order.toppings:
+            needed.append((_CUT_FROM.get(topping, topping), _CUT_FROM.get(topping, topping) in fridges))
+            if topping in _CUT_FROM:
+                needed.append(('CuttingStation', 'CuttingStation' in kinds))
+        if order.fries:
+            needed += [('POTATO', 'POTATO' in fridges), ('CuttingStation', 'CuttingStation' in kinds),
+                       ('Fryer', 'Fryer' in kinds)]
+        if order.beverage:
+            needed.append((order.beverage, order.beverage in beverages))
+        return sorted({name for name, available in needed if not available})
+
+    def closest(self, position: tuple, kind: str, accept, chef) -> _Station or None:
+        """ Appareil non réservé par un autre chef le plus proche d'une position, parmi ceux qui sont acceptés. """
+        x, y = position
+        candidates = [station for station in self.stations
+                      if station.kind == kind and station.owner in (None, chef) and accept(station)]
+        return min(candidates, key=lambda s: (s.center[0] - x) ** 2 + (s.center[1] - y) ** 2, default=None)
+
+    def order_position(self, order: _Order) -> tuple or None:
+        """ Centre de la commande au tableau (None si elle n'est plus en attente). """
+        if order not in self.waiting_orders:
+            return None
+        index = self.waiting_orders.index(order)
+        return (_BOARD_LEFT + index * _BOARD_SPACING + _ORDER_WIDTH / 2, _BOARD_TOP + _ORDER_HEIGHT / 2)
+
+    def spawn_orders(self, model: arrivals.ArrivalModel) -> timers.Routine:
+        """ Routine qui fait arriver les commandes selon le modèle d'arrivée. """
+        delay = model.first_gap(self.acceleration)
+        while delay is not None:
+            yield delay
+            meal, expiration_time = model.next_order()
+            order = _random_order(self.now) if meal is None else _meal_order(self.now, meal)
+            order.deadline = expiration_time or self.deadlines.draw()
+            if missing := self.missing(order):
+                order.unservable = True
+                self.unservable_items.update(missing)
+            self.waiting_orders.append(order)
+            self.scheduler.start(self.__expire(order))
+            delay = model.next_gap(self.acceleration)
+
+    def deliver(self, order: _Order) -> None:
+        self.waiting_orders.remove(order)
+        self.latencies.append(self.now - order.arrival_time)
+        self.acceleration *= self.acceleration_increment
+
+    def __expire(self, order: _Order) -> timers.Routine:
+        """ Routine qui décompte le temps de livraison d'une commande. """
+        yield order.deadline
+        if order in self.waiting_orders:
+            self.waiting_orders.remove(order)
+            order.missed = True
+            if order.unservable:
+                self.unservable_orders += 1  # comptée à part : aucune brigade n'aurait pu la livrer
+            else:
+                self.missed_orders += 1
+
+
+class _Chef:
+    """
+    Chef cuisinier mené comme un bot de référence (voir bots.OrderBot) : il choisit la plus ancienne commande libre,
+    la prépare au complet sur une assiette et la livre.
+    """
+
+    def __init__(self, kitchen: _Kitchen, position: tuple) -> None:
+        self.__kitchen = kitchen
+        self.__position = position
+        self.__food = None  # nourriture transportée
+
+        self.__order = None
+        self.__platter = None
+        self.__assembly_station = None
+        self.__grill = self.__fryer = self.__cutting_station = self.__filling_station = None
+
+        self.__blocked = None  # type d'appareil attendu (aucun libre) lors de la dernière décision
+        self.__busy_since = None
+        self.busy_time = 0.0  # temps passé avec une commande
+
+    def run(self) -> timers.Routine:
+        """ Routine du chef : décider, marcher, interagir ou attendre, et recommencer. """
+        kitchen = self.__kitchen
+        while True:
+            self.__release_finished()
+            self.__blocked = None
+            where, interact = self.__decide() or (None, False)
+
+            if where is None:
+                delay = _POLL_TIME
+                if self.__blocked:
+                    kitchen.station_wait[self.__blocked] = kitchen.station_wait.get(self.__blocked, 0.0) + delay
+                yield delay
+                continue
+
+            target = where if isinstance(where, tuple) else where.center
+            distance = max(abs(target[0] - self.__position[0]), abs(target[1] - self.__position[1]))
+            if distance > _ARRIVAL_TOLERANCE:
+                walked = min(distance / _CHEF_SPEED, _REPLAN_TIME)
+                step = walked * _CHEF_SPEED  # chaque axe avance d'au plus ce pas
+                self.__position = tuple(position + max(-step, min(step, goal - position))
+                                        for position, goal in zip(self.__position, target))
+                yield walked
+            elif interact:
+                self.__interact(where)
+                yield _INTERACTION_TIME
+            else:
+                # attendre sur place ce qui est en cours, au plus jusqu'à ce que ce soit prêt
+                ready_times = [station.ready_time for station in self.__stations() if station.food is not None]
+                yield max(_INTERACTION_TIME, min([_POLL_TIME] + [t - kitchen.now for t in ready_times]))
+
+    def finish(self, now: float) -> None:
+        """ Termine la simulation : cumule le temps de la commande en cours. """
+        if self.__busy_since is not None:
+            self.busy_time += now - self.__busy_since
+            self.__busy_since = None
+
+    ############################################ réservations ############################################
+
+    def __claim_order(self) -> bool:
+        """
+        Garde la commande en cours ou réserve la plus ancienne commande libre que la disposition permet de préparer,
+        avec une assiette et une station d'assemblage.
+        """
+        kitchen = self.__kitchen
+        if self.__order and not self.__order.missed and self.__order in kitchen.waiting_orders:
+            return True
+        if self.__order:
+            self.__abandon()
+
+        for order in kitchen.waiting_orders:
+            if order in kitchen.reservations or order.unservable:
+                continue
+
+            platter = kitchen.closest(self.__position, 'Platter', lambda p: p.is_free(), self)
+            assembly_station = kitchen.closest(self.__position, 'AssemblyStation', lambda a: a.is_free(), self)
+            if not platter or not assembly_station:
+                self.__blocked = 'Platter' if not platter else 'AssemblyStation'
+                return False
+
+            self.__order, self.__platter, self.__assembly_station = order, platter, assembly_station
+            kitchen.reservations.add(order)
+            for station in (platter, assembly_station):
+                station.owner = self
+                station.occupy(kitchen.now)
+            self.__busy_since = kitchen.now
+            return True
+
+        return False
+
+    def __abandon(self) -> None:
+        """ Abandonne la commande (livrée ou expirée) : vide et libère tout ce qu'elle occupait. """
+        now = self.__kitchen.now
+        self.__kitchen.reservations.discard(self.__order)
+        for station in self.__stations() + [self.__platter, self.__assembly_station]:
+            if station and station.owner is self:
+                station.clear(now)
+        if self.__order.missed:
+            self.__food = None  # jeté
+        self.finish(now)
+
+        self.__order = self.__platter = self.__assembly_station = None
+        self.__grill = self.__fryer = self.__cutting_station = self.__filling_station = None
+
+    def __release_finished(self) -> None:
+        """ Oublie les appareils qui ont été vidés (nourriture récupérée). """
+        if self.__grill and self.__grill.is_free():
+            self.__grill.owner = self.__grill = None
+        if self.__fryer and self.__fryer.is_free():
+            self.__fryer.owner = self.__fryer = None
+        if self.__cutting_station and self.__cutting_station.is_free():
+            self.__cutting_station.owner = self.__cutting_station = None
+        if self.__filling_station and self.__filling_station.is_free():
+            self.__filling_station.owner = self.__filling_station = None
+
+    def __stations(self) -> list:
+        return [station for station in (self.__grill, self.__fryer, self.__cutting_station, self.__filling_station)
+                if station]
+
+    ############################################ décisions ############################################
+
+    def __decide(self) -> tuple or None:
+        """
+        Choisit où aller et s'il faut interagir une fois arrivé (comme bots.OrderBot).
+        :return: (appareil ou position, interagir) ou None pour attendre sur place
+        """
+        kitchen, now = self.__kitchen, self.__kitchen.now
+        if not self.__claim_order():
+            return (kitchen.trash, True) if self.__food else None
+
+        if self.__food:
+            return self.__place(self.__food)
+
+        order, platter = self.__order, self.__platter
+        needs_burger = 'BURGER' not in platter.contents
+        needs_beverage = order.beverage is not None and 'BEVERAGE' not in platter.contents
+        needs_fries = order.fries and 'FRIES' not in platter.contents
+
+        if not (needs_burger or needs_beverage or needs_fries):
+            return platter, True
+
+        # récupérer d'abord ce qui risque de brûler, puis ce qui est prêt
+        for station in (self.__fryer, self.__grill, self.__cutting_station, self.__filling_station):
+            if station and station.is_ready(now):
+                return station, True
+
+        # lancer ensuite les préparations les plus longues
+        if needs_beverage and not self.__filling_station:
+            filling_station = kitchen.closest(self.__position, 'FillingStation',
+                                              lambda f: f.is_free() and f.value == order.beverage, self)
+            if filling_station:
+                return filling_station, True
+        if needs_fries and not self.__fryer and not self.__cutting_station:
+            return self.__fetch('POTATO_SLICES')
+
+        if needs_burger:
+            burger = self.__assembly_station.contents
+            if burger and burger[-1] == 'TOP_BUN':
+                return self.__assembly_station, True
+            return self.__fetch(self.__next_burger_ingredient(burger))
+
+        # rien d'autre à faire : attendre près de ce qui est en cours
+        stations = self.__stations()
+        return (stations[0], False) if stations else None
+
+    def __next_burger_ingredient(self, burger: list) -> str:
+        """ Prochain ingrédient à ajouter au hambourgeois en cours d'assemblage pour respecter la commande. """
+        for ingredient in ('BOTTOM_BUN', 'COOKED_PATTY') + self.__order.toppings:
+            if ingredient not in burger:
+                return ingredient
+        return 'TOP_BUN'
+
+    def __fetch(self, ingredient: str) -> tuple or None:
+        """ Va chercher (ou attend) un ingrédient, en passant par le grill ou la découpe s'il le faut. """
+        if ingredient == 'COOKED_PATTY':
+            if self.__grill:
+                return self.__grill, False
+            ingredient = 'RAW_PATTY'
+        elif ingredient in _CUT_FROM:
+            if self.__cutting_station:
+                return self.__cutting_station, False  # une seule découpe à la fois
+            ingredient = _CUT_FROM[ingredient]
+
+        fridge = self.__kitchen.closest(self.__position, 'Fridge', lambda f: f.value == ingredient, self)
+        return (fridge, True) if fridge else None
+
+    def __place(self, food: str) -> tuple or None:
+        """ Choisit où déposer la nourriture transportée (la poubelle si elle ne sert à rien). """
+        kitchen, order, platter = self.__kitchen, self.__order, self.__platter
+
+        if food == 'MEAL':
+            position = kitchen.order_position(order)
+            return (position, True) if position else None
+        if food in ('BURGER', 'FRIES') or food == ('BEVERAGE', order.beverage):
+            name = food if isinstance(food, str) else 'BEVERAGE'
+            if name not in platter.contents and (name != 'FRIES' or order.fries):
+                return platter, True
+        elif food == 'RAW_PATTY':
+            return self.__use_free('Grill')
+        elif food == 'POTATO_SLICES':
+            return self.__use_free('Fryer')
+        elif food in _CUT_INTO:
+            return self.__use_free('CuttingStation')
+        elif _fits(self.__assembly_station.contents, food):
+            return self.__assembly_station, True
+
+        return kitchen.trash, True
+
+    def __use_free(self, kind: str) -> tuple or None:
+        """ Se dirige vers l'appareil libre le plus proche du type donné (attend sur place s'il n'y en a pas). """
+        station = self.__kitchen.closest(self.__position, kind, lambda s: s.is_free(), self)
+        if not station:
+            self.__blocked = kind
+            return None
+        return station, True
+
+    ############################################ interactions ############################################
+
+    def __interact(self, where) -> None:
+        """ Interagit avec l'appareil (ou la commande au tableau) où se trouve le chef. """
+        kitchen, now, food = self.__kitchen, self.__kitchen.now, self.__food
+
+        if isinstance(where, tuple):
+            if food == 'MEAL' and self.__order in kitchen.waiting_orders:
+                kitchen.deliver(self.__order)
+                self.__food = None
+                self.__abandon()
+            return
+
+        kind = where.kind
+        if kind == 'Trash':
+            self.__food = None
+        elif kind == 'Fridge':
+            if food is None:
+                self.__food = where.value
+        elif kind in ('Grill', 'Fryer', 'CuttingStation', 'FillingStation'):
+            if food is None and where.is_ready(now):
+                self.__food = where.take(now)
+            elif where.is_free() and self.__start(where, food):
+                where.owner = self
+                where.occupy(now)
+                self.__food = None
+                self.__remember(where)
+        elif kind == 'AssemblyStation':
+            if food is None and where.contents and where.contents[-1] == 'TOP_BUN':
+                where.contents = []
+                self.__food = 'BURGER'
+            elif food and _fits(where.contents, food):
+                where.contents.append(food)
+                self.__food = None
+        elif kind == 'Platter':
+            if food is None and self.__platter_complete():
+                where.contents = []
+                self.__food = 'MEAL'
+            elif food in ('BURGER', 'FRIES') or (isinstance(food, tuple) and food[0] == 'BEVERAGE'):
+                name = food if isinstance(food, str) else 'BEVERAGE'
+                if name not in where.contents:
+                    where.contents.append(name)
+                    self.__food = None
+
+    def __start(self, station: _Station, food: str or None) -> bool:
+        """ Lance une préparation sur un appareil libre, si la nourriture transportée s'y prête. """
+        now = self.__kitchen.now
+        if station.kind == 'Grill' and food == 'RAW_PATTY':
+            station.food = 'COOKED_PATTY'
+            station.ready_time = now + settings.GRILL_COOKING_TIME
+            station.burn_time = station.ready_time + settings.GRILL_OVERCOOKING_TIME
+        elif station.kind == 'Fryer' and food == 'POTATO_SLICES':
+            station.food = 'FRIES'
+            station.ready_time = now + settings.FRYING_TIME
+            station.burn_time = station.ready_time + settings.OVERFRYING_TIME
+        elif station.kind == 'CuttingStation' and food in _CUT_INTO:
+            station.food = _CUT_INTO[food]
+            station.ready_time = now + settings.CUTTING_TIME
+        elif station.kind == 'FillingStation' and food is None:
+            station.food = 'BEVERAGE', station.value
+            station.ready_time = now + settings.FILLING_TIME
+        else:
+            return False
+        return True
+
+    def __remember(self, station: _Station) -> None:
+        """ Retient l'appareil où le chef vient de laisser quelque chose en cours. """
+        if station.kind == 'Grill':
+            self.__grill = station
+        elif station.kind == 'Fryer':
+            self.__fryer = station
+        elif station.kind == 'CuttingStation':
+            self.__cutting_station = station
+        else:
+            self.__filling_station = station
+
+    def __platter_complete(self) -> bool:
+        order, contents = self.__order, self.__platter.contents
+        return ('BURGER' in contents and (order.beverage is None or 'BEVERAGE' in contents)
+                and (not order.fries or 'FRIES' in contents))
+
+
+def _fits(burger: list, ingredient: str) -> bool:
+    """ Vérifie si un ingrédient peut être ajouté au hambourgeois en cours d'assemblage (voir Burger). """
+    if ingredient not in _BURGER_BASE + _OPTIONS:
+        return False
+    if not burger:
+        return ingredient == 'BOTTOM_BUN'
+    if ingredient == 'BOTTOM_BUN' or 'TOP_BUN' in burger:
+        return False
+    if len(burger) == 1:
+        return ingredient == 'COOKED_PATTY'
+    return True
+
+
+def _random_order(now: float) -> _Order:
+    """ Tire une commande au hasard, avec les mêmes probabilités que le jeu (voir orders.Order). """
+    toppings = random.sample(_OPTIONS, k=random.randint(0, len(_OPTIONS)))
+    toppings.sort(key=lambda ingredient: ingredient != 'CHEESE_SLICE')  # le fromage d'abord, sur la boulette
+    beverage = random.choice(_BEVERAGES) if random.randint(0, 100) <= settings.PROBABILITY_FOR_BEVERAGE else None
+    fries = random.randint(0, 100) <= settings.PROBABILITY_FOR_FRIES
+    return _Order(now, 0.0, tuple(toppings), beverage, fries)
+
+
+def _meal_order(now: float, meal) -> _Order:
+    """ Décrit une commande dont le repas est fourni par le modèle d'arrivée (ex.: une trace, voir order_trace). """
+    burger = [ingredient.ingredient_type().name for ingredient in meal.burger.ingredients] if meal.burger else []
+    toppings = tuple(ingredient for ingredient in burger if ingredient not in _BURGER_BASE)
+    beverage = meal.beverage.beverage_type().name if meal.beverage else None
+    return _Order(now, 0.0, toppings, beverage, meal.fries is not None)
+
+
+def _load_layout(path: str) -> list:
+    """
+    Lit une disposition de cuisine (voir kitchen_layout, qui la valide au chargement du jeu).
+    :param path: chemin du fichier de disposition (JSON)
+    :return: appareils de la cuisine
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            layout = json.load(file)
+        stations = []
+        for entry in layout['stations']:
+            kind, width, height = _STATION_TYPES[entry['type']]
+            count = entry.get('count', 1)
+            step_x, step_y = entry.get('step', (0, 0))
+            values = entry.get(_PARAMETERS.get(entry['type'], ''), None)
+            values = values if isinstance(values, list) else [values] * count
+            for i in range(count):
+                x, y = entry['pos'][0] + i * step_x, entry['pos'][1] + i * step_y
+                stations.append(_Station(kind, (x + width / 2, y + height / 2), values[i]))
+    except (OSError, ValueError, KeyError, TypeError, IndexError) as error:
+        raise PlannerError(f"{path} : impossible de lire la disposition ({error})") from None
+
+    if sum(station.kind == 'Trash' for station in stations) != 1:
+        raise PlannerError(f"{path} : une cuisine doit avoir exactement une poubelle")
+    return stations
+
+
+def _chef_positions(count: int) -> list:
+    """ Positions initiales des chefs cuisiniers (comme Game). """
+    positions = []
+    for i in range(count):
+        row, column = divmod(i, _CHEFS_PER_ROW)
+        columns = min(count - row * _CHEFS_PER_ROW, _CHEFS_PER_ROW)
+        offset = (row + 1) // 2 * (1 if row % 2 else -1) * _CHEF_ROW_SPACING
+        positions.append((settings.SCREEN_WIDTH * (2 + (column - (columns - 1) / 2) * 0.2) / 4,
+                          settings.SCREEN_HEIGHT * (2 / 4) + offset))
+    return positions
+
+
+def simulate(layout: str, chef_count: int, arrival_model: arrivals.ArrivalModel,
+             deadline_model: arrivals.DeadlineModel, duration: float, acceleration: float = 1.0) -> dict:
+    """
+    Simule une cuisine pendant la durée spécifiée (les nombres aléatoires viennent du générateur du module random).
+    :param layout: fichier de disposition de la cuisine
+    :param chef_count: nombre de chefs cuisiniers
+    :param arrival_model: modèle d'arrivée des commandes (voir arrivals)
+    :param deadline_model: modèle de délais de livraison des commandes (voir arrivals)
+    :param duration: durée simulée (en secondes)
+    :param acceleration: facteur d'accélération des commandes à chaque livraison (1.0 pour une charge constante)
+    :return: livraisons, commandes manquées, commandes impossibles à préparer (et ce qui manquait), latences, temps
+             occupé et nombre de chaque type d'appareil, temps d'attente par type d'appareil et temps occupé des chefs
+    """
+    kitchen = _Kitchen(_load_layout(layout), acceleration, deadline_model)
+    chefs = [_Chef(kitchen, position) for position in _chef_positions(chef_count)]
+
+    arrival_model.reset()
+    kitchen.scheduler.start(kitchen.spawn_orders(arrival_model))
+    for chef in chefs:
+        kitchen.scheduler.start(chef.run())
+    kitchen.scheduler.advance(duration)
+
+    busy_time, station_count = {}, {}
+    for station in kitchen.stations:
+        if station.kind in _MEASURED:
+            station.clear(duration)  # ferme l'occupation en cours
+            busy_time[station.kind] = busy_time.get(station.kind, 0.0) + station.busy_time
+            station_count[station.kind] = station_count.get(station.kind, 0) + 1
+    for chef in chefs:
+        chef.finish(duration)
+
+    return {'duration': duration, 'delivered_orders': len(kitchen.latencies), 'missed_orders': kitchen.missed_orders,
+            'unservable_orders': kitchen.unservable_orders, 'unservable_items': sorted(kitchen.unservable_items),
+            'latencies': kitchen.latencies, 'busy_time': busy_time, 'station_count': station_count,
+            'station_wait': kitchen.station_wait, 'chef_busy_time': sum(chef.busy_time for chef in chefs),
+            'chef_count': chef_count}
+
+
+def __run_replication(replication: tuple) -> dict:
+    """
+    Simule une réplication (dans un processus du bassin).
+    :param replication: germe aléatoire, disposition, nombre de chefs, spécifications des modèles d'arrivée et de
+                        délais, durée (en secondes), facteur d'accélération
+    :return: résultats de la simulation (voir simulate)
+    """
+    seed, layout, chef_count, arrivals_spec, deadlines_spec, duration, acceleration = replication
+    random.seed(seed)
+    return simulate(layout, chef_count, arrivals.parse_arrivals(arrivals_spec),
+                    arrivals.parse_deadlines(deadlines_spec), duration, acceleration)
+
+
+def __percentile(values: list, percentage: float) -> float:
+    """ Retourne le percentile demandé d'une liste de valeurs triée (0.0 si la liste est vide). """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percentage / 100.0))]
+
+
+def __build_report(results: list) -> dict:
+    """
+    Agrège les réplications d'une configuration (disposition et nombre de chefs).
+    :param results: résultats de chaque réplication (voir simulate)
+    :return: rapport agrégé
+    """
+    hours = [result['duration'] / 3600.0 for result in results]
+
+    def per_hour(key: str) -> dict:
+        rates = [result[key] / hour for result, hour in zip(results, hours)]
+        return {'mean': statistics.fmean(rates), 'stdev': statistics.stdev(rates) if len(rates) > 1 else 0.0}
+
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+
+    utilization = {}
+    for name in sorted({name for result in results for name in result['busy_time']}):
+        utilization[name] = statistics.fmean(result['busy_time'].get(name, 0.0)
+                                             / (result['duration'] * result['station_count'][name])
+                                             for result in results if name in result['station_count'])
+    utilization['Chef'] = statistics.fmean(result['chef_busy_time'] / (result['duration'] * result['chef_count'])
+                                           for result in results)
+
+    station_wait = {}
+    for result, hour in zip(results, hours):
+        for name, wait in result['station_wait'].items():
+            station_wait[name] = station_wait.get(name, 0.0) + wait / hour / len(results)
+
+    # à égalité d'utilisation (une assiette est occupée aussi longtemps que le chef qui tient sa commande), la
+    # ressource que les chefs attendent est le goulot d'étranglement; sans attente, toutes celles à égalité le sont
+    highest = max(utilization.values())
+    tied = [name for name, value in utilization.items() if value >= highest - _BOTTLENECK_TOLERANCE]
+    awaited = sorted((name for name in tied if station_wait.get(name, 0.0) > 0.0), key=station_wait.get, reverse=True)
+    bottleneck = awaited or tied
+
+    return {
+        'replications': len(results),
+        'simulated_hours': sum(hours),
+        'delivered_orders_per_hour': per_hour('delivered_orders'),
+        'missed_orders_per_hour': per_hour('missed_orders'),
+        'unservable_orders_per_hour': per_hour('unservable_orders'),
+        'unservable_items': sorted({item for result in results for item in result['unservable_items']}),
+        'order_latency': {
+            'count': len(latencies),
+            'mean': statistics.fmean(latencies) if latencies else 0.0,
+            'p50': __percentile(latencies, 50),
+            'p90': __percentile(latencies, 90),
+            'p99': __percentile(latencies, 99),
+            'max': latencies[-1] if latencies else 0.0,
+        },
+        'utilization': utilization,
+        'station_wait_per_hour': station_wait,
+        'bottleneck': bottleneck,
+    }
+
+
+def __print_report(configuration: str, report: dict) -> None:
+    """ Affiche le rapport d'une configuration sous forme de texte. """
+    print(f"{configuration} ({report['replications']} réplications, {report['simulated_hours']:.1f} h simulées)")
+    for key, label in [('delivered_orders_per_hour', 'Commandes livrées / heure'),
+                       ('missed_orders_per_hour', 'Commandes manquées / heure'),
+                       ('unservable_orders_per_hour', 'Commandes impossibles / h')]:
+        print(f"  {label:<28}{report[key]['mean']:10.2f} ± {report[key]['stdev']:.2f}")
+    if report['unservable_items']:
+        print(f"  ATTENTION : la disposition ne permet pas de préparer toutes les commandes, il manque "
+              f"{', '.join(report['unservable_items'])}")
+
+    latency = report['order_latency']
+    print(f"  Latence des commandes (s)   moyenne {latency['mean']:.1f}, p50 {latency['p50']:.1f}, "
+          f"p90 {latency['p90']:.1f}, p99 {latency['p99']:.1f}, max {latency['max']:.1f}")
+
+    print("  Utilisation                              attente d'un appareil libre")
+    for name, utilization in report['utilization'].items():
+        wait = report['station_wait_per_hour'].get(name)
+        wait = f"{wait / 60.0:8.1f} min/h" if wait is not None else ''
+        print(f"    {name:<24}{utilization * 100.0:9.1f} %{wait}")
+    print(f"  Goulot d'étranglement       {', '.join(report['bottleneck'])}")
+
+
+def __capacity_planner() -> None:
+    """ Point d'entrée de la ligne de commande. """
+    parser = argparse.ArgumentParser(description="Planificateur de capacité : simulation à événements discrets d'une "
+                                                 "cuisine, sans affichage")
+    parser.add_argument('--layout', nargs='+', default=[settings.KITCHEN_LAYOUT],
+                        help='fichier(s) de disposition de la cuisine à comparer')
+    parser.add_argument('--chefs', type=int, nargs='+', default=[2], help='nombre(s) de chefs cuisiniers à comparer')
+    parser.add_argument('--arrivals', default='uniform',
+                        help="modèle d'arrivée des commandes (ex.: poisson:rate=2,cap=3, voir arrivals.py)")
+    parser.add_argument('--deadlines', default='uniform',
+                        help='modèle de délais de livraison des commandes (ex.: fixed:time=120, voir arrivals.py)')
+    parser.add_argument('--duration', type=float, default=3600.0, help='durée de chaque réplication (en secondes)')
+    parser.add_argument('--replications', type=int, default=20, help='nombre de réplications par configuration')
+    parser.add_argument('--acceleration', type=float, default=1.0,
+                        help="facteur d'accélération des commandes à chaque livraison (1.0 : charge constante)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help='germe de la première réplication (les suivantes incrémentent)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='nombre de processus de simulation')
+    parser.add_argument('--json', action='store_true', help='affiche le rapport en JSON')
+    arguments = parser.parse_args()
+    try:
+        arrivals.parse_arrivals(arguments.arrivals)
+        arrivals.parse_deadlines(arguments.deadlines)
+        for layout in arguments.layout:
+            _load_layout(layout)
+    except (arrivals.ModelError, PlannerError) as error:
+        parser.error(str(error))
+
+    configurations = [(layout, chef_count) for layout in arguments.layout for chef_count in arguments.chefs]
+    replications = [(arguments.seed + i, layout, chef_count, arguments.arrivals, arguments.deadlines,
+                     arguments.duration, arguments.acceleration)
+                    for layout, chef_count in configurations for i in range(arguments.replications)]
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=arguments.workers) as executor:
+        results = list(executor.map(__run_replication, replications,
+                                    chunksize=max(1, len(replications) // (arguments.workers * 4))))
+    wall_time = time.perf_counter() - start_time
+
+    count = arguments.replications
+    reports = {f'{layout}, {chef_count} chef(s)': __build_report(results[i * count:(i + 1) * count])
+               for i, (layout, chef_count) in enumerate(configurations)}
+    simulated_hours = len(replications) * arguments.duration / 3600.0
+    if arguments.json:
+        print(json.dumps({'simulated_hours': simulated_hours, 'wall_time': wall_time,
+                          'speedup': simulated_hours * 3600.0 / wall_time if wall_time > 0 else 0.0,
+                          'configurations': reports}, indent=2))
+    else:
+        print(f"{simulated_hours:.1f} h simulées en {wall_time:.1f} s "
+              f"({simulated_hours * 3600.0 / wall_time if wall_time > 0 else 0.0:.0f}x le temps réel)\n")
+        for configuration, report in reports.items():
+            __print_report(configuration, report)
+            print()
+
+
+if __name__ == '__main__':
+    __capacity_planner()
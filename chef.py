@@ -1,5 +1,10 @@
+import numpy as np
 import pygame
+import events
+import metrics
+import surface_pool
 import settings
+import snapshot
 from typing import Union, List
 from food import Food
 from ingredients import Ingredient, IngredientType
@@ -13,22 +18,35 @@ class Chef(pygame.sprite.Sprite):
     Chef cuisinier contrôlé par le joueur.
     """
 
-    __FACING_UP = 0
-    __FACING_RIGHT = 1
-    __FACING_DOWN = 2
-    __FACING_LEFT = 3
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('Chef')  # compteur des reconstructions d'images
 
-    __SPEED = 3
+    FACING_UP = 0
+    FACING_RIGHT = 1
+    FACING_DOWN = 2
+    FACING_LEFT = 3
 
-    def __init__(self, pos: tuple) -> None:
+    __SPEED = settings.CHEF_SPEED
+
+    # orientation selon la direction de déplacement (indice : 3 * horizontale + verticale + 4), -1 pour l'immobilité
+    __FACINGS_BY_DIRECTION = np.array([FACING_LEFT, FACING_LEFT, FACING_LEFT,
+                                       FACING_UP, -1, FACING_DOWN,
+                                       FACING_RIGHT, FACING_RIGHT, FACING_RIGHT], dtype=np.int32)
+
+    def __init__(self, pos: tuple, state: tuple = None) -> None:
         """
         Initialise le chef cuisinier.
         :param pos: position du chef cuisinier à l'écran
+        :param state: vues (position, déplacement, orientation) sur les tableaux de la brigade à laquelle appartient
+                      le chef (voir Brigade), None pour un chef seul
         """
         super().__init__()
 
-        self.__facing = Chef.__FACING_DOWN
-        self.__walking = 0, 0
+        if state is None:
+            state = np.zeros(2, dtype=np.int32), np.zeros(2, dtype=np.int32), np.zeros(1, dtype=np.int32)
+        # coin supérieur gauche, direction de déplacement (-1, 0 ou 1 sur chaque axe) et orientation
+        self.__position, self.__walking, self.__facing = state
+        self.__walking[:] = 0
+        self.__facing[0] = Chef.FACING_DOWN
 
         self.__food = None  # nourriture transportée par le chef cuisinier
 
@@ -38,11 +56,12 @@ class Chef(pygame.sprite.Sprite):
         self.is_moving_right = False
 
         self.__surfaces = self.__build_surfaces()
-        self.image = self.__surfaces[self.__facing]
+        self.image = self.__surfaces[self.__facing[0]]
 
         self.rect = self.image.get_rect()
         self.rect.x = pos[0] - self.rect.width / 2
         self.rect.y = pos[1] - self.rect.height / 2
+        self.__position[:] = self.rect.topleft
 
         self.__sprite_group = pygame.sprite.GroupSingle()
         self.__sprite_group.add(self)
@@ -66,13 +85,39 @@ class Chef(pygame.sprite.Sprite):
         """
 
         self.rect.x, self.rect.y = initial_position
+        self.__position[:] = self.rect.topleft
 
-        self.__facing = Chef.__FACING_DOWN
+        self.__walking[:] = 0
+        self.__facing[0] = Chef.FACING_DOWN
         self.is_moving_up = self.is_moving_down = False
         self.is_moving_left = self.is_moving_right = False
         self.drop_food()
 
-        self.image = self.__surfaces[self.__facing]
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état du chef cuisinier (voir Game.snapshot).
+        :return: état du chef
+        """
+        moving = self.is_moving_up, self.is_moving_down, self.is_moving_left, self.is_moving_right
+        return (tuple(self.__position.tolist()), tuple(self.__walking.tolist()), int(self.__facing[0]), moving,
+                snapshot.encode_food(self.__food))
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état du chef cuisinier (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        position, walking, facing, moving, food = state
+        self.__position[:] = position
+        self.__walking[:] = walking
+        self.__facing[0] = facing
+        self.is_moving_up, self.is_moving_down, self.is_moving_left, self.is_moving_right = moving
+
+        self.drop_food()
+        if food is not None:
+            self.grab_food(snapshot.decode_food(food))
+        self.sync()
 
     ########################################## C1 ##########################################
 
@@ -145,7 +190,11 @@ class Chef(pygame.sprite.Sprite):
         :return: nourriture abandonnée ou None si le cuisinier n'en avait pas
         """
         food, self.__food = self.__food, None
+        if food is not None:
+            events.bus.publish(events.EventType.FOOD_DROPPED, chef=self, food=food)
+        surface_pool.pool.release(*self.__surfaces)
         self.__surfaces = self.__build_surfaces()
+        self.image = self.__surfaces[self.__facing[0]]
         return food
 
     def grab_food(self, food: Food) -> None:
@@ -156,7 +205,11 @@ class Chef(pygame.sprite.Sprite):
         """
         if not self.__food:
             self.__food = food
+            if food is not None:
+                events.bus.publish(events.EventType.FOOD_PICKED, chef=self, food=food)
+            surface_pool.pool.release(*self.__surfaces)
             self.__surfaces = self.__build_surfaces(self.__food)
+            self.image = self.__surfaces[self.__facing[0]]
 
     ########################################## R2 ##########################################
 
@@ -187,48 +240,71 @@ class Chef(pygame.sprite.Sprite):
         Déplace le chef horizontalement.
         :param direction: -1 pour gauche, 1 pour droite
         """
-        self.__walking = direction, self.__walking[1]
+        self.__walking[0] = direction
         if direction != 0:
-            self.__facing = Chef.__FACING_LEFT if direction < 0 else Chef.__FACING_RIGHT
+            self.__facing[0] = Chef.FACING_LEFT if direction < 0 else Chef.FACING_RIGHT
+            self.image = self.__surfaces[self.__facing[0]]
 
     def move_vertical(self, direction):
         """
         Déplace le chef verticalement.
         :param direction: -1 pour haut, 1 pour bas
         """
-        self.__walking = self.__walking[0], direction
+        self.__walking[1] = direction
         if direction != 0:
-            self.__facing = Chef.__FACING_UP if direction < 0 else Chef.__FACING_DOWN
+            self.__facing[0] = Chef.FACING_UP if direction < 0 else Chef.FACING_DOWN
+            self.image = self.__surfaces[self.__facing[0]]
 
 
     ########################################## C2 et C3 ##########################################
 
     def update(self):
         """
-        Ajuste l'apparence et la position du chef cuisinier.
+        Ajuste l'apparence et la position du chef cuisinier. Les chefs d'une brigade sont plutôt déplacés tous
+        ensemble par Brigade.update.
         """
-        new_x = self.rect.x + self.__walking[0] * self.__SPEED
-        new_y = self.rect.y + self.__walking[1] * self.__SPEED
+        limits = np.array([settings.SCREEN_WIDTH - self.rect.width, settings.SCREEN_HEIGHT - self.rect.height])
+        if Chef.walk(self.__position[np.newaxis], self.__walking[np.newaxis], self.__facing, limits)[0]:
+            self.sync()
+
+    def sync(self) -> None:
+        """
+        Recopie la position et l'orientation (tenues dans les tableaux) dans le rectangle et l'image du sprite.
+        :return: aucun
+        """
+        self.rect.topleft = self.__position.tolist()
+        self.image = self.__surfaces[self.__facing[0]]
+
+    @staticmethod
+    def walk(positions: np.ndarray, walking: np.ndarray, facings: np.ndarray, limits: np.ndarray) -> np.ndarray:
+        """
+        Déplace d'un seul coup un ensemble de chefs cuisiniers et ajuste leur orientation (modifie les tableaux).
+        :param positions: coins supérieurs gauches des chefs (N x 2)
+        :param walking: directions de déplacement des chefs, -1, 0 ou 1 sur chaque axe (N x 2)
+        :param facings: orientations des chefs (N)
+        :param limits: positions maximales permises sur chaque axe (2 ou N x 2)
+        :return: masque des chefs dont la position ou l'orientation a changé (N)
+        """
+        if not walking.any():
+            return np.zeros(len(positions), dtype=bool)  # personne ne marche : rien ne change
+
+        new_positions = positions + walking * Chef.__SPEED
 
     ########################################## C2 ##########################################
-        # Limiter le mouvement pour empêcher le chef de sortir de l'écran
-        if 0 <= new_x <= settings.SCREEN_WIDTH - self.rect.width:
-            self.rect.x = new_x
-        if 0 <= new_y <= settings.SCREEN_HEIGHT - self.rect.height:
-            self.rect.y = new_y
+        # Limiter le mouvement pour empêcher le chef de sortir de l'écran (chaque axe séparément)
+        outside = (new_positions < 0) | (new_positions > limits)
+        np.copyto(new_positions, positions, where=outside)
 
     ########################################## C2 ##########################################
 
-        if self.__walking[0] < 0:
-            self.__facing = Chef.__FACING_LEFT
-        elif self.__walking[0] > 0:
-            self.__facing = Chef.__FACING_RIGHT
-        elif self.__walking[1] < 0:
-            self.__facing = Chef.__FACING_UP
-        elif self.__walking[1] > 0:
-            self.__facing = Chef.__FACING_DOWN
+        # l'orientation suit la direction horizontale en priorité, puis la verticale
+        new_facings = Chef.__FACINGS_BY_DIRECTION[walking[:, 0] * 3 + walking[:, 1] + 4]
+        new_facings = np.where(new_facings < 0, facings, new_facings)
 
-        self.image = self.__surfaces[self.__facing]
+        changed = (new_positions != positions).any(axis=1) | (new_facings != facings)
+        positions[:] = new_positions
+        facings[:] = new_facings
+        return changed
 
     ########################################## C2 et C3 ##########################################
 
@@ -241,44 +317,45 @@ class Chef(pygame.sprite.Sprite):
         :param food: nourriture à ajouter aux images (None si rien à ajouter)
         :return: liste des images construites
         """
+        Chef.__SURFACE_REBUILDS.inc()
         surfaces_rect = pygame.Rect(0, 0, 40, 40)
-        surfaces = [pygame.Surface(surfaces_rect.size, flags=pygame.SRCALPHA).convert_alpha() for _ in range(4)]
+        surfaces = [surface_pool.pool.acquire(surfaces_rect.size) for _ in range(4)]
 
         if food:
             x = surfaces_rect.width - food.width()
             y = (surfaces_rect.height - food.height()) / 2
-            food.draw(surfaces[Chef.__FACING_UP], (x, y))
+            food.draw(surfaces[Chef.FACING_UP], (x, y))
 
         uniform_rect = pygame.Rect(4, 4, 32, 32)
-        pygame.draw.rect(surfaces[Chef.__FACING_UP], settings.UNIFORM_COLOR, uniform_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_UP], settings.UNIFORM_COLOR, uniform_rect)
         hair_rect = pygame.Rect(4, 14, 32, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_UP], settings.HAIR_COLOR, hair_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_UP], settings.HAIR_COLOR, hair_rect)
 
-        pygame.draw.rect(surfaces[Chef.__FACING_RIGHT], settings.UNIFORM_COLOR, uniform_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_RIGHT], settings.UNIFORM_COLOR, uniform_rect)
         hair_rect = pygame.Rect(4, 14, 16, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_RIGHT], settings.HAIR_COLOR, hair_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_RIGHT], settings.HAIR_COLOR, hair_rect)
         skin_rect = pygame.Rect(20, 14, 16, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_RIGHT], settings.SKIN_COLOR, skin_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_RIGHT], settings.SKIN_COLOR, skin_rect)
 
-        pygame.draw.rect(surfaces[Chef.__FACING_DOWN], settings.UNIFORM_COLOR, uniform_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_DOWN], settings.UNIFORM_COLOR, uniform_rect)
         hair_rect = pygame.Rect(4, 14, 32, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_DOWN], settings.HAIR_COLOR, hair_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_DOWN], settings.HAIR_COLOR, hair_rect)
         skin_rect = pygame.Rect(8, 14, 24, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_DOWN], settings.SKIN_COLOR, skin_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_DOWN], settings.SKIN_COLOR, skin_rect)
 
         if food:
             x = surfaces_rect.width - food.width()
             y = (surfaces_rect.height - food.height()) / 2
-            food.draw(surfaces[Chef.__FACING_RIGHT], (x, y))
+            food.draw(surfaces[Chef.FACING_RIGHT], (x, y))
             x = 0
-            food.draw(surfaces[Chef.__FACING_DOWN], (x, y))
-            food.draw(surfaces[Chef.__FACING_LEFT], (x, y))
+            food.draw(surfaces[Chef.FACING_DOWN], (x, y))
+            food.draw(surfaces[Chef.FACING_LEFT], (x, y))
 
-        pygame.draw.rect(surfaces[Chef.__FACING_LEFT], settings.UNIFORM_COLOR, uniform_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_LEFT], settings.UNIFORM_COLOR, uniform_rect)
         hair_rect = pygame.Rect(20, 14, 16, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_LEFT], settings.HAIR_COLOR, hair_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_LEFT], settings.HAIR_COLOR, hair_rect)
         skin_rect = pygame.Rect(4, 14, 16, 14)
-        pygame.draw.rect(surfaces[Chef.__FACING_LEFT], settings.SKIN_COLOR, skin_rect)
+        pygame.draw.rect(surfaces[Chef.FACING_LEFT], settings.SKIN_COLOR, skin_rect)
 
         return surfaces
 
@@ -0,0 +1,372 @@
+"""
+Interface de contrôle locale.
+
+Petit serveur HTTP local (comme celui des métriques) qui permet aux outils externes (pilotes de test, tableaux de
+bord) de piloter et d'inspecter une partie sans être écrits en Python : faire avancer la simulation, donner des
+commandes aux chefs cuisiniers, lire le tableau des commandes, l'état des appareils et des chefs, les métriques, et
+prendre ou rétablir un instantané.
+
+Une requête POST /commands contient une liste de commandes JSON (ou une seule), exécutées dans l'ordre, en un seul
+aller-retour; la réponse contient le résultat de chacune, dans le même ordre : {"ok": true, "result": ...} ou
+{"ok": false, "error": "..."} (une commande en erreur n'empêche pas les suivantes). Les commandes sont exécutées
+depuis la tâche principale, entre deux trames : elles voient toujours une partie cohérente.
+
+    {"command": "step", "ticks": 90}                                fait avancer la partie (seulement sans affichage)
+    {"command": "chef", "chef": 0, "action": "left", "pressed": true}  commande de chef (voir Game.CHEF_EVENT)
+    {"command": "game"}                                             pourboires, commandes ratées, fin de partie
+    {"command": "orders"}                                           commandes affichées et en attente
+    {"command": "stations"}                                         appareils, leur état, nourriture et avancement
+    {"command": "chefs"}                                            chefs, leur position et la nourriture transportée
+    {"command": "metrics"}                                          valeur de chaque métrique (voir metrics)
+    {"command": "snapshot"}                                         instantané de la partie (base64)
+    {"command": "restore", "snapshot": "..."}                       rétablit un instantané (voir Game.restore)
+
+Une partie affichée (python undercooked.py --control-port 8765) avance en temps réel : les commandes sont exécutées au
+début de la trame suivante (jamais pendant la pause) et step n'est pas permis. Une partie sans affichage
+(python control.py --port 8765) n'avance que par step, en temps simulé.
+
+Exemple : curl -d '[{"command": "step", "ticks": 900}, {"command": "orders"}]' http://127.0.0.1:8765/commands
+"""
+import argparse
+import base64
+import concurrent.futures
+import http.server
+import json
+import os
+import queue
+import threading
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
+import pygame
+
+import metrics
+import settings
+import shared_state
+import snapshot
+import timers
+from assembly_station import AssemblyStation
+from beverage import Beverage
+from burger import Burger
+from cutting_station import CuttingStation
+from filling_station import FillingStation
+from fries import Fries
+from fryer import Fryer
+from game import Game
+from grill import Grill
+from ingredients import Ingredient
+from meal import Meal
+from platter import Platter
+
+
+class ControlError(ValueError):
+    """
+    Commande de contrôle invalide.
+    """
+    pass
+
+
+_CHEF_ACTIONS = ('left', 'right', 'up', 'down', 'interact')
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """ Requêtes HTTP du serveur de contrôle : POST /commands seulement. """
+
+    def do_POST(self) -> None:
+        if self.path.split('?')[0] != '/commands':
+            self.send_error(404)
+            return
+
+        try:
+            commands = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+        except ValueError:
+            self.send_error(400, 'JSON invalide')
+            return
+
+        try:
+            results = self.server.control.submit(commands if isinstance(commands, list) else [commands])
+        except concurrent.futures.TimeoutError:
+            self.send_error(503, 'la partie ne traite pas les commandes (pause ou arrêt)')
+            return
+
+        body = json.dumps(results if isinstance(commands, list) else results[0]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # pas de journal à chaque requête
+
+
+class ControlServer:
+    """
+    Serveur de contrôle : reçoit les lots de commandes dans une tâche en arrière-plan et les exécute depuis la tâche
+    principale (voir process).
+    """
+
+    RESPONSE_TIMEOUT = 5.0  # temps (en secondes) d'attente de l'exécution d'un lot avant de répondre en erreur
+
+    # événement Pygame qui réveille la boucle principale quand un lot de commandes arrive (voir scenes)
+    WAKE_EVENT = pygame.event.custom_type()
+
+    def __init__(self, port: int, host: str = '127.0.0.1', simulated_timers: timers.SimulatedTimers = None) -> None:
+        """
+        Démarre le serveur de contrôle dans une tâche en arrière-plan.
+        :param port: port d'écoute (0 pour un port libre, voir port)
+        :param host: adresse d'écoute (locale par défaut)
+        :param simulated_timers: minuteries simulées de la partie si c'est le serveur qui la fait avancer (commande
+                                 step), None pour une partie qui avance en temps réel
+        """
+        self.__simulated_timers = simulated_timers
+        self.__batches = queue.Queue()  # (commandes, résultat à remplir) en attente d'exécution
+
+        self.__server = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self.__server.daemon_threads = True
+        self.__server.control = self
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+
+    def submit(self, commands: list) -> list:
+        """
+        Soumet un lot de commandes et attend son exécution (appelée depuis les tâches du serveur HTTP).
+        :param commands: commandes (voir le module)
+        :return: résultat de chaque commande
+        """
+        result = concurrent.futures.Future()
+        self.__batches.put((commands, result))
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(ControlServer.WAKE_EVENT))
+        try:
+            return result.result(ControlServer.RESPONSE_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            result.cancel()  # le lot ne sera pas exécuté plus tard, à l'insu du client
+            raise
+
+    def process(self, game: Game, timeout: float = None) -> int:
+        """
+        Exécute les lots de commandes reçus (appelée depuis la tâche principale, entre deux trames).
+        :param game: partie contrôlée
+        :param timeout: temps (en secondes) d'attente d'un premier lot, None pour ne pas attendre
+        :return: nombre de lots exécutés
+        """
+        count = 0
+        try:
+            batch = self.__batches.get(timeout=timeout) if timeout else self.__batches.get_nowait()
+            while True:
+                commands, result = batch
+                if result.set_running_or_notify_cancel():
+                    result.set_result([self.__execute(game, command) for command in commands])
+                    count += 1
+                batch = self.__batches.get_nowait()
+        except queue.Empty:
+            return count
+
+    def close(self) -> None:
+        """ Arrête le serveur de contrôle. """
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    @property
+    def pending(self) -> bool:
+        """ True si des lots de commandes attendent d'être exécutés. """
+        return not self.__batches.empty()
+
+    @property
+    def port(self) -> int:
+        """ Port d'écoute effectif. """
+        return self.__server.server_address[1]
+
+    def __execute(self, game: Game, command: dict) -> dict:
+        """ Exécute une commande et retourne son résultat (ou son erreur). """
+        try:
+            if not isinstance(command, dict):
+                raise ControlError("une commande est un objet JSON")
+
+            match command.get('command'):
+                case 'step':
+                    return {'ok': True, 'result': self.__step(game, int(command.get('ticks', 1)))}
+                case 'chef':
+                    return {'ok': True, 'result': _post_chef_command(game, command)}
+                case 'game':
+                    return {'ok': True, 'result': _describe_game(game)}
+                case 'orders':
+                    return {'ok': True, 'result': _describe_orders(game)}
+                case 'stations':
+                    return {'ok': True, 'result': _describe_stations(game)}
+                case 'chefs':
+                    return {'ok': True, 'result': _describe_chefs(game)}
+                case 'metrics':
+                    return {'ok': True, 'result': _read_metrics()}
+                case 'snapshot':
+                    return {'ok': True, 'result': base64.b64encode(game.snapshot()).decode()}
+                case 'restore':
+                    game.restore(base64.b64decode(command.get('snapshot', '')))
+                    return {'ok': True, 'result': None}
+                case other:
+                    raise ControlError(f"commande inconnue : {other!r}")
+        except (ControlError, snapshot.SnapshotError, TypeError, ValueError) as error:
+            return {'ok': False, 'error': str(error)}
+
+    def __step(self, game: Game, ticks: int) -> int:
+        """ Fait avancer la partie du nombre de mises à jour spécifié. Retourne le nombre de mises à jour faites. """
+        if self.__simulated_timers is None:
+            raise ControlError("la partie avance en temps réel (step n'est permis que sans affichage)")
+        if ticks < 0:
+            raise ControlError(f"nombre de mises à jour invalide : {ticks}")
+
+        tick_time = 1.0 / settings.TICK_RATE
+        for _ in range(ticks):
+            self.__simulated_timers.advance(tick_time)
+            game.step(tick_time)
+        return ticks
+
+
+def _post_chef_command(game: Game, command: dict) -> None:
+    """ Place une commande de chef, appliquée à la prochaine mise à jour de la partie. """
+    chef, action = command.get('chef', 0), command.get('action')
+    if isinstance(chef, bool) or not isinstance(chef, int) or not 0 <= chef < len(game.chefs):
+        raise ControlError(f"chef invalide : {chef!r}")
+    if action not in _CHEF_ACTIONS:
+        raise ControlError(f"action invalide : {action!r} (attendu : {', '.join(_CHEF_ACTIONS)})")
+
+    pygame.event.post(pygame.event.Event(Game.CHEF_EVENT, chef=chef, action=action,
+                                         pressed=bool(command.get('pressed', True))))
+
+
+def _describe_game(game: Game) -> dict:
+    """ État général de la partie. """
+    return {'layout': game.layout, 'tips': game.total_tips, 'missed_orders': game.missed_orders, 'over': game.over,
+            'paused': game.paused, 'chefs': len(game.chefs)}
+
+
+def _describe_orders(game: Game) -> list:
+    """ Commandes en attente, de la plus ancienne à la plus récente, avec leur repas et le temps restant. """
+    displayed = game.order_board.displayed_orders
+    return [{'order_id': order.order_id, 'displayed': order in displayed, 'meal': _describe_food(order.meal),
+             'remaining_time_percentage': order.get_remaining_time_percentage(),
+             'expiration_time': order.expiration_time}
+            for order in game.order_board.waiting_orders]
+
+
+def _describe_stations(game: Game) -> list:
+    """
+    Appareils de la cuisine, dans l'ordre du fichier de disposition, avec leur état (voir shared_state), la
+    nourriture qu'ils contiennent et l'avancement de leur préparation.
+    """
+    stations = []
+    for index, station in enumerate(game.stations):
+        food, progress = _station_contents(station)
+        stations.append({'index': index, 'type': type(station).__name__, 'position': list(station.rect.topleft),
+                         'status': shared_state.STATION_STATUSES[shared_state.station_status(station)],
+                         'food': food, 'progress': progress})
+    return stations
+
+
+def _station_contents(station) -> tuple:
+    """
+    Nourriture que contient un appareil (voir _describe_food, une liste pour un plateau) et avancement de sa
+    préparation (de 0.0 à 1.0, None s'il n'y en a pas), lus dans son état (voir Game.snapshot).
+    """
+    if isinstance(station, Grill):
+        _, _, _, patty, _, (cooking_steps, _, _), _ = station.snapshot()
+        return _describe_food(snapshot.decode_food(patty)), cooking_steps / Grill.COOKING_STEPS if patty else None
+    if isinstance(station, Fryer):
+        _, fries, _, (frying_steps, _, _), _ = station.snapshot()
+        progress = min(1.0, frying_steps / int(settings.FRYING_TIME)) if fries else None
+        return _describe_food(snapshot.decode_food(fries)), progress
+    if isinstance(station, CuttingStation):
+        _, ingredient, wait = station.snapshot()
+        return _describe_food(snapshot.decode_food(ingredient)), _wait_progress(wait, ingredient is not None)
+    if isinstance(station, FillingStation):
+        _, wait = station.snapshot()
+        food = None if station.is_available() else {'beverage': station.beverage_type().name.lower()}
+        return food, _wait_progress(wait, food is not None)
+    if isinstance(station, Platter):
+        return [_describe_food(snapshot.decode_food(food)) for food in station.snapshot() if food], None
+    if isinstance(station, AssemblyStation):
+        burger, = station.snapshot()
+        return _describe_food(snapshot.decode_food(burger)), None
+    return None, None
+
+
+def _wait_progress(wait: tuple or None, loaded: bool) -> float or None:
+    """ Avancement d'une préparation faite en une seule attente (voir timers.Timer.progress). """
+    if wait:
+        waited, remaining = wait
+        return waited / (waited + remaining) if waited + remaining > 0 else 1.0
+    return 1.0 if loaded else None
+
+
+def _describe_chefs(game: Game) -> list:
+    """ Chefs cuisiniers, leur position, leur déplacement et la nourriture qu'ils transportent. """
+    chefs = []
+    for index, chef in enumerate(game.chefs):
+        position, walking, facing, _, _ = chef.snapshot()
+        chefs.append({'index': index, 'position': position, 'walking': walking, 'facing': facing,
+                      'food': _describe_food(chef.food)})
+    return chefs
+
+
+def _describe_food(food) -> dict or str or None:
+    """ Nourriture en valeurs JSON : nom de l'ingrédient, ou objet pour les préparations. """
+    if food is None:
+        return None
+    if isinstance(food, Ingredient):
+        return food.ingredient_type().name.lower()
+    if isinstance(food, Burger):
+        return {'burger': [ingredient.ingredient_type().name.lower() for ingredient in food.ingredients]}
+    if isinstance(food, Beverage):
+        return {'beverage': food.beverage_type().name.lower()}
+    if isinstance(food, Fries):
+        return {'fries': list(food.color)}
+    if isinstance(food, Meal):
+        return {'meal': {part: next(iter(_describe_food(component).values())) if component else None
+                         for part, component in (('burger', food.burger), ('beverage', food.beverage),
+                                                 ('fries', food.fries))}}
+    return type(food).__name__
+
+
+def _read_metrics() -> dict:
+    """ Valeur de chaque échantillon des métriques, par nom (avec étiquettes), depuis l'exposition du registre. """
+    samples = {}
+    for line in metrics.registry.expose().splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def __control() -> None:
+    """ Point d'entrée de la ligne de commande : partie sans affichage contrôlée par l'interface. """
+    parser = argparse.ArgumentParser(description="Partie sans affichage, pilotée par l'interface de contrôle locale")
+    parser.add_argument('--port', type=int, default=8765, help="port d'écoute (http://127.0.0.1:PORT/commands)")
+    parser.add_argument('--layout', default=settings.KITCHEN_LAYOUT, help='fichier de disposition de la cuisine')
+    parser.add_argument('--chefs', type=int, default=len(Game.CHEF_KEYS), help='nombre de chefs cuisiniers')
+    arguments = parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'  # aucune fenêtre : la partie n'est pas affichée
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+
+    simulated_timers = timers.SimulatedTimers()
+    timers.use(simulated_timers)
+    game = Game(screen, headless=True, layout=arguments.layout, chef_count=arguments.chefs)
+    server = ControlServer(arguments.port, simulated_timers=simulated_timers)
+    print(f"Contrôle : http://127.0.0.1:{server.port}/commands ({arguments.layout}, {arguments.chefs} chefs)")
+
+    game.start()
+    try:
+        # SDL change SIGTERM (et SIGINT) en événement QUIT, que la partie consomme si une commande l'a fait avancer
+        while not pygame.event.get(pygame.QUIT) and not game.user_requested_quit():
+            server.process(game, timeout=1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        game.stop()
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    __control()
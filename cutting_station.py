@@ -1,16 +1,20 @@
-import threading
-import time
-
 import pygame
 
+import events
+import metrics
+import surface_pool
+import snapshot
+import timers
 from ingredients import Ingredient, IngredientType
 import settings
 
-class CuttingStation(pygame.sprite.Sprite):
+class CuttingStation(surface_pool.PooledSprite):
     """
     Station de découpage pour les ingrédients.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('CuttingStation')  # compteur des reconstructions d'images
+
     WIDTH = 60
     HEIGHT = 60
 
@@ -18,7 +22,7 @@ class CuttingStation(pygame.sprite.Sprite):
     __STATE_CUTTING = 1
     __STATE_READY = 2
 
-    __CUTTING_TIME = 1.50  # Temps de découpe en secondes
+    __CUTTING_TIME = settings.CUTTING_TIME  # Temps de découpe en secondes
 
     def __init__(self, pos: tuple) -> None:
         """
@@ -29,6 +33,7 @@ class CuttingStation(pygame.sprite.Sprite):
 
         self.__ingredient = None
         self.__state = CuttingStation.__STATE_EMPTY
+        self.__timer = None  # minuterie de la découpe en cours
 
         self.image = self.__build_surface()
 
@@ -40,11 +45,35 @@ class CuttingStation(pygame.sprite.Sprite):
         """
         Réinitialise la station de découpe à son état initial.
         """
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
 
         self.__ingredient = None
         self.__state = CuttingStation.__STATE_EMPTY
         self.image = self.__build_surface()
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de la station de découpage (voir Game.snapshot).
+        :return: état de la station
+        """
+        return (self.__state, snapshot.encode_food(self.__ingredient),
+                self.__timer.progress() if self.__timer else None)
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état de la station de découpage, y compris la découpe en cours (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.reset()
+        self.__state, ingredient, wait = state
+        self.__ingredient = snapshot.decode_food(ingredient)
+        if wait:
+            self.__timer = timers.start(self.__cut(), resume=wait)
+
+        self.image = self.__build_surface()
 
     def start_cutting(self, ingredient: Ingredient) -> None:
         """
@@ -56,8 +85,8 @@ class CuttingStation(pygame.sprite.Sprite):
             self.__ingredient = ingredient
             self.__state = CuttingStation.__STATE_CUTTING
             self.image = self.__build_surface()
-            cutting_thread = threading.Thread(target=self.__cut)
-            cutting_thread.start()     
+            self.__timer = timers.start(self.__cut())
+            events.bus.publish(events.EventType.STATION_STARTED, station=self)
 
     def get_cut_ingredient(self) -> Ingredient or None:
         """
@@ -95,7 +124,8 @@ class CuttingStation(pygame.sprite.Sprite):
         Construit l'image représentant la station de découpage avec un motif.
         :return: image de la station
         """
-        surface = pygame.Surface((60, 60), flags=pygame.SRCALPHA)
+        CuttingStation.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((60, 60))
 
         for y in range(0, 60, 12):
             for x in range(0, 60, 12):
@@ -113,15 +143,16 @@ class CuttingStation(pygame.sprite.Sprite):
         return surface
 
 
-    def __cut(self) -> None:
+    def __cut(self) -> timers.Routine:
         """ 
         Procède à la découpe de l'ingrédient.
-        :return: aucun
+        :return: routine de découpe
         """
-        time.sleep(CuttingStation.__CUTTING_TIME)
+        yield CuttingStation.__CUTTING_TIME
         self.__state = CuttingStation.__STATE_READY
         self.__ingredient = self.__transform_ingredient(self.__ingredient)
         self.image = self.__build_surface()
+        events.bus.publish(events.EventType.STATION_READY, station=self)
 
 
     
@@ -0,0 +1,103 @@
+"""
+Bus d'événements du jeu.
+
+Les producteurs (routines des minuteries, appareils, chefs cuisiniers, partie) publient des événements typés depuis
+n'importe quelle tâche; la boucle de jeu les distribue une seule fois par trame, dans l'ordre de publication, depuis
+la tâche principale (voir Game.step). Les abonnés ne sont donc appelés que lorsqu'il s'est passé quelque chose, et
+toujours depuis la tâche principale : ils n'ont pas à relire l'état des appareils ou des commandes à chaque trame.
+
+Exemple : events.bus.subscribe(EventType.STATION_READY, lambda event: print(event.station))
+"""
+import collections
+import types
+from enum import Enum, auto
+
+
+class EventType(Enum):
+    """
+    Types d'événements, avec les données qui les accompagnent.
+    """
+    ORDER_SPAWNED = auto()  # order : commande créée par le générateur de commandes
+    ORDER_DISPLAYED = auto()  # order : commande arrivée à sa place sur le tableau
+    ORDER_EXPIRED = auto()  # order : compte à rebours de la commande terminé
+    ORDER_DELIVERED = auto()  # order, tip, chef : commande livrée
+    STATION_STARTED = auto()  # station : préparation commencée
+    STATION_READY = auto()  # station : préparation prête
+    FOOD_BURNT = auto()  # station : préparation laissée trop longtemps (surcuisson)
+    FOOD_PICKED = auto()  # chef, food : nourriture ramassée par un chef cuisinier
+    FOOD_DROPPED = auto()  # chef, food : nourriture déposée ou jetée par un chef cuisinier
+
+
+class Event(types.SimpleNamespace):
+    """
+    Événement : son type (event.type) et ses données (ex.: event.order, voir EventType).
+    """
+    pass
+
+
+class EventBus:
+    """
+    Bus d'événements. La publication peut se faire depuis n'importe quelle tâche; l'abonnement et la distribution se
+    font depuis la tâche principale.
+    """
+
+    def __init__(self) -> None:
+        self.__subscribers = {event_type: [] for event_type in EventType}
+        self.__pending = collections.deque()  # événements publiés, pas encore distribués (ajouts atomiques)
+
+    def subscribe(self, event_type: EventType, handler) -> None:
+        """
+        Abonne une fonction à un type d'événement.
+        :param event_type: type d'événement
+        :param handler: fonction appelée avec l'événement (voir Event)
+        :return: aucun
+        """
+        self.__subscribers[event_type].append(handler)
+
+    def unsubscribe(self, event_type: EventType, handler) -> None:
+        """
+        Désabonne une fonction d'un type d'événement (sans effet si elle n'y est pas abonnée).
+        :param event_type: type d'événement
+        :param handler: fonction abonnée
+        :return: aucun
+        """
+        if handler in self.__subscribers[event_type]:
+            self.__subscribers[event_type].remove(handler)
+
+    def publish(self, event_type: EventType, **data) -> None:
+        """
+        Publie un événement. Il sera distribué à la prochaine distribution (voir dispatch).
+        :param event_type: type d'événement
+        :param data: données de l'événement (voir EventType)
+        :return: aucun
+        """
+        self.__pending.append(Event(type=event_type, **data))
+
+    def dispatch(self) -> int:
+        """
+        Distribue les événements publiés depuis la distribution précédente. Les événements publiés par les abonnés
+        pendant la distribution attendent la suivante.
+        :return: nombre d'événements distribués
+        """
+        count = len(self.__pending)
+        for _ in range(count):
+            event = self.__pending.popleft()
+            for handler in tuple(self.__subscribers[event.type]):
+                handler(event)
+        return count
+
+    @property
+    def pending(self) -> int:
+        """ Nombre d'événements publiés qui n'ont pas encore été distribués. """
+        return len(self.__pending)
+
+    def clear(self) -> None:
+        """
+        Oublie les événements publiés qui n'ont pas encore été distribués.
+        :return: aucun
+        """
+        self.__pending.clear()
+
+
+# bus partagé par tout le jeu (Global Object Pattern, comme orders.spawner)
+bus = EventBus()
@@ -1,22 +1,25 @@
-import threading
-import time
-
 import pygame
 
+import events
+import metrics
+import surface_pool
+import timers
 from beverage import Beverage, BeverageType
 import settings
 
 
-class FillingStation(pygame.sprite.Sprite):
+class FillingStation(surface_pool.PooledSprite):
     """
     Station de remplissage de boissons.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('FillingStation')  # compteur des reconstructions d'images
+
     __STATE_NO_CUP = 0
     __STATE_FILLING = 1
     __STATE_BEVERAGE_READY = 2
 
-    __FILLING_TIME = 4.00  # en secondes
+    __FILLING_TIME = settings.FILLING_TIME  # en secondes
 
     def __init__(self, beverage_type: BeverageType, pos: tuple) -> None:
         """
@@ -28,6 +31,7 @@ class FillingStation(pygame.sprite.Sprite):
 
         self.__beverage = Beverage(beverage_type)
         self.__state = FillingStation.__STATE_NO_CUP
+        self.__timer = None  # minuterie du remplissage en cours
 
         self.image = self.__build_surface()
 
@@ -39,10 +43,32 @@ class FillingStation(pygame.sprite.Sprite):
         """
         Réinitialise la station de remplissage à son état initial.
         """
-       
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
+
         self.__state = FillingStation.__STATE_NO_CUP
         self.image = self.__build_surface()
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de la station de remplissage (voir Game.snapshot).
+        :return: état de la station
+        """
+        return self.__state, self.__timer.progress() if self.__timer else None
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état de la station de remplissage, y compris le remplissage en cours (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.reset()
+        self.__state, wait = state
+        if wait:
+            self.__timer = timers.start(self.__fill(), resume=wait)
+
+        self.image = self.__build_surface()
 
     def fill(self) -> None:
         """
@@ -53,8 +79,8 @@ class FillingStation(pygame.sprite.Sprite):
         if self.__state == FillingStation.__STATE_NO_CUP:
             self.__state = FillingStation.__STATE_FILLING
             self.image = self.__build_surface()
-            filling_thread = threading.Thread(target=self.__fill)
-            filling_thread.start()
+            self.__timer = timers.start(self.__fill())
+            events.bus.publish(events.EventType.STATION_STARTED, station=self)
 
     def get_beverage(self) -> Beverage or None:
         """
@@ -75,12 +101,23 @@ class FillingStation(pygame.sprite.Sprite):
         """
         return self.__state == FillingStation.__STATE_NO_CUP
 
+    def is_ready(self) -> bool:
+        """
+        Vérifie si une boisson remplie attend d'être récupérée.
+        :return: True si la boisson est prête, False sinon
+        """
+        return self.__state == FillingStation.__STATE_BEVERAGE_READY
+
+    def beverage_type(self) -> BeverageType:
+        return self.__beverage.beverage_type()
+
     def __build_surface(self) -> pygame.Surface:
         """
         Construit l'image représentant la station de remplissage dans son état actuel.
         :return: image de la station de remplissage
         """
-        surface = pygame.Surface((50, 70), flags=pygame.SRCALPHA)
+        FillingStation.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((50, 70))
         surface.fill(settings.FILLING_STATION_COLOR)
 
         rect = pygame.Rect(5, 5, 40, 10)
@@ -100,12 +137,13 @@ class FillingStation(pygame.sprite.Sprite):
 
         return surface
 
-    def __fill(self) -> None:
+    def __fill(self) -> timers.Routine:
         """
         Procède au remplissage de la boisson.
-        :return: aucun
+        :return: routine de remplissage
         """
-        time.sleep(FillingStation.__FILLING_TIME)
+        yield FillingStation.__FILLING_TIME
 
         self.__state = FillingStation.__STATE_BEVERAGE_READY
         self.image = self.__build_surface()
+        events.bus.publish(events.EventType.STATION_READY, station=self)
@@ -1,11 +1,12 @@
 import pygame
 
 from food import Food
-from ingredients import Ingredient
+from ingredients import Ingredient, IngredientType
 import settings
+import surface_pool
 
 
-class Fridge(pygame.sprite.Sprite):
+class Fridge(surface_pool.PooledSprite):
     """
     Réfrigérateur. Chaque réfrigérateur contient une quantité illimitée d'un ingrédient donné.
     """
@@ -38,6 +39,9 @@ class Fridge(pygame.sprite.Sprite):
     
     ########################################## A3 #########################################
 
+    def ingredient_type(self) -> IngredientType:
+        return self.__fridge_type
+
     def can_return_ingredient(self, ingredient: Ingredient) -> bool:
         if self.__fridge_type != ingredient.ingredient_type():
             return False
@@ -58,7 +62,7 @@ class Fridge(pygame.sprite.Sprite):
         suface_width = 50
         suface_height = 40
 
-        surface = pygame.Surface((suface_width, suface_height), flags=pygame.SRCALPHA)
+        surface = surface_pool.pool.acquire((suface_width, suface_height))
         surface.fill(settings.FRIDGE_COLOR)
 
         # Calculer la position centrée pour l'ingrédient
@@ -1,16 +1,21 @@
-import threading
-import time
 import pygame
 import random
 
+import events
+import metrics
+import surface_pool
+import snapshot
+import timers
 from fries import Fries
 import settings
 
-class Fryer(pygame.sprite.Sprite):
+class Fryer(surface_pool.PooledSprite):
     """
     Friteuse pour frire les patates.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('Fryer')  # compteur des reconstructions d'images
+
     WIDTH = 50
     HEIGHT = 50
 
@@ -28,8 +33,8 @@ class Fryer(pygame.sprite.Sprite):
         __STATE_BURNT: (0, 0, 0)
     }
 
-    __FRYING_TIME = 7.00  # en secondes
-    __OVERFRYING_TIME = 10.00  # en secondes
+    __FRYING_TIME = settings.FRYING_TIME  # en secondes
+    __OVERFRYING_TIME = settings.OVERFRYING_TIME  # en secondes
     __OVERFRYING_STEPS = 30
 
     def __init__(self, pos: tuple) -> None:
@@ -42,6 +47,8 @@ class Fryer(pygame.sprite.Sprite):
         self.__fries = None
         self.__fries_positions = []
         self.__state = Fryer.__STATE_EMPTY_BASKET
+        self.__timer = None  # minuterie de la friture en cours
+        self.__progress = 0, 0.0, 0  # étapes de friture, temps d'attente avant la surcuisson, étapes de surcuisson
         self.image = self.__build_surface()
         
         self.rect = self.image.get_rect()
@@ -52,12 +59,39 @@ class Fryer(pygame.sprite.Sprite):
         """
         Réinitialise la friteuse à son état initial.
         """
-     
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
+
         self.__fries = None
         self.__fries_positions = []
-        
+        self.__progress = 0, 0.0, 0
+
         self.__update_state(Fryer.__STATE_EMPTY_BASKET)
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de la friteuse (voir Game.snapshot).
+        :return: état de la friteuse
+        """
+        return (self.__state, snapshot.encode_food(self.__fries), tuple(self.__fries_positions), self.__progress,
+                self.__timer.progress() if self.__timer else None)
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état de la friteuse, y compris la friture en cours (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.reset()
+        new_state, fries, fries_positions, self.__progress, wait = state
+        self.__fries = snapshot.decode_food(fries)
+        self.__fries_positions = list(fries_positions)
+        if wait:
+            self.__timer = timers.start(self.__fry(), resume=wait)
+
+        self.__update_state(new_state)
+
 
     def __update_state(self, new_state):
         """ Met à jour l'état de la friteuse et rafraîchit son image. """
@@ -72,10 +106,12 @@ class Fryer(pygame.sprite.Sprite):
         """
         if self.__state == Fryer.__STATE_EMPTY_BASKET:
             self.__fries = Fries()
+            self.__progress = 0, 0.0, 0
             self.__update_state(Fryer.__STATE_FRYING)
 
-            frying_thread = threading.Thread(target=self.__fry)
-            frying_thread.start()
+            self.__generate_fries_positions()
+            self.__timer = timers.start(self.__fry())
+            events.bus.publish(events.EventType.STATION_STARTED, station=self)
 
     def get_fries(self) -> Fries or None:
         """
@@ -83,6 +119,9 @@ class Fryer(pygame.sprite.Sprite):
         :return: le cornet de frites si elles sont prêtes, None sinon
         """
         if self.__state in [Fryer.__STATE_FRIES_READY, Fryer.__STATE_OVERFRYING, Fryer.__STATE_BURNT]:
+            if self.__timer:
+                self.__timer.cancel()  # plus rien à frire ni à surcuire
+                self.__timer = None
             fries, self.__fries = self.__fries, None
             self.__update_state(Fryer.__STATE_EMPTY_BASKET)
             return fries
@@ -121,17 +160,13 @@ class Fryer(pygame.sprite.Sprite):
         return self.__state in [Fryer.__STATE_OVERFRYING, Fryer.__STATE_BURNT]
 
 
-    def update(self):
-        """ Met à jour l'apparence des frites en fonction de son état actuel. """
-        if self.__state:
-            self.image = self.__build_surface()
-
     def __build_surface(self) -> pygame.Surface:
         """
         Construit l'image représentant la friteuse en fonction de son état.
         :return: l'image de la friteuse
         """
-        surface = pygame.Surface((Fryer.WIDTH, Fryer.HEIGHT), flags=pygame.SRCALPHA)
+        Fryer.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((Fryer.WIDTH, Fryer.HEIGHT))
         surface.fill(settings.FRYER_COLOR)
 
         color = Fryer.__LED_COLORS[self.__state]
@@ -154,54 +189,55 @@ class Fryer(pygame.sprite.Sprite):
         return surface
 
 
-    def __fry(self) -> None:
-        """ Procède à la cuisson des frites avec des mises à jour de position. """
-
-        self.__generate_fries_positions()
-        for _ in range(int(Fryer.__FRYING_TIME)):
-            time.sleep(1)
+    def __fry(self) -> timers.Routine:
+        """
+        Procède à la cuisson des frites avec des mises à jour de position, puis à leur surcuisson.
+        La routine reprend là où en est la friture (voir restore).
+        """
+        while self.__progress[0] < int(Fryer.__FRYING_TIME):
+            yield 1
+            self.__progress = self.__progress[0] + 1, *self.__progress[1:]
             self.__generate_fries_positions()
             self.image = self.__build_surface()
 
-        self.__update_state(Fryer.__STATE_FRIES_READY)
+        if self.__state == Fryer.__STATE_FRYING:
+            self.__update_state(Fryer.__STATE_FRIES_READY)
+            events.bus.publish(events.EventType.STATION_READY, station=self)
 
-        overfrying_thread = threading.Thread(target=self.__overfry)
-        overfrying_thread.start()
+        yield from self.__overfry()
 
 
-    def __overfry(self) -> None:
+    def __overfry(self) -> timers.Routine:
         """ Procède à la surcuisson des frites. """
 
-        start_time = time.time()
-        while time.time() - start_time < Fryer.__OVERFRYING_TIME:
-            if self.__fries is None:
-                return
-            time.sleep(0.1)
+        frying_steps, waited, overfrying_steps = self.__progress
+        if waited < Fryer.__OVERFRYING_TIME:
+            # une seule attente : retirer les frites annule la routine (voir get_fries)
+            waited += yield Fryer.__OVERFRYING_TIME - waited
+            self.__progress = frying_steps, waited, overfrying_steps
+        if self.__fries is None:
+            return
 
-        if self.__fries:
+        if self.__fries and self.__state != Fryer.__STATE_OVERFRYING:
             self.__update_state(Fryer.__STATE_OVERFRYING)
+            events.bus.publish(events.EventType.FOOD_BURNT, station=self)
 
         cooked = settings.FRIES_COLOR
-        red, green, blue = float(cooked[0]), float(cooked[1]), float(cooked[2])
         burnt = settings.BURNT_FRIES_COLOR
 
-        assert(red >= burnt[0] and green >= burnt[1] and blue >= burnt[2])
-
-        red_step = (red - burnt[0]) / Fryer.__OVERFRYING_STEPS
-        green_step = (green - burnt[1]) / Fryer.__OVERFRYING_STEPS
-        blue_step = (blue - burnt[2]) / Fryer.__OVERFRYING_STEPS
+        assert(cooked[0] >= burnt[0] and cooked[1] >= burnt[1] and cooked[2] >= burnt[2])
 
-        for _ in range(Fryer.__OVERFRYING_STEPS):
+        while overfrying_steps < Fryer.__OVERFRYING_STEPS:
             if self.__fries is None:
                 return
 
-            time.sleep(Fryer.__OVERFRYING_TIME / Fryer.__OVERFRYING_STEPS)
-            red -= red_step
-            green -= green_step
-            blue -= blue_step
+            yield Fryer.__OVERFRYING_TIME / Fryer.__OVERFRYING_STEPS
+            overfrying_steps += 1
+            self.__progress = frying_steps, waited, overfrying_steps
 
             if self.__fries:
-                self.__fries.color = (round(red), round(green), round(blue))
+                ratio = overfrying_steps / Fryer.__OVERFRYING_STEPS
+                self.__fries.color = tuple(round(c - (c - b) * ratio) for c, b in zip(cooked, burnt))
                 self.image = self.__build_surface()
 
         if self.__fries:
@@ -1,7 +1,19 @@
+import assets
+import events
+import os
+import random
 import pygame
 import settings
 import orders
+import scenes
+import snapshot
+import timers
 import math
+import time
+import kitchen_layout
+import metrics
+import surface_pool
+from arrivals import ArrivalModel, DeadlineModel
 from assembly_station import AssemblyStation
 from filling_station import FillingStation
 from fridge import Fridge
@@ -9,11 +21,12 @@ from fryer import Fryer
 from grill import Grill
 from platter import Platter
 from trash import Trash
-from chef import Chef
+from brigade import Brigade
 from order_board import OrderBoard
-from beverage import BeverageType
-from ingredients import Ingredient, IngredientType
+from ingredients import IngredientType
 from cutting_station import CuttingStation
+from render_list import RenderList
+from session_stats import SessionStats
 
 
 class Game:
@@ -21,190 +34,363 @@ class Game:
     Partie. Cette classe gère les événements et interactions du jeu.
     """
 
-    __MAX_FPS = 90
+    __MAX_TICKS_PER_STEP = 22  # au-delà (processus longtemps figé), la simulation ralentit au lieu de tout rattraper
     __DEFAULT_FONT_SIZE = 20
+    __ORDER_ACCELERATION = 1.2  # facteur d'accélération des commandes à chaque livraison
+    __CHECKPOINT_INTERVAL = 1.0  # temps de jeu (en secondes) entre deux points de reprise
+    __MAX_IDLE_TIME = 1.0  # attente maximale (en secondes) entre deux trames lorsque rien ne bouge (voir idle_time)
 
-    def __init__(self, screen: pygame.Surface) -> None:
+    # couches de la liste de rendu (voir render_list), de la plus basse à la plus haute
+    (__BACKGROUND_LAYER, __STATIONS_LAYER, __ORDERS_LAYER, __CUTTING_STATIONS_LAYER, __CHEFS_LAYER,
+     __HUD_LAYER) = range(6)
+
+    # appareils sans état propre : ils ne font pas partie des instantanés
+    __STATELESS_STATIONS = (Fridge, Trash)
+
+    # touches de déplacement des premiers chefs cuisiniers (la barre d'espacement sert au chef qui a bougé en dernier)
+    CHEF_KEYS = [
+        {'down': pygame.K_DOWN, 'left': pygame.K_LEFT, 'right': pygame.K_RIGHT, 'up': pygame.K_UP},
+        {'down': pygame.K_s, 'left': pygame.K_a, 'right': pygame.K_d, 'up': pygame.K_w},
+    ]
+
+    PAUSE_KEY = pygame.K_p  # met la partie en pause, puis la reprend (voir scenes.PauseScene)
+
+    # commande d'un chef cuisinier sans passer par le clavier (bots, chefs sans touches de déplacement) :
+    # pygame.event.Event(Game.CHEF_EVENT, chef=indice, action='left', 'right', 'up', 'down' ou 'interact', pressed=bool)
+    CHEF_EVENT = pygame.event.custom_type()
+
+    __CHEFS_PER_ROW = 16  # nombre de chefs cuisiniers côte à côte au départ
+    __CHEF_ROW_SPACING = 50  # espacement vertical (en pixels) des rangées de chefs cuisiniers au départ
+
+    def __init__(self, screen: pygame.Surface, headless: bool = False,
+                 order_acceleration: float = __ORDER_ACCELERATION, layout: str = settings.KITCHEN_LAYOUT,
+                 chef_count: int = len(CHEF_KEYS), recorder=None, checkpoint: str = None,
+                 resume: bytes = None, telemetry=None, control=None, shared_state=None,
+                 arrivals: ArrivalModel = None, deadlines: DeadlineModel = None) -> None:
         """
         Initialise une partie.
         :param screen: écran où afficher le jeu
+        :param headless: True pour une partie sans affichage (simulations), False sinon
+        :param order_acceleration: facteur d'accélération de l'arrivée des commandes à chaque livraison
+        :param layout: fichier de disposition de la cuisine
+        :param chef_count: nombre de chefs cuisiniers (seuls les premiers ont des touches de déplacement)
+        :param recorder: enregistreur de la partie (voir replay.Recorder), None pour ne pas l'enregistrer
+        :param checkpoint: fichier où écrire un instantané de la partie chaque seconde (point de reprise), None pour
+                           ne pas en écrire
+        :param resume: instantané (voir snapshot) à partir duquel reprendre la partie au démarrage, None pour une
+                       nouvelle partie
+        :param telemetry: télémétrie de la session (voir telemetry.Telemetry), None pour ne pas en produire
+        :param control: interface de contrôle locale dont les commandes sont exécutées au début de chaque trame (voir
+                        control.ControlServer), None s'il n'y en a pas
+        :param shared_state: publication de l'état de la partie en mémoire partagée à chaque trame (voir
+                             shared_state.SharedStateWriter), None pour ne pas le publier
+        :param arrivals: modèle d'arrivée des commandes (voir arrivals), None pour le modèle d'origine
+        :param deadlines: modèle de délais de livraison des commandes (voir arrivals), None pour le modèle d'origine
         """
         self.__screen = screen
         self.__running = False
+        self.__headless = headless
+        self.__order_acceleration = order_acceleration
+        self.__layout = layout
+        self.__recorder = recorder
+        self.__checkpoint = checkpoint
+        self.__checkpoint_elapsed = 0.0  # temps de jeu écoulé depuis le dernier point de reprise
+        self.__tick_lag = 0.0  # temps écoulé pas encore simulé (moins d'une mise à jour, sauf si on est en retard)
+        self.__idle = False  # True si la dernière trame a été suivie d'une attente (voir idle_time)
+        self.__resume = resume
+        self.__telemetry = telemetry
+        self.__control = control
+        self.__shared_state = shared_state
 
         default_font_name = pygame.font.get_default_font()
         self.__font = pygame.font.Font(default_font_name, Game.__DEFAULT_FONT_SIZE)
 
         self.__clock = pygame.time.Clock()
 
-        orders.init()
+        orders.init(arrivals, deadlines)
         self.__order_board = OrderBoard()
 
-        self.__colliding = []
-        self.__spacing = 55
+        # appareils de la cuisine, construits à partir du fichier de disposition
+        self.__kitchen = kitchen_layout.load(layout)
+        self.__trash = self.__kitchen.trash
+        self.__platters_group = self.__kitchen.group(Platter)
+        self.__filling_stations_group = self.__kitchen.group(FillingStation)
+        self.__fryers_group = self.__kitchen.group(Fryer)
+        self.__grills_group = self.__kitchen.group(Grill)
+        self.__fridges_group = self.__kitchen.group(Fridge)
+        self.__assembly_stations_group = self.__kitchen.group(AssemblyStation)
+        self.__cutting_stations_group = self.__kitchen.group(CuttingStation)
 
-        self.__trash = Trash((20, settings.SCREEN_HEIGHT - (Trash.HEIGHT + 20)))
-
-        self.__platters_group = pygame.sprite.Group()
-        self.__platters = [Platter((120, 200)), Platter((120, 300)), Platter((120, 400))]
-        self.__platters_group.add(self.__platters)
-
-
-    ########################################## C6 ##########################################
-
-        self.__filling_stations_group = pygame.sprite.Group()
-        liste_brevages = [
-            BeverageType.COLA, BeverageType.ORANGE_SODA, BeverageType.LEMON_SODA,
-            BeverageType.LEMONADE, BeverageType.PINK_LEMONADE
-        ]
-        self.__filling_stations = [
-            FillingStation(liste_brevages[i], (((400 + 800) / 2) + (i - len(liste_brevages) / 2) * self.__spacing, 200))
-            for i in range(len(liste_brevages))
-        ]
-        self.__filling_stations_group.add(self.__filling_stations)
-
-
-        self.__fryers_group = pygame.sprite.Group()
-        self.__fryers = [
-            Fryer((settings.SCREEN_WIDTH - (Fryer.WIDTH + 200), ((317.5 + 400) / 2) + (i - 1) * self.__spacing))
-            for i in range(2)
-        ]
-        self.__fryers_group.add(self.__fryers)
-
-        self.__grills_group = pygame.sprite.Group()
-        self.__grills = [
-            Grill((settings.SCREEN_WIDTH - (Grill.WIDTH + 200), ((100 + 250) / 2) + (i - 1) * self.__spacing))
-            for i in range(3)
-        ]
-        self.__grills_group.add(self.__grills)
-
-    ########################################## C6 ##########################################
-
-        self.__fridges_group = pygame.sprite.Group()
-        liste_ingredients = [
-            IngredientType.BOTTOM_BUN, IngredientType.TOP_BUN, IngredientType.RAW_PATTY,
-            IngredientType.CHEESE_SLICE, IngredientType.UNPREPARED_ONION, IngredientType.UNPREPARED_LETTUCE,
-            IngredientType.UNPREPARED_TOMATO, IngredientType.UNPREPARED_PICKLE, IngredientType.POTATO
-        ]
-        self.__fridges = [
-            Fridge(Ingredient(liste_ingredients[i]), (((220 + 1020) / 2) + (i - len(liste_ingredients) / 2) * self.__spacing, settings.SCREEN_HEIGHT - 60))
-            for i in range(len(liste_ingredients))
-        ]
-        self.__fridges_group.add(self.__fridges)
-
-        self.__assembly_stations_group = pygame.sprite.Group()
-        self.__assembly_stations = [AssemblyStation((400, 500)),
-                                    AssemblyStation((500, 500)),
-                                    AssemblyStation((600, 500)),
-                                    AssemblyStation((700, 500)),
-                                    AssemblyStation((800, 500))]
-        self.__assembly_stations_group.add(self.__assembly_stations)
-
-
-        self.__cutting_stations_group = pygame.sprite.Group()
-        self.__cutting_stations = [
-            CuttingStation((settings.SCREEN_WIDTH - (CuttingStation.WIDTH + 200), ((300 + 700) / 2) + (i - 1) * 70))
-            for i in range(4)
-        ]
-        self.__cutting_stations_group.add(self.__cutting_stations)
-
-        self.__chef_one = Chef((screen.get_width() * (1.9/4), screen.get_height() * (2/4)))
-        self.__chef_two = Chef((screen.get_width() * (2.1/4), screen.get_height() * (2/4)))
-        self.__chef = self.__chef_one
+        self.__brigade = Brigade(self.__initial_chef_positions(chef_count))
+        self.__chef = self.__brigade.chefs[0]
 
         self.__chef_controls = {
-            pygame.K_DOWN: (self.__chef_one, 'down'),
-            pygame.K_LEFT: (self.__chef_one, 'left'),
-            pygame.K_RIGHT: (self.__chef_one, 'right'),
-            pygame.K_UP: (self.__chef_one, 'up'),
-            pygame.K_s: (self.__chef_two, 'down'),
-            pygame.K_a: (self.__chef_two, 'left'),
-            pygame.K_d: (self.__chef_two, 'right'),
-            pygame.K_w: (self.__chef_two, 'up')
+            key: (chef, direction)
+            for chef, keys in zip(self.__brigade.chefs, Game.CHEF_KEYS)
+            for direction, key in keys.items()
         }
 
+        self.__render_list = self.__build_render_list()
+        self.__hud = None  # (image, position) des pourboires et des vies, refaits après une livraison ou un raté
+
         self.total_tips = 0
         self.__missed_orders = 0
+        self.__over = False  # True après la troisième commande ratée, jusqu'au nouveau départ (voir restart)
+        self.__paused = False  # True après la touche de pause, jusqu'à la reprise (voir unpause)
 
+        self.stats = SessionStats()  # statistiques cumulées sur toute la session
+
+        # état initial de la partie, rétabli à chaque nouveau départ
+        self.__pristine = self.snapshot()
 
     def run(self) -> bool:
-        """ Boucle de jeu. Retourne True si le joueur veut quitter, False pour redémarrer. """
+        """ Boucle de jeu (voir scenes). Retourne True si le joueur veut quitter. """
+        scenes.run(scenes.GameScene(self))
+        return self.user_requested_quit()
 
+    def start(self) -> None:
+        """ Démarre la partie : les commandes commencent à arriver. """
+        events.bus.clear()
+        events.bus.subscribe(events.EventType.ORDER_SPAWNED, self.__on_order_spawned)
+        events.bus.subscribe(events.EventType.ORDER_EXPIRED, self.__on_order_expired)
+        events.bus.subscribe(events.EventType.ORDER_DELIVERED, self.__on_order_delivered)
+        events.bus.subscribe(events.EventType.STATION_STARTED, self.__on_station_started)
+        events.bus.subscribe(events.EventType.FOOD_PICKED, self.__on_food_picked)
+        if self.__recorder:
+            self.__recorder.start(self)
+        if self.__resume:
+            self.restore(self.__resume)
+            self.__resume = None
+        self.stats.track_stations(self.stations)
+        if self.__telemetry:
+            self.__telemetry.start(self)
         orders.spawner.start()
-
         self.__running = True
-        while self.__running:
-            self.__clock.tick(Game.__MAX_FPS)  # limite le nombre de trames par seconde
+
+    def step(self, elapsed: float, idle: bool = False) -> None:
+        """
+        Exécute une trame de jeu : autant de mises à jour de la simulation (à cadence fixe) que le temps écoulé en
+        contient, puis le dessin si la partie est affichée. Une machine lente dessine moins de trames, mais la
+        cuisine va toujours à la même vitesse; le dessin interpole entre les deux dernières mises à jour.
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :param idle: True si la boucle principale a dormi avant cette trame sans passer par idle_time (relecture)
+        :return: aucun
+        """
+        frame_start = time.perf_counter()
+        idle = idle or self.__idle
+        self.__idle = False
+        if self.__recorder:
+            self.__recorder.frame(self, elapsed, idle)
+        if self.__control:
+            self.__control.process(self)  # les commandes de chef reçues sont appliquées par les mises à jour suivantes
+
+        self.__tick_lag += elapsed
+        if idle:  # rien ne bougeait pendant l'attente : ces mises à jour n'ont pas à être rattrapées
+            self.__tick_lag = min(self.__tick_lag, 1.0 / settings.TICK_RATE)
+        ticks = min(int(self.__tick_lag * settings.TICK_RATE + 1e-6), Game.__MAX_TICKS_PER_STEP)
+        self.__tick_lag = max(0.0, self.__tick_lag - ticks / settings.TICK_RATE)
+        for _ in range(ticks):
             self.__update()
-            self.__draw()
+        events.bus.dispatch()  # une seule fois par trame, depuis la tâche principale
+        self.stats.frame(elapsed)
+        if self.__telemetry:
+            self.__telemetry.frame(self, elapsed)
+        if self.__shared_state:
+            self.__shared_state.frame(self, elapsed)
+
+        if self.__checkpoint:
+            self.__checkpoint_elapsed += elapsed
+            if self.__checkpoint_elapsed >= Game.__CHECKPOINT_INTERVAL:
+                self.__checkpoint_elapsed = 0.0
+                self.__write_checkpoint()
+
+        if not self.__headless:
+            self.__clock.tick()  # mesure seulement le nombre de trames par seconde (la cadence est fixée par scenes)
+            self.__draw(min(1.0, self.__tick_lag * settings.TICK_RATE))
+        surface_pool.pool.end_frame()  # les images remplacées pendant la trame ne sont plus dessinées
+
+        metrics.FRAME_SECONDS.observe(time.perf_counter() - frame_start)
+
+    def idle_time(self) -> float:
+        """
+        Délai pendant lequel rien de visible ne peut changer sans intervention du joueur : aucun chef cuisinier ne
+        bouge, aucune commande ne glisse sur le tableau, aucun événement n'attend d'être distribué et aucune routine
+        (décompte des commandes, cuisson, friture, découpe, remplissage, nouvelles commandes) n'arrive à échéance.
+        :return: délai (en secondes) pendant lequel la boucle principale peut dormir, 0.0 s'il faut dessiner la
+                 trame suivante
+        """
+        if self.__brigade.moving or self.__order_board.sliding or events.bus.pending or \
+                (self.__control and self.__control.pending):
+            return 0.0
+
+        next_deadline = timers.time_until_next()
+        idle_time = Game.__MAX_IDLE_TIME if next_deadline is None else min(next_deadline, Game.__MAX_IDLE_TIME)
+        self.__idle = idle_time > 0.0
+        return idle_time
 
+    def snapshot(self) -> bytes:
+        """
+        Produit un instantané de tout l'état de la partie : chefs cuisiniers et nourriture transportée, appareils et
+        leurs minuteries, tableau des commandes, générateur de commandes et générateur aléatoire. Les statistiques de
+        la session n'en font pas partie.
+        :return: instantané binaire compact (voir snapshot)
+        """
+        stations = tuple(None if isinstance(station, Game.__STATELESS_STATIONS) else station.snapshot()
+                         for station in self.stations)
+        return snapshot.dumps((self.__layout, len(self.chefs), self.total_tips, self.__missed_orders,
+                               self.chefs.index(self.__chef), tuple(chef.snapshot() for chef in self.chefs),
+                               stations, self.__order_board.snapshot(), orders.spawner.snapshot(),
+                               random.getstate()))
+
+    def restore(self, data: bytes, full: bool = True, keep_chef: int = None) -> None:
+        """
+        Rétablit l'état de la partie à partir d'un instantané. Les traitements en cours (cuissons, commandes, etc.)
+        reprennent là où ils en étaient, sur le moteur de minuteries courant.
+        :param data: instantané produit par snapshot (même disposition et même nombre de chefs cuisiniers)
+        :param full: False pour laisser intacts le générateur de commandes, le générateur aléatoire et le chef
+                     cuisinier actif
+        :param keep_chef: indice d'un chef cuisinier dont la position, le déplacement et l'orientation actuels sont
+                          gardés (seule sa nourriture est rétablie), None pour rétablir tous les chefs
+        :return: aucun
+        """
+        (layout, chef_count, total_tips, missed_orders, chef_index, chefs, stations, order_board, spawner,
+         random_state) = snapshot.loads(data)
+        if layout != self.__layout or chef_count != len(self.chefs) or len(stations) != len(self.stations):
+            raise snapshot.SnapshotError(f"instantané incompatible : {layout} avec {chef_count} chef(s)")
+
+        for index, (chef, chef_state) in enumerate(zip(self.chefs, chefs)):
+            if index == keep_chef:
+                chef_state = chef.snapshot()[:4] + chef_state[4:]
+            chef.restore(chef_state)
+        self.__brigade.settle()
+        for station, station_state in zip(self.stations, stations):
+            if station_state is not None:
+                station.restore(station_state)
+        self.__order_board.restore(order_board)
+
+        self.total_tips = total_tips
+        self.__missed_orders = missed_orders
+        self.__hud = None
+
+        self.stats.track_stations(self.stations)
+
+        if full:
+            self.__chef = self.chefs[chef_index]
+            orders.spawner.restore(spawner)
+            random.setstate(random_state)  # en dernier : les routines reprises ont pu tirer des nombres aléatoires
+
+    def stop(self) -> None:
+        """ Arrête la partie : plus aucune commande n'arrive. """
         orders.spawner.stop()
+        if self.__recorder:
+            self.__recorder.stop()
+        events.bus.unsubscribe(events.EventType.ORDER_SPAWNED, self.__on_order_spawned)
+        events.bus.unsubscribe(events.EventType.ORDER_EXPIRED, self.__on_order_expired)
+        events.bus.unsubscribe(events.EventType.ORDER_DELIVERED, self.__on_order_delivered)
+        events.bus.unsubscribe(events.EventType.STATION_STARTED, self.__on_station_started)
+        events.bus.unsubscribe(events.EventType.FOOD_PICKED, self.__on_food_picked)
+        self.stats.untrack_stations()
+
+    async def run_async(self) -> bool:
+        """
+        Boucle de jeu sur une boucle d'événements asyncio (voir scenes.run_async). Retourne True si le joueur veut
+        quitter.
+        """
+        await scenes.run_async(scenes.GameScene(self))
         return self.user_requested_quit()
 
-
     def __update(self) -> None:
-        """ Mises à jour à effectuer à chaque trame. """
+        """ Mise à jour de la simulation, à cadence fixe (voir step). """
         self.__handle_pygame_events()
+        self.__order_board.update(animate=not self.__headless)
+        self.__brigade.update()
+
+    def __on_order_spawned(self, event: events.Event) -> None:
+        """ Nouvelle commande : elle est ajoutée au tableau. """
         self.__handle_orders()
 
-        self.__order_board.update()
-        self.__grills_group.update()
-        self.__fryers_group.update()
-        self.__cutting_stations_group.update()
-        self.__chef_one.update()
-        self.__chef_two.update()
-
-        expired_orders = self.__order_board.get_expired_orders()
-        for _ in expired_orders:
-            self.__missed_orders += 1
-            if self.__missed_orders >= 3:
-                self.__show_game_over_screen()
-                self.__reset_game()
-
-
-    def __draw(self) -> None:
-        """ Dessins à effectuer à chaque trame. """
-        self.__screen.fill((0, 120, 200))
-
-        self.__trash.draw(self.__screen)
-        self.__platters_group.draw(self.__screen)
-        self.__filling_stations_group.draw(self.__screen)
-        self.__fryers_group.draw(self.__screen)
-        self.__grills_group.draw(self.__screen)
-        self.__fridges_group.draw(self.__screen)
-        self.__assembly_stations_group.draw(self.__screen)
-        self.__order_board.draw(self.__screen)
-        self.__cutting_stations_group.draw(self.__screen)
-        self.__chef_one.draw(self.__screen)
-        self.__chef_two.draw(self.__screen)
-        self.__show_fps()
-        self.__draw_tips()
-        self.__draw_hearts()
-        
-        pygame.display.flip()
+    def __on_order_expired(self, event: events.Event) -> None:
+        """ Compte à rebours terminé : la commande est ratée si elle attendait toujours sur le tableau. """
+        if self.__over or not self.__order_board.expire(event.order):
+            return  # déjà livrée, ou retirée par un nouveau départ
+
+        self.stats.order_expired(event.order)
+        metrics.ORDERS_EXPIRED.inc()
+        if self.__telemetry:
+            self.__telemetry.order_expired(event.order)
+        self.__missed_orders += 1
+        self.__hud = None
+        if self.__missed_orders >= 3:
+            self.stats.game_over()
+            if self.__headless:
+                self.__reset_game()  # pas d'écran de fin : la partie suivante commence aussitôt
+            else:
+                self.__over = True  # l'écran de fin de partie s'occupera du nouveau départ (voir scenes)
+
+    def __on_order_delivered(self, event: events.Event) -> None:
+        """ Commande livrée : le total des pourboires affiché change. """
+        self.__hud = None
 
+    def __on_station_started(self, event: events.Event) -> None:
+        """ Préparation commencée : l'appareil est occupé (voir stats). """
+        self.stats.station_started(event.station)
 
-    def __draw_tips(self):
-        """ Affiche le total de pourboire(s) avec un contour noir et un remplissage blanc. """
+    def __on_food_picked(self, event: events.Event) -> None:
+        """ Nourriture ramassée : elle a peut-être vidé un appareil occupé (voir stats). """
+        self.stats.food_picked()
+
+    def __draw(self, alpha: float) -> None:
+        """
+        Dessins à effectuer à chaque trame.
+        :param alpha: fraction de mise à jour écoulée depuis la dernière mise à jour de la simulation (0.0 à 1.0)
+        """
+        self.__render_list.draw(self.__screen, alpha)
+        pygame.display.flip()
+
+    def __build_render_list(self) -> RenderList:
+        """
+        Construit la liste de rendu de la partie : les appareils ne changent pas, les sources sont lues à chaque trame.
+        """
+        render_list = RenderList()
+        render_list.set_source(Game.__BACKGROUND_LAYER,  # fond, réfrigérateurs et poubelle
+                               lambda alpha: [(self.__kitchen.background(self.__screen.get_size()), (0, 0))])
+        render_list.add(Game.__STATIONS_LAYER, *self.__platters_group, *self.__filling_stations_group,
+                        *self.__fryers_group, *self.__grills_group, *self.__assembly_stations_group)
+        render_list.set_source(Game.__ORDERS_LAYER, self.__order_board.blits)
+        render_list.add(Game.__CUTTING_STATIONS_LAYER, *self.__cutting_stations_group)
+        render_list.set_source(Game.__CHEFS_LAYER, self.__brigade.blits)
+        render_list.set_source(Game.__HUD_LAYER, self.__hud_blits)
+        return render_list
+
+    def __hud_blits(self, alpha: float) -> list:
+        """ Informations affichées par-dessus la cuisine : FPS, total des pourboires et vies restantes. """
+        if self.__hud is None:
+            self.__hud = [self.__tips_blit()] + self.__hearts_blits()
+        return [self.__fps_blit()] + self.__hud
+
+    def __tips_blit(self) -> tuple:
+        """ Total de pourboire(s) avec un contour noir et un remplissage blanc. """
 
         tip_info = f"Total de pourboire(s): {self.total_tips:.2f}$"
         text_surface = self.__font.render(tip_info, True, (255, 255, 255))
-        text_x = self.__screen.get_width() / 2 - text_surface.get_width() / 2
-        text_y = 10
+        outline_surface = self.__font.render(tip_info, True, (0, 0, 0))
 
-        # Dessiner le contour en noir
-        outline_color = (0, 0, 0)
+        # contour en noir (décalé d'un pixel dans les 8 directions), puis le texte par-dessus
+        surface = pygame.Surface((text_surface.get_width() + 2, text_surface.get_height() + 2), pygame.SRCALPHA)
         for dx in [-1, 0, 1]:
             for dy in [-1, 0, 1]:
                 if dx != 0 or dy != 0:
-                    self.__screen.blit(self.__font.render(tip_info, True, outline_color), (text_x + dx, text_y + dy))
+                    surface.blit(outline_surface, (1 + dx, 1 + dy))
+        surface.blit(text_surface, (1, 1))
 
-        self.__screen.blit(text_surface, (text_x, text_y))
+        text_x = self.__screen.get_width() / 2 - (surface.get_width() - 2) / 2
+        text_y = 10
+        return surface, (text_x - 1, text_y - 1)
 
-    def __draw_hearts(self):
-        """ Affiche les cœurs pour les vies restantes. """
+    def __hearts_blits(self) -> list:
+        """ Cœurs pour les vies restantes. """
 
-        heart_image = pygame.image.load('img/heart.png').convert_alpha()
+        heart_image = assets.get('heart')
         heart_width = heart_image.get_width()
         heart_spacing = 10
         number_of_hearts = 3 - self.__missed_orders
@@ -212,59 +398,112 @@ class Game:
         total_hearts_width = heart_width * number_of_hearts + heart_spacing * (number_of_hearts - 1)
         start_x = (self.__screen.get_width() - total_hearts_width) / 2
 
-        for i in range(number_of_hearts):
-            self.__screen.blit(heart_image, (start_x + i * (heart_width + heart_spacing), 35))
-
+        return [(heart_image, (start_x + i * (heart_width + heart_spacing), 35)) for i in range(number_of_hearts)]
 
-
-    def __show_fps(self) -> None:
-        """ Affiche le nombre de trames par seconde (FPS). """
+    def __fps_blit(self) -> tuple:
+        """ Nombre de trames par seconde (FPS). """
         info = f"{round(self.__clock.get_fps())} FPS"
         text_surface = self.__font.render(info, True, (255, 255, 255))
         pos = self.__screen.get_width() - text_surface.get_width() - 10, 10
-        self.__screen.blit(text_surface, pos)
-
-    def __show_game_over_screen(self):
-        """ Affiche l'écran de fin de jeu et attend un moment avant de continuer. """
-
-        game_over_image = pygame.image.load('img/gameover.png').convert_alpha()
-        game_over_settings = pygame.transform.scale(game_over_image, (self.__screen.get_width(), self.__screen.get_height()))
-        self.__screen.blit(game_over_settings, (0, 0))
-        pygame.display.flip()
-        pygame.time.wait(settings.IMAGES_TRANSITION_TIME_MS)
+        return text_surface, pos
 
     def __reset_game(self):
-        """ Réinitialise le jeu pour un nouveau départ. """
-
-        for grill in self.__grills:
-            grill.reset()
-        for fryer in self.__fryers:
-            fryer.reset()
-        for filling_station in self.__filling_stations:
-            filling_station.reset()
-        for assembly_station in self.__assembly_stations:
-            assembly_station.reset()
-        for cutting_station in self.__cutting_stations:
-            cutting_station.reset()
-        for platter in self.__platters:
-            platter.reset()
-
-        self.__order_board.reset()
+        """ Réinitialise le jeu pour un nouveau départ en rétablissant son état initial. """
+
+        self.restore(self.__pristine, full=False)
         orders.spawner.reset()
 
+    def unpause(self) -> None:
+        """ Reprend la partie après une pause (voir paused). """
+        self.__paused = False
 
-        initial_position_chef_one = (self.__screen.get_width() * (1.9/4), self.__screen.get_height() * (2/4))
-        initial_position_chef_two = (self.__screen.get_width() * (2.1/4), self.__screen.get_height() * (2/4))
-        self.__chef_one.reset(initial_position_chef_one)
-        self.__chef_two.reset(initial_position_chef_two)
+    def restart(self) -> None:
+        """ Prend un nouveau départ après une fin de partie (voir over). """
+        self.__reset_game()
+        self.__over = False
 
-        self.total_tips = 0
-        self.__missed_orders = 0
+    def __write_checkpoint(self) -> None:
+        """ Écrit un point de reprise. Le fichier est remplacé d'un coup : il n'est jamais à moitié écrit. """
+        temporary_path = self.__checkpoint + '.tmp'
+        with open(temporary_path, 'wb') as file:
+            file.write(self.snapshot())
+        os.replace(temporary_path, self.__checkpoint)
 
+    def __initial_chef_positions(self, count: int) -> list:
+        """
+        Positions initiales des chefs cuisiniers : côte à côte au centre de l'écran, en rangées alternativement
+        sous et au-dessus de la première lorsqu'ils sont nombreux.
+        :param count: nombre de chefs cuisiniers
+        :return: position de chaque chef cuisinier
+        """
+        positions = []
+        for i in range(count):
+            row, column = divmod(i, Game.__CHEFS_PER_ROW)
+            columns = min(count - row * Game.__CHEFS_PER_ROW, Game.__CHEFS_PER_ROW)
+            offset = (row + 1) // 2 * (1 if row % 2 else -1) * Game.__CHEF_ROW_SPACING
+            positions.append((self.__screen.get_width() * (2 + (column - (columns - 1) / 2) * 0.2) / 4,
+                              self.__screen.get_height() * (2/4) + offset))
+        return positions
 
     def user_requested_quit(self):
         return not self.__running
 
+    @property
+    def over(self) -> bool:
+        """ True si la partie est terminée (trois commandes ratées) et attend son nouveau départ (voir restart). """
+        return self.__over
+
+    @property
+    def missed_orders(self) -> int:
+        """ Nombre de commandes ratées depuis le dernier départ. """
+        return self.__missed_orders
+
+    @property
+    def tick_lag(self) -> float:
+        """ Temps écoulé (en secondes) pas encore simulé par les mises à jour à cadence fixe (voir step). """
+        return self.__tick_lag
+
+    @tick_lag.setter
+    def tick_lag(self, value: float) -> None:
+        self.__tick_lag = value
+
+    @property
+    def paused(self) -> bool:
+        """ True si le joueur a demandé une pause (Game.PAUSE_KEY) et que la partie n'a pas encore repris. """
+        return self.__paused
+
+    @property
+    def chefs(self) -> list:
+        """ Chefs cuisiniers (les premiers dans l'ordre de Game.CHEF_KEYS). """
+        return self.__brigade.chefs
+
+    @property
+    def layout(self) -> str:
+        return self.__layout
+
+    @property
+    def order_acceleration(self) -> float:
+        return self.__order_acceleration
+
+    @property
+    def arrivals(self) -> ArrivalModel:
+        """ Modèle d'arrivée des commandes. """
+        return orders.spawner.arrivals
+
+    @property
+    def deadlines(self) -> DeadlineModel:
+        """ Modèle de délais de livraison des commandes. """
+        return orders.spawner.deadlines
+
+    @property
+    def order_board(self) -> OrderBoard:
+        return self.__order_board
+
+    @property
+    def stations(self) -> list:
+        """ Tous les appareils de la cuisine, dans l'ordre du fichier de disposition. """
+        return self.__kitchen.stations
+
     def __handle_orders(self) -> None:
         """
         Ajoute les nouvelles commandes au tableau d'affichage des commandes.
@@ -412,7 +651,14 @@ class Game:
         if delivered_order:
             tip = delivered_order.calculate_tip()
             self.total_tips += tip
-            orders.spawner.increase_acceleration(1.2)  # Augmenter de 20%
+            self.stats.order_delivered(delivered_order, tip)
+            metrics.ORDERS_DELIVERED.inc()
+            metrics.TIPS.inc(tip)
+            metrics.ORDER_DELIVERY_SECONDS.observe(delivered_order.get_elapsed_time())
+            if self.__telemetry:
+                self.__telemetry.order_delivered(delivered_order, tip, self.chefs.index(self.__chef))
+            events.bus.publish(events.EventType.ORDER_DELIVERED, order=delivered_order, tip=tip, chef=self.__chef)
+            orders.spawner.increase_acceleration(self.__order_acceleration)
 
 
     def interact_with_cutting_station(self, cutting_station):
@@ -448,8 +694,14 @@ class Game:
                 self.__running = False
                 return
 
+            if event.type == pygame.KEYDOWN and event.key == Game.PAUSE_KEY:
+                self.__paused = True  # la scène de pause s'en occupe à la fin de la trame (voir scenes)
+                continue
+
             if event.type in [pygame.KEYDOWN, pygame.KEYUP]:
                 self.__handle_keyboard_event(event)
+            elif event.type == Game.CHEF_EVENT:
+                self.__handle_chef_event(event)
 
 
 
@@ -457,17 +709,17 @@ class Game:
 
     ########################################## C3 et C6 ##########################################
     def __handle_keyboard_event(self, event: pygame.event.Event) -> None:
+        if self.__recorder:
+            self.__recorder.event(event)
 
         if event.type == pygame.KEYDOWN:
-            if event.key in [pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP]:
-                self.__chef = self.__chef_one
-            elif event.key in [pygame.K_s, pygame.K_a, pygame.K_d, pygame.K_w]:
-                self.__chef = self.__chef_two
+            chef, direction = self.__chef_controls.get(event.key, (None, None))
+            if chef:
+                self.__chef = chef
 
             if event.key == pygame.K_SPACE:
                 self.handle_space_key()
 
-            chef, direction = self.__chef_controls.get(event.key, (None, None))
             if chef:
                 self.__update_chef_movement(chef, direction, True)
 
@@ -476,6 +728,22 @@ class Game:
             if chef:
                 self.__update_chef_movement(chef, direction, False)
 
+    def __handle_chef_event(self, event: pygame.event.Event) -> None:
+        """
+        Gère une commande de chef cuisinier (voir Game.CHEF_EVENT), comme les touches de ce chef l'auraient fait.
+        :param event: événement de commande
+        :return: aucun
+        """
+        if self.__recorder:
+            self.__recorder.event(event)
+
+        chef = self.__brigade.chefs[event.chef]
+        if event.action == 'interact':
+            self.__chef = chef
+            self.handle_space_key()
+        else:
+            self.__update_chef_movement(chef, event.action, event.pressed)
+
     def __update_chef_movement(self, chef, direction, is_moving):
 
         if direction == 'left':
@@ -494,14 +762,14 @@ class Game:
     
     def handle_space_key(self):
         interacted = False
-        filling_station = pygame.sprite.spritecollideany(self.__chef, self.__filling_stations_group)
-        fryer = pygame.sprite.spritecollideany(self.__chef, self.__fryers_group)
-        grill = pygame.sprite.spritecollideany(self.__chef, self.__grills_group)
-        fridge = pygame.sprite.spritecollideany(self.__chef, self.__fridges_group)
-        assembly_station = pygame.sprite.spritecollideany(self.__chef, self.__assembly_stations_group)
-        platter = pygame.sprite.spritecollideany(self.__chef, self.__platters_group)
+        filling_station = self.__kitchen.collide(self.__chef, FillingStation)
+        fryer = self.__kitchen.collide(self.__chef, Fryer)
+        grill = self.__kitchen.collide(self.__chef, Grill)
+        fridge = self.__kitchen.collide(self.__chef, Fridge)
+        assembly_station = self.__kitchen.collide(self.__chef, AssemblyStation)
+        platter = self.__kitchen.collide(self.__chef, Platter)
         trash = pygame.sprite.collide_rect(self.__chef, self.__trash)
-        cutting_station = pygame.sprite.spritecollideany(self.__chef, self.__cutting_stations_group)
+        cutting_station = self.__kitchen.collide(self.__chef, CuttingStation)
 
 
         # Vérifier les interactions directes avec chaque type d'équipement
@@ -1,26 +1,30 @@
 import pygame
 
-import threading
-import time
-
+import events
+import metrics
+import surface_pool
+import snapshot
+import timers
 from food import Food
 from ingredients import Ingredient, IngredientType
 import settings
 
 
-class Grill(pygame.sprite.Sprite):
+class Grill(surface_pool.PooledSprite):
     """
     Grill pour cuire les boulettes.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('Grill')  # compteur des reconstructions d'images
+
     WIDTH = 50
     HEIGHT = 50
 
-    COOKING_TICK = 0.20  # en secondes
     COOKING_STEPS = 20
+    COOKING_TICK = settings.GRILL_COOKING_TIME / COOKING_STEPS  # en secondes
 
-    OVERCOOKING_TICK = 0.10  # en secondes
     OVERCOOKING_STEPS = 100
+    OVERCOOKING_TICK = settings.GRILL_OVERCOOKING_TIME / OVERCOOKING_STEPS  # en secondes
 
     def __init__(self, pos: tuple) -> None:
         """
@@ -36,6 +40,9 @@ class Grill(pygame.sprite.Sprite):
         self.__patty = None
         self.__patty_color = settings.RAW_PATTY_COLOR
 
+        self.__timer = None  # minuterie de la cuisson en cours
+        self.__progress = 0, 0.0, 0  # étapes de cuisson, temps d'attente avant la surcuisson, étapes de surcuisson
+
         self.image = self.__build_surface()
 
         self.rect = self.image.get_rect()
@@ -46,6 +53,9 @@ class Grill(pygame.sprite.Sprite):
         """
         Réinitialise le grill à son état initial.
         """
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
 
         self.__cooking = False
         self.__overcooking = False
@@ -53,6 +63,30 @@ class Grill(pygame.sprite.Sprite):
 
         self.__patty = None
         self.__patty_color = settings.RAW_PATTY_COLOR
+        self.__progress = 0, 0.0, 0
+
+        self.image = self.__build_surface()
+
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état du grill (voir Game.snapshot).
+        :return: état du grill
+        """
+        return (self.__cooking, self.__overcooking, self.__burnt, snapshot.encode_food(self.__patty),
+                self.__patty_color, self.__progress, self.__timer.progress() if self.__timer else None)
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état du grill, y compris la cuisson en cours (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.reset()
+        self.__cooking, self.__overcooking, self.__burnt, patty, patty_color, self.__progress, wait = state
+        self.__patty = snapshot.decode_food(patty)
+        self.__patty_color = tuple(patty_color)
+        if wait:
+            self.__timer = timers.start(self.__cook(), resume=wait)
 
         self.image = self.__build_surface()
 
@@ -96,9 +130,10 @@ class Grill(pygame.sprite.Sprite):
 
         self.__patty = ingredient
         self.__patty_color = settings.RAW_PATTY_COLOR
+        self.__progress = 0, 0.0, 0
 
-        cooking_thread = threading.Thread(target=self.__cook)
-        cooking_thread.start()
+        self.__timer = timers.start(self.__cook())
+        events.bus.publish(events.EventType.STATION_STARTED, station=self)
 
 
     def has_cooked_patty(self) -> bool:
@@ -125,18 +160,15 @@ class Grill(pygame.sprite.Sprite):
         return not self.__cooking and not self.__patty and not self.__overcooking and not self.__burnt
     
 
-    def update(self):
-        """ Met à jour l'apparence du grill en fonction de son état actuel. """
-        if self.__cooking or self.__overcooking or self.__burnt:
-            self.image = self.__build_surface()
-
-
     def get_patty(self) -> Food or None:
         if self.__patty:
             if self.__overcooking:
                 self.__overcooking = False
             if self.__burnt:
                 self.__burnt = False
+            if self.__timer:
+                self.__timer.cancel()  # plus rien à cuire ni à surcuire
+                self.__timer = None
             grilled_patty, self.__patty = self.__patty, None
             self.image = self.__build_surface()
 
@@ -150,7 +182,8 @@ class Grill(pygame.sprite.Sprite):
         Construit l'image représentant le grill et son état.
         :return: image représentant le grill
         """
-        surface = pygame.Surface((Grill.WIDTH, Grill.HEIGHT), flags=pygame.SRCALPHA)
+        Grill.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((Grill.WIDTH, Grill.HEIGHT))
         surface.fill(settings.GRILL_COLOR)
 
         for i in range(1, 5):
@@ -163,30 +196,28 @@ class Grill(pygame.sprite.Sprite):
         return surface
     
 
-    def __cook(self) -> None:
+    def __cook(self) -> timers.Routine:
         """
-        Procède à la cuisson de la boulette. Cette méthode modifie l'apparence de la boulette en cours de cuisson.
-        :return: aucun
+        Procède à la cuisson de la boulette, puis à sa surcuisson si elle n'est pas retirée à temps.
+        Cette routine modifie l'apparence de la boulette en cours de cuisson. Elle reprend là où en est la
+        cuisson (voir restore).
+        :return: routine de cuisson
         """
         raw = settings.RAW_PATTY_COLOR
-        red, green, blue = float(raw[0]), float(raw[1]), float(raw[2])
         cooked = settings.COOKED_PATTY_COLOR
 
-        assert(red >= cooked[0] and green >= cooked[1] and blue >= cooked[2])
-
-        red_step = float(red - cooked[0]) / Grill.COOKING_STEPS
-        green_step = float(green - cooked[1]) / Grill.COOKING_STEPS
-        blue_step = float(blue - cooked[2]) / Grill.COOKING_STEPS
+        assert(raw[0] >= cooked[0] and raw[1] >= cooked[1] and raw[2] >= cooked[2])
 
-        for _ in range(Grill.COOKING_STEPS):
-            time.sleep(Grill.COOKING_TICK)
-            red -= red_step
-            green -= green_step
-            blue -= blue_step
-            color = round(red), round(green), round(blue)
-            self.patty_color = color
+        while self.__progress[0] < Grill.COOKING_STEPS:
+            yield Grill.COOKING_TICK
+            step = self.__progress[0] + 1
+            self.__progress = step, *self.__progress[1:]
+            self.patty_color = Grill.__blend(raw, cooked, step / Grill.COOKING_STEPS)
+            self.image = self.__build_surface()
 
-        self.__cooking_done()
+        if self.cooking:
+            self.__cooking_done()
+        yield from self.__overcook()
 
 
     def __cooking_done(self) -> None:
@@ -198,47 +229,51 @@ class Grill(pygame.sprite.Sprite):
         self.__patty = Ingredient(IngredientType.COOKED_PATTY)
         self.cooking = False
         self.image = self.__build_surface()
+        events.bus.publish(events.EventType.STATION_READY, station=self)
 
-        overcooking_thread = threading.Thread(target=self.__overcook)
-        overcooking_thread.start()
-
-
-    def __overcook(self) -> None:
 
-        start_time = time.time()
-        while time.time() - start_time < Grill.OVERCOOKING_TICK * Grill.OVERCOOKING_STEPS:
-            if self.__patty is None:
-                return
-            time.sleep(Grill.OVERCOOKING_TICK)
+    def __overcook(self) -> timers.Routine:
+        """
+        Procède à la surcuisson de la boulette laissée sur le grill.
+        :return: routine de surcuisson
+        """
+        cooking_steps, waited, overcooking_steps = self.__progress
+        if waited < Grill.OVERCOOKING_TICK * Grill.OVERCOOKING_STEPS:
+            # une seule attente : retirer la boulette annule la routine (voir get_patty)
+            waited += yield Grill.OVERCOOKING_TICK * Grill.OVERCOOKING_STEPS - waited
+            self.__progress = cooking_steps, waited, overcooking_steps
+        if self.__patty is None:
+            return
 
         self.__overcooking = True
+        events.bus.publish(events.EventType.FOOD_BURNT, station=self)
 
         cooked = settings.COOKED_PATTY_COLOR
-        red, green, blue = float(cooked[0]), float(cooked[1]), float(cooked[2])
         burnt = settings.BURNT_PATTY_COLOR
 
-        assert(red >= burnt[0] and green >= burnt[1] and blue >= burnt[2])
-
-        red_step = (red - burnt[0]) / Grill.OVERCOOKING_STEPS
-        green_step = (green - burnt[1]) / Grill.OVERCOOKING_STEPS
-        blue_step = (blue - burnt[2]) / Grill.OVERCOOKING_STEPS
+        assert(cooked[0] >= burnt[0] and cooked[1] >= burnt[1] and cooked[2] >= burnt[2])
 
-        for _ in range(Grill.OVERCOOKING_STEPS):
+        while overcooking_steps < Grill.OVERCOOKING_STEPS:
             if self.__patty is None:
                 return
 
-            time.sleep(Grill.OVERCOOKING_TICK)
-            red -= red_step
-            green -= green_step
-            blue -= blue_step
+            yield Grill.OVERCOOKING_TICK
+            overcooking_steps += 1
+            self.__progress = cooking_steps, waited, overcooking_steps
 
             if self.__patty:
-                self.patty_color = round(red), round(green), round(blue)
+                self.patty_color = Grill.__blend(cooked, burnt, overcooking_steps / Grill.OVERCOOKING_STEPS)
+                self.image = self.__build_surface()
 
         if self.__patty:
             self.__burnt = True
             self.__overcooking_done()
 
+    @staticmethod
+    def __blend(start: tuple, end: tuple, ratio: float) -> tuple:
+        """ Couleur intermédiaire entre deux couleurs (ratio de 0.0 à 1.0). """
+        return tuple(round(s - (s - e) * ratio) for s, e in zip(start, end))
+
 
     def __overcooking_done(self) -> None:
         """
@@ -0,0 +1,290 @@
+"""
+Disposition de la cuisine.
+
+La disposition des appareils est décrite dans un fichier JSON (voir layouts/default.json) :
+
+    {"stations": [
+        {"type": "grill", "pos": [1030, 120], "count": 3, "step": [0, 55]},
+        {"type": "fridge", "pos": [372.5, 660], "count": 2, "step": [55, 0], "ingredient": ["BOTTOM_BUN", "TOP_BUN"]},
+        ...
+    ]}
+
+Chaque entrée place un appareil (ou une rangée de « count » appareils espacés de « step ») dont le coin supérieur gauche
+est à « pos ». Les réfrigérateurs exigent un « ingredient » et les stations de remplissage une « beverage » : un nom
+pour toute la rangée ou une liste d'un nom par appareil. Une cuisine a exactement une poubelle.
+
+La disposition est validée au chargement : types, paramètres, appareils entièrement à l'écran et sans chevauchement.
+La cuisine construit en une seule passe les groupes de sprites, une grille spatiale pour retrouver rapidement
+l'appareil sous un chef et l'image de fond contenant les appareils qui ne changent jamais d'apparence.
+"""
+import json
+
+import pygame
+
+import settings
+from assembly_station import AssemblyStation
+from beverage import BeverageType
+from cutting_station import CuttingStation
+from filling_station import FillingStation
+from fridge import Fridge
+from fryer import Fryer
+from grill import Grill
+from ingredients import Ingredient, IngredientType
+from platter import Platter
+from trash import Trash
+
+
+class LayoutError(ValueError):
+    """
+    Disposition de cuisine invalide.
+    """
+    pass
+
+
+class Kitchen:
+    """
+    Appareils d'une cuisine, regroupés par type et indexés par position.
+    """
+
+    __CELL_SIZE = 64  # côté (en pixels) des cellules de la grille spatiale
+    __BACKGROUND_COLOR = 0, 120, 200
+
+    # appareils dont l'apparence ne change jamais : ils sont dessinés une fois pour toutes dans l'image de fond
+    __STATIC_TYPES = (Fridge, Trash)
+
+    def __init__(self, stations: list) -> None:
+        """
+        Initialise la cuisine.
+        :param stations: appareils de la cuisine (sprites déjà positionnés)
+        """
+        self.__stations = stations
+        self.__groups = {station_type: pygame.sprite.Group() for station_type in STATION_TYPES.values()}
+        self.__grid = {}  # cellule -> [(indice, appareil), ...]
+
+        for index, station in enumerate(stations):
+            self.__groups[type(station)].add(station)
+            for cell in Kitchen.__cells(station.rect):
+                self.__grid.setdefault(cell, []).append((index, station))
+
+        self.__trash = next(iter(self.__groups[Trash]))
+        self.__background = None
+
+    def group(self, station_type: type) -> pygame.sprite.Group:
+        """
+        Retourne le groupe de sprites des appareils d'un type donné.
+        :param station_type: classe des appareils (ex.: Grill)
+        :return: groupe de sprites (vide s'il n'y a aucun appareil de ce type)
+        """
+        return self.__groups[station_type]
+
+    def collide(self, sprite: pygame.sprite.Sprite, station_type: type) -> object or None:
+        """
+        Retourne le premier appareil d'un type donné en contact avec un sprite (même résultat que
+        pygame.sprite.spritecollideany sur le groupe, sans parcourir tous les appareils).
+        :param sprite: sprite avec lequel vérifier le contact
+        :param station_type: classe des appareils à considérer
+        :return: l'appareil en contact, None s'il n'y en a pas
+        """
+        candidates = set()
+        for cell in Kitchen.__cells(sprite.rect):
+            for index, station in self.__grid.get(cell, []):
+                if isinstance(station, station_type) and sprite.rect.colliderect(station.rect):
+                    candidates.add(index)
+
+        return self.__stations[min(candidates)] if candidates else None
+
+    def draw_background(self, surface: pygame.Surface) -> None:
+        """
+        Dessine le fond de la cuisine et ses appareils statiques (voir background).
+        :param surface: surface sur laquelle dessiner
+        :return: aucun
+        """
+        surface.blit(self.background(surface.get_size()), (0, 0))
+
+    def background(self, size: tuple) -> pygame.Surface:
+        """
+        Retourne l'image de fond de la cuisine, avec ses appareils statiques. L'image est construite au premier appel
+        (et reconstruite si la taille demandée change).
+        :param size: taille de l'image (celle de la surface où elle sera dessinée)
+        :return: image de fond
+        """
+        if not self.__background or self.__background.get_size() != size:
+            self.__background = pygame.Surface(size).convert()
+            self.__background.fill(Kitchen.__BACKGROUND_COLOR)
+            for station in self.__stations:
+                if isinstance(station, Kitchen.__STATIC_TYPES):
+                    self.__background.blit(station.image, station.rect)
+
+        return self.__background
+
+    @staticmethod
+    def __cells(rect: pygame.Rect) -> list:
+        """ Cellules de la grille spatiale couvertes par un rectangle. """
+        size = Kitchen.__CELL_SIZE
+        return [(x, y)
+                for x in range(rect.left // size, (rect.right - 1) // size + 1)
+                for y in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    @property
+    def stations(self) -> list:
+        return self.__stations
+
+    @property
+    def trash(self) -> Trash:
+        return self.__trash
+
+
+def __build_platter(pos: tuple, _) -> Platter:
+    return Platter(pos)
+
+
+def __build_filling_station(pos: tuple, beverage: str) -> FillingStation:
+    return FillingStation(BeverageType[beverage], pos)
+
+
+def __build_fryer(pos: tuple, _) -> Fryer:
+    return Fryer(pos)
+
+
+def __build_grill(pos: tuple, _) -> Grill:
+    return Grill(pos)
+
+
+def __build_fridge(pos: tuple, ingredient: str) -> Fridge:
+    return Fridge(Ingredient(IngredientType[ingredient]), pos)
+
+
+def __build_assembly_station(pos: tuple, _) -> AssemblyStation:
+    # la station d'assemblage est positionnée par son centre
+    return AssemblyStation((pos[0] + AssemblyStation.WIDTH / 2, pos[1] + AssemblyStation.HEIGHT / 2))
+
+
+def __build_cutting_station(pos: tuple, _) -> CuttingStation:
+    return CuttingStation(pos)
+
+
+def __build_trash(pos: tuple, _) -> Trash:
+    return Trash(pos)
+
+
+# type d'appareil dans le fichier -> classe de l'appareil
+STATION_TYPES = {
+    'platter': Platter,
+    'filling_station': FillingStation,
+    'fryer': Fryer,
+    'grill': Grill,
+    'fridge': Fridge,
+    'assembly_station': AssemblyStation,
+    'cutting_station': CuttingStation,
+    'trash': Trash,
+}
+
+# type d'appareil -> (fonction de construction, nom du paramètre requis et ses valeurs permises)
+__BUILDERS = {
+    'platter': (__build_platter, None, None),
+    'filling_station': (__build_filling_station, 'beverage', BeverageType.__members__),
+    'fryer': (__build_fryer, None, None),
+    'grill': (__build_grill, None, None),
+    'fridge': (__build_fridge, 'ingredient', IngredientType.__members__),
+    'assembly_station': (__build_assembly_station, None, None),
+    'cutting_station': (__build_cutting_station, None, None),
+    'trash': (__build_trash, None, None),
+}
+
+
+def __number_pair(value, name: str, where: str) -> tuple:
+    """ Valide une paire de nombres (position ou espacement). """
+    if (not isinstance(value, list) or len(value) != 2
+            or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)):
+        raise LayoutError(f"{where} : '{name}' doit être une liste de deux nombres")
+    return value[0], value[1]
+
+
+def __build_entry(entry, where: str) -> list:
+    """
+    Valide une entrée de la disposition et construit ses appareils.
+    :param entry: entrée lue dans le fichier
+    :param where: description de l'entrée pour les messages d'erreur
+    :return: appareils construits
+    """
+    if not isinstance(entry, dict):
+        raise LayoutError(f"{where} : une entrée doit être un objet")
+
+    station_type = entry.get('type')
+    if station_type not in __BUILDERS:
+        raise LayoutError(f"{where} : type d'appareil inconnu {station_type!r} (permis : {', '.join(__BUILDERS)})")
+
+    build, parameter, allowed = __BUILDERS[station_type]
+    allowed_keys = {'type', 'pos', 'count', 'step'} | ({parameter} if parameter else set())
+    if unknown_keys := set(entry) - allowed_keys:
+        raise LayoutError(f"{where} : clé(s) inconnue(s) pour {station_type} : {', '.join(sorted(unknown_keys))}")
+
+    x, y = __number_pair(entry.get('pos'), 'pos', where)
+
+    count = entry.get('count', 1)
+    if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        raise LayoutError(f"{where} : 'count' doit être un entier positif")
+    step_x, step_y = __number_pair(entry['step'], 'step', where) if 'step' in entry else (0, 0)
+    if count > 1 and 'step' not in entry:
+        raise LayoutError(f"{where} : 'step' est requis lorsque 'count' dépasse 1")
+
+    values = [None] * count
+    if parameter:
+        value = entry.get(parameter)
+        values = value if isinstance(value, list) else [value] * count
+        if len(values) != count:
+            raise LayoutError(f"{where} : '{parameter}' doit avoir {count} valeur(s)")
+        for v in values:
+            if v not in allowed:
+                raise LayoutError(f"{where} : {parameter} inconnu {v!r} (permis : {', '.join(allowed)})")
+
+    return [build((x + i * step_x, y + i * step_y), values[i]) for i in range(count)]
+
+
+def __validate_placement(kitchen: Kitchen, descriptions: list, source: str) -> None:
+    """ Vérifie que chaque appareil est entièrement à l'écran et qu'aucun appareil n'en chevauche un autre. """
+    screen_rect = pygame.Rect(0, 0, settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+    stations = kitchen.stations
+
+    for station, description in zip(stations, descriptions):
+        if not screen_rect.contains(station.rect):
+            raise LayoutError(f"{source} : {description} dépasse de l'écran ({station.rect})")
+
+    for index, station in enumerate(stations):
+        overlapping = kitchen.collide(station, object)
+        if overlapping is not station:
+            other = descriptions[stations.index(overlapping)]
+            raise LayoutError(f"{source} : {descriptions[index]} chevauche {other}")
+
+
+def load(path: str) -> Kitchen:
+    """
+    Charge, valide et construit une cuisine à partir d'un fichier de disposition.
+    :param path: chemin du fichier de disposition (JSON)
+    :return: la cuisine construite
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            layout = json.load(file)
+    except (OSError, json.JSONDecodeError) as error:
+        raise LayoutError(f"{path} : impossible de lire la disposition ({error})") from error
+
+    if not isinstance(layout, dict) or not isinstance(layout.get('stations'), list):
+        raise LayoutError(f"{path} : la disposition doit être un objet avec une liste 'stations'")
+
+    stations = []
+    descriptions = []
+    for i, entry in enumerate(layout['stations']):
+        where = f"{path}, entrée {i + 1}"
+        built = __build_entry(entry, where)
+        stations.extend(built)
+        descriptions.extend(f"{entry['type']} n° {j + 1} de l'entrée {i + 1}" for j in range(len(built)))
+
+    trash_count = sum(isinstance(station, Trash) for station in stations)
+    if trash_count != 1:
+        raise LayoutError(f"{path} : une cuisine doit avoir exactement une poubelle ({trash_count} trouvée(s))")
+
+    kitchen = Kitchen(stations)
+    __validate_placement(kitchen, descriptions, path)
+
+    return kitchen
@@ -0,0 +1,331 @@
+"""
+Métriques du jeu.
+
+Registre en mémoire de compteurs, de jauges et d'histogrammes mis à jour par la partie (temps de trame, livraisons,
+expirations, pourboires), le tableau des commandes (commandes en attente) et les appareils (reconstructions
+d'images). Les mises à jour ne coûtent qu'une addition sous un verrou : elles peuvent être faites à chaque trame et
+depuis les tâches des minuteries.
+
+Le registre est exporté au format texte d'exposition de Prometheus, soit par un petit serveur HTTP local (serve),
+soit dans un fichier réécrit périodiquement (write_periodically), par exemple pour le collecteur de fichiers texte
+de node_exporter.
+
+Exemple : python undercooked.py --metrics-port 9464, puis curl http://127.0.0.1:9464/metrics
+"""
+import http.server
+import os
+import threading
+
+
+class Metric:
+    """
+    Métrique (avec ou sans étiquettes). Une métrique avec étiquettes regroupe une série par combinaison de valeurs
+    d'étiquettes (voir labels).
+    """
+
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()) -> None:
+        """
+        Initialise la métrique.
+        :param name: nom de la métrique (ex.: undercooked_orders_expired_total)
+        :param documentation: description de la métrique
+        :param label_names: noms des étiquettes, vide pour une métrique sans étiquettes
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self.__children = {}  # valeurs d'étiquettes -> série
+
+    def labels(self, *values: str) -> 'Metric':
+        """
+        Retourne la série d'une combinaison de valeurs d'étiquettes (créée au premier appel).
+        :param values: valeurs des étiquettes, dans l'ordre de label_names
+        :return: série (même type de métrique, sans étiquettes)
+        """
+        child = self.__children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} : {len(self.label_names)} valeur(s) d'étiquette attendue(s)")
+            with self._lock:
+                child = self.__children.setdefault(values, self._child())
+        return child
+
+    def expose(self) -> list:
+        """
+        Produit les lignes d'exposition de la métrique (format texte de Prometheus).
+        :return: lignes, y compris les lignes HELP et TYPE
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        if self.label_names:
+            for values, child in sorted(self.__children.items()):
+                labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values))
+                lines.extend(child._samples(labels))
+        else:
+            lines.extend(self._samples(''))
+        return lines
+
+    def _child(self) -> 'Metric':
+        """ Crée une série sans étiquettes du même type. """
+        return type(self)(self.name, self.documentation)
+
+    def _samples(self, labels: str) -> list:
+        """ Lignes d'échantillons de la série avec les étiquettes spécifiées (déjà formatées). """
+        return []
+
+
+class Counter(Metric):
+    """
+    Compteur : valeur qui ne fait qu'augmenter.
+    """
+
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self.__value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Augmente le compteur.
+        :param amount: augmentation (positive)
+        :return: aucun
+        """
+        with self._lock:
+            self.__value += amount
+
+    @property
+    def value(self) -> float:
+        return self.__value
+
+    def _samples(self, labels: str) -> list:
+        name = f"{self.name}{{{labels}}}" if labels else self.name
+        return [f"{name} {_format(self.__value)}"]
+
+
+class Gauge(Metric):
+    """
+    Jauge : valeur qui monte et descend. La valeur peut aussi être calculée au moment de l'exportation.
+    """
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple = (), function=None) -> None:
+        """
+        Initialise la jauge.
+        :param name: nom de la métrique
+        :param documentation: description de la métrique
+        :param label_names: noms des étiquettes, vide pour une jauge sans étiquettes
+        :param function: fonction sans paramètre qui calcule la valeur à l'exportation, None pour une valeur fixée
+                         avec set
+        """
+        super().__init__(name, documentation, label_names)
+        self.__value = 0.0
+        self.__function = function
+
+    def set(self, value: float) -> None:
+        """
+        Fixe la valeur de la jauge.
+        :param value: nouvelle valeur
+        :return: aucun
+        """
+        self.__value = value
+
+    @property
+    def value(self) -> float:
+        return self.__function() if self.__function else self.__value
+
+    def _samples(self, labels: str) -> list:
+        return [f"{self.name}{{{labels}}} {_format(self.value)}" if labels else f"{self.name} {_format(self.value)}"]
+
+
+class Histogram(Metric):
+    """
+    Histogramme : répartition d'observations dans des classes cumulatives, avec leur somme et leur nombre.
+    """
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple, label_names: tuple = ()) -> None:
+        """
+        Initialise l'histogramme.
+        :param name: nom de la métrique
+        :param documentation: description de la métrique
+        :param buckets: bornes supérieures des classes, en ordre croissant (la classe +Inf est ajoutée)
+        :param label_names: noms des étiquettes, vide pour un histogramme sans étiquettes
+        """
+        super().__init__(name, documentation, label_names)
+        self.__buckets = tuple(buckets)
+        self.__counts = [0] * (len(self.__buckets) + 1)
+        self.__sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Ajoute une observation.
+        :param value: valeur observée
+        :return: aucun
+        """
+        index = 0
+        for bound in self.__buckets:
+            if value <= bound:
+                break
+            index += 1
+        with self._lock:
+            self.__counts[index] += 1
+            self.__sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.__counts)
+
+    def _child(self) -> 'Histogram':
+        return Histogram(self.name, self.documentation, self.__buckets)
+
+    def _samples(self, labels: str) -> list:
+        prefix = labels + ',' if labels else ''
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.__buckets + (float('inf'),), self.__counts):
+            cumulative += count
+            samples.append(f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ''
+        samples.append(f"{self.name}_sum{suffix} {_format(self.__sum)}")
+        samples.append(f"{self.name}_count{suffix} {cumulative}")
+        return samples
+
+
+class Registry:
+    """
+    Registre de métriques.
+    """
+
+    def __init__(self) -> None:
+        self.__metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Ajoute une métrique au registre.
+        :param metric: métrique à ajouter
+        :return: la métrique
+        """
+        self.__metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        """
+        Produit l'exposition de toutes les métriques (format texte de Prometheus, version 0.0.4).
+        :return: texte d'exposition
+        """
+        lines = []
+        for metric in self.__metrics:
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+def _format(value: float) -> str:
+    """ Formate une valeur d'échantillon. """
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """ Échappe une valeur d'étiquette. """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# registre par défaut et métriques du jeu (Global Object Pattern, comme orders.spawner)
+registry = Registry()
+
+FRAME_SECONDS = registry.register(Histogram(
+    'undercooked_frame_seconds', "Temps réel de calcul d'une trame (mises à jour et dessin).",
+    (0.001, 0.002, 0.004, 0.008, 0.011, 0.016, 0.025, 0.033, 0.05, 0.1, 0.25)))
+ORDERS_WAITING = registry.register(Gauge(
+    'undercooked_orders_waiting', "Commandes en attente sur le tableau."))
+ORDER_DELIVERY_SECONDS = registry.register(Histogram(
+    'undercooked_order_delivery_seconds', "Temps entre l'arrivée et la livraison d'une commande.",
+    (15, 30, 45, 60, 90, 120, 180, 240)))
+ORDERS_DELIVERED = registry.register(Counter(
+    'undercooked_orders_delivered_total', "Commandes livrées."))
+ORDERS_EXPIRED = registry.register(Counter(
+    'undercooked_orders_expired_total', "Commandes expirées."))
+TIPS = registry.register(Counter(
+    'undercooked_tips_total', "Pourboires reçus (en dollars)."))
+ACTIVE_THREADS = registry.register(Gauge(
+    'undercooked_active_threads', "Tâches (threads) actives, y compris celles des minuteries.",
+    function=threading.active_count))
+SURFACE_REBUILDS = registry.register(Counter(
+    'undercooked_surface_rebuilds_total', "Images reconstruites, par type de sprite.", ('sprite',)))
+SURFACE_POOL_REQUESTS = registry.register(Counter(
+    'undercooked_surface_pool_requests_total', "Images demandées à la réserve, par résultat (allocated ou reused).",
+    ('result',)))
+SURFACES_POOLED = registry.register(Gauge(
+    'undercooked_surfaces_pooled', "Images libres dans la réserve d'images."))
+NET_CLIENTS = registry.register(Gauge(
+    'undercooked_net_clients', "Clients connectés au serveur de partie en réseau (voir netplay)."))
+NET_BYTES = registry.register(Counter(
+    'undercooked_net_bytes_total', "Octets échangés avec les clients réseau, par sens (sent ou received).",
+    ('direction',)))
+NET_INPUT_DELAY_SECONDS = registry.register(Histogram(
+    'undercooked_net_input_delay_seconds',
+    "Temps entre la réception d'une entrée d'un client réseau et la mise à jour de la partie qui l'applique.",
+    (0.001, 0.002, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1)))
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """ Requêtes HTTP du serveur de métriques : GET /metrics seulement. """
+
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        body = registry.expose().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # pas de journal à chaque collecte
+
+
+def serve(port: int, host: str = '127.0.0.1') -> http.server.ThreadingHTTPServer:
+    """
+    Démarre le serveur HTTP des métriques dans une tâche en arrière-plan.
+    :param port: port d'écoute (0 pour un port libre)
+    :param host: adresse d'écoute (locale par défaut)
+    :return: le serveur (server_address donne le port choisi, shutdown l'arrête)
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def write_periodically(path: str, interval: float = 5.0) -> threading.Event:
+    """
+    Réécrit périodiquement l'exposition des métriques dans un fichier, dans une tâche en arrière-plan. Le fichier est
+    remplacé d'un coup : il n'est jamais lu à moitié écrit.
+    :param path: fichier à écrire
+    :param interval: temps (en secondes) entre deux écritures
+    :return: événement qui arrête l'écriture (une dernière écriture est faite) lorsqu'il est levé
+    """
+    stop = threading.Event()
+
+    def write() -> None:
+        while True:
+            stopping = stop.wait(interval)
+            temporary_path = path + '.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                file.write(registry.expose())
+            os.replace(temporary_path, path)
+            if stopping:
+                return
+
+    threading.Thread(target=write, daemon=True).start()
+    return stop
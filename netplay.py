@@ -0,0 +1,587 @@
+"""
+Partie en réseau (coopération).
+
+Un serveur fait foi : il joue une partie sans affichage, en temps simulé avancé au rythme réel, et chaque client y
+contrôle un chef cuisinier. Les clients envoient leurs entrées (commandes de chef, comme Game.CHEF_EVENT); le serveur
+les applique à sa mise à jour suivante et envoie à chaque client, GameServer.STATE_RATE fois par seconde,
+l'instantané de la partie (voir Game.snapshot).
+
+Les instantanés sont compressés par différence : le serveur compresse chaque instantané (non compressé, voir
+snapshot.expand) en prenant le précédent envoyé au même client comme dictionnaire (zlib). D'une mise à jour à
+l'autre, presque tout l'état est inchangé : presque tout l'instantané est une référence au précédent, même quand
+une valeur change de taille et décale la suite. La connexion (TCP) livre tout, dans l'ordre : le client a toujours
+l'instantané précédent pour reconstruire le suivant.
+
+Le client qui affiche la partie prédit les déplacements de son propre chef : ils sont appliqués aussitôt, et les
+instantanés du serveur ne les corrigent que si l'écart dépasse ClientScene.RECONCILE_DISTANCE. Le reste de la
+cuisine (autres chefs, appareils, commandes, nourriture transportée, livraisons) suit le serveur.
+
+Pour les mesures, bench lance plusieurs clients sans affichage qui se promènent au hasard et rapporte, pour chacun,
+la bande passante et la latence (temps entre l'envoi d'une entrée et la réception du premier instantané qui
+l'inclut). À son arrêt, le serveur rapporte la bande passante de chaque client et le délai entre la réception d'une
+entrée et la mise à jour qui l'applique.
+
+Exemple : python netplay.py serve --chefs 4, puis python netplay.py bench --clients 4 --duration 30
+          (ou python netplay.py join pour jouer)
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import struct
+import time
+import zlib
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
+import pygame
+
+import metrics
+import scenes
+import settings
+import snapshot
+import timers
+from game import Game
+
+
+class NetplayError(ConnectionError):
+    """
+    Échange invalide avec le serveur ou avec un client.
+    """
+    pass
+
+
+_MAGIC = b'UCNP'
+_VERSION = 1
+_DEFAULT_PORT = 7777
+
+_MESSAGE = struct.Struct('<BI')  # type de message, taille du contenu
+_WELCOME = struct.Struct('<4sHBB')  # signature, version, indice du chef attribué, nombre de chefs; puis la disposition
+_STATE = struct.Struct('<IIB')  # numéro de la mise à jour, dernière entrée appliquée, 1 si complet (sinon différence)
+_INPUT = struct.Struct('<IBB')  # numéro de l'entrée, action, enfoncée
+
+_WELCOME_TYPE = 1
+_STATE_TYPE = 2
+_INPUT_TYPE = 3
+
+_CHEF_ACTIONS = ['left', 'right', 'up', 'down', 'interact']
+_DIRECTIONS = _CHEF_ACTIONS[:4]
+
+
+def _encode_state(state: bytes, previous: bytes or None) -> bytes:
+    """ Compresse un instantané, par différence avec le précédent s'il y en a un. """
+    compressor = zlib.compressobj() if previous is None else zlib.compressobj(zdict=previous)
+    return compressor.compress(state) + compressor.flush()
+
+
+def _decode_state(payload: bytes, previous: bytes or None) -> bytes:
+    """ Reconstruit un instantané compressé par _encode_state. """
+    decompressor = zlib.decompressobj() if previous is None else zlib.decompressobj(zdict=previous)
+    return decompressor.decompress(payload) + decompressor.flush()
+
+
+def _message(message_type: int, payload: bytes) -> bytes:
+    """ Message prêt à envoyer : en-tête, puis contenu. """
+    return _MESSAGE.pack(message_type, len(payload)) + payload
+
+
+async def _read_message(reader: asyncio.StreamReader) -> tuple:
+    """ Lit un message complet (lève EOFError si la connexion se termine). """
+    message_type, size = _MESSAGE.unpack(await reader.readexactly(_MESSAGE.size))
+    return message_type, await reader.readexactly(size)
+
+
+def _percentile(values: list, percentage: float) -> float:
+    """ Retourne le percentile demandé d'une liste de valeurs (0.0 si la liste est vide). """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percentage / 100.0))]
+
+
+class _Connection:
+    """
+    Client connecté au serveur, avec ses statistiques.
+    """
+
+    def __init__(self, chef_index: int, writer: asyncio.StreamWriter) -> None:
+        self.chef_index = chef_index
+        self.writer = writer
+        self.previous_state = None  # dernier instantané envoyé, non compressé (base de la prochaine différence)
+        self.last_input = 0  # numéro de la dernière entrée appliquée à la partie
+        self.connected_at = time.perf_counter()
+        self.disconnected_at = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.states_sent = 0
+        self.snapshot_bytes = 0  # taille cumulée des instantanés envoyés, s'ils avaient été envoyés complets
+        self.states_skipped = 0  # instantanés non envoyés parce que le client ne suivait pas
+        self.input_delays = []  # délais (en secondes) entre la réception de chaque entrée et son application
+
+    def statistics(self) -> dict:
+        """ Statistiques du client, du point de vue du serveur. """
+        seconds = (self.disconnected_at or time.perf_counter()) - self.connected_at
+        return {
+            'chef': self.chef_index,
+            'seconds': seconds,
+            'states': self.states_sent,
+            'skipped': self.states_skipped,
+            'snapshot_bytes': self.snapshot_bytes / self.states_sent if self.states_sent else 0.0,
+            'wire_bytes': self.bytes_sent / self.states_sent if self.states_sent else 0.0,
+            'sent_kb_per_second': self.bytes_sent / seconds / 1000.0,
+            'received_bytes_per_second': self.bytes_received / seconds,
+            'inputs': len(self.input_delays),
+            'input_delay_mean_ms': sum(self.input_delays) / len(self.input_delays) * 1000.0 if self.input_delays
+            else 0.0,
+            'input_delay_p99_ms': _percentile(self.input_delays, 99) * 1000.0,
+        }
+
+
+class GameServer:
+    """
+    Serveur de partie : partie sans affichage qui fait foi, à laquelle se connectent les clients (un chef chacun).
+    """
+
+    STATE_RATE = 30  # mises à jour de la partie (et instantanés envoyés à chaque client) par seconde
+    __MAX_BUFFERED = 256 * 1024  # octets en attente d'envoi au-delà desquels un client lent saute des instantanés
+
+    def __init__(self, screen: pygame.Surface, layout: str = settings.KITCHEN_LAYOUT, chef_count: int = 2,
+                 host: str = '127.0.0.1', port: int = _DEFAULT_PORT) -> None:
+        """
+        Initialise le serveur. La partie avance en temps simulé, au rythme des mises à jour (voir run).
+        :param screen: écran virtuel de la partie (elle n'est pas affichée)
+        :param layout: fichier de disposition de la cuisine
+        :param chef_count: nombre de chefs cuisiniers (et de clients)
+        :param host: adresse d'écoute
+        :param port: port d'écoute (0 pour un port libre, voir port)
+        """
+        self.__simulated_timers = timers.SimulatedTimers()
+        timers.use(self.__simulated_timers)
+        self.__game = Game(screen, headless=True, layout=layout, chef_count=chef_count)
+
+        self.__host = host
+        self.__port = port
+        self.__connections = {}  # indice du chef -> client connecté
+        self.__disconnected = []  # clients partis (pour les statistiques)
+        self.__inputs = []  # (client, numéro, action, enfoncée, moment de réception), appliquées à la mise à jour
+        self.__tick = 0
+        self.port = None  # port d'écoute effectif, une fois le serveur démarré
+
+    async def run(self, duration: float = None) -> None:
+        """
+        Accepte les clients et fait avancer la partie jusqu'à la fin de la durée spécifiée (ou jusqu'à l'annulation,
+        ou jusqu'à la demande d'arrêt : SIGTERM par exemple).
+        :param duration: durée (en secondes) de la partie, None pour ne pas l'arrêter
+        :return: aucun
+        """
+        server = await asyncio.start_server(self.__serve_client, self.__host, self.__port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Serveur : {self.__game.layout}, {len(self.__game.chefs)} chefs, {self.__host}:{self.port}")
+
+        loop = asyncio.get_running_loop()
+        tick_time = 1.0 / GameServer.STATE_RATE
+        self.__game.start()
+        next_tick_time = loop.time()
+        try:
+            # SDL change SIGTERM (et SIGINT) en événement QUIT, que la partie consomme à la mise à jour
+            while not self.__game.user_requested_quit() and (duration is None or self.__tick * tick_time < duration):
+                self.__update(tick_time)
+                next_tick_time += tick_time
+                await asyncio.sleep(max(0.0, next_tick_time - loop.time()))  # en retard : on enchaîne sans dormir
+        finally:
+            server.close()
+            for connection in list(self.__connections.values()):
+                connection.writer.close()
+            self.__game.stop()
+
+    def statistics(self) -> list:
+        """
+        Statistiques de chaque client, connecté ou parti.
+        :return: statistiques (voir _Connection.statistics), par ordre de connexion
+        """
+        connections = self.__disconnected + list(self.__connections.values())
+        return [connection.statistics() for connection in sorted(connections, key=lambda c: c.connected_at)]
+
+    def __update(self, elapsed: float) -> None:
+        """ Mise à jour : applique les entrées reçues, fait avancer la partie, puis envoie l'instantané. """
+        now = time.perf_counter()
+        for connection, sequence, action, pressed, received in self.__inputs:
+            pygame.event.post(pygame.event.Event(Game.CHEF_EVENT, chef=connection.chef_index, action=action,
+                                                 pressed=pressed))
+            if sequence:  # 0 : relâchement des touches d'un client parti
+                connection.last_input = sequence
+                connection.input_delays.append(now - received)
+                metrics.NET_INPUT_DELAY_SECONDS.observe(now - received)
+        self.__inputs.clear()
+
+        self.__simulated_timers.advance(elapsed)
+        self.__game.step(elapsed)
+        self.__tick += 1
+
+        state = self.__game.snapshot()
+        raw_state = snapshot.expand(state)
+        for connection in self.__connections.values():
+            if connection.writer.transport.get_write_buffer_size() > GameServer.__MAX_BUFFERED:
+                connection.states_skipped += 1  # la prochaine différence partira du dernier instantané envoyé
+                continue
+            full = connection.previous_state is None
+            self.__send(connection, _STATE_TYPE, _STATE.pack(self.__tick, connection.last_input, full)
+                        + _encode_state(raw_state, connection.previous_state))
+            connection.previous_state = raw_state
+            connection.states_sent += 1
+            connection.snapshot_bytes += len(state)
+
+    async def __serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """ Coroutine d'un client : lui attribue un chef libre, puis reçoit ses entrées jusqu'à son départ. """
+        free_chefs = [index for index in range(len(self.__game.chefs)) if index not in self.__connections]
+        if not free_chefs:
+            writer.close()  # partie complète
+            return
+
+        connection = _Connection(free_chefs[0], writer)
+        self.__connections[connection.chef_index] = connection
+        metrics.NET_CLIENTS.set(len(self.__connections))
+        self.__send(connection, _WELCOME_TYPE, _WELCOME.pack(_MAGIC, _VERSION, connection.chef_index,
+                                                             len(self.__game.chefs)) + self.__game.layout.encode())
+        try:
+            while True:
+                message_type, payload = await _read_message(reader)
+                connection.bytes_received += _MESSAGE.size + len(payload)
+                metrics.NET_BYTES.labels('received').inc(_MESSAGE.size + len(payload))
+
+                sequence, action, pressed = _INPUT.unpack(payload)
+                if message_type != _INPUT_TYPE or action >= len(_CHEF_ACTIONS) or sequence == 0:
+                    raise NetplayError(f"message invalide du client du chef {connection.chef_index}")
+                self.__inputs.append((connection, sequence, _CHEF_ACTIONS[action], bool(pressed),
+                                      time.perf_counter()))
+        except (EOFError, ConnectionError, struct.error):
+            pass
+        finally:
+            connection.disconnected_at = time.perf_counter()
+            del self.__connections[connection.chef_index]
+            self.__disconnected.append(connection)
+            metrics.NET_CLIENTS.set(len(self.__connections))
+            for direction in _DIRECTIONS:  # le chef du client parti s'arrête
+                self.__inputs.append((connection, 0, direction, False, connection.disconnected_at))
+            writer.close()
+
+    def __send(self, connection: _Connection, message_type: int, payload: bytes) -> None:
+        """ Envoie un message à un client (sans attendre). """
+        if connection.writer.is_closing():
+            return
+        data = _message(message_type, payload)
+        connection.writer.write(data)
+        connection.bytes_sent += len(data)
+        metrics.NET_BYTES.labels('sent').inc(len(data))
+
+
+class NetworkClient:
+    """
+    Connexion d'un client au serveur de partie : envoie les entrées de son chef et reçoit les instantanés.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, welcome: bytes) -> None:
+        """
+        Initialise la connexion (voir connect).
+        :param reader: flux de réception
+        :param writer: flux d'envoi
+        :param welcome: contenu du message d'accueil du serveur
+        """
+        magic, version, self.__chef_index, self.__chef_count = _WELCOME.unpack_from(welcome)
+        if magic != _MAGIC or version != _VERSION:
+            raise NetplayError(f"ce n'est pas un serveur de partie (version {_VERSION})")
+        self.__layout = welcome[_WELCOME.size:].decode()
+
+        self.__reader = reader
+        self.__writer = writer
+        self.__state = None  # dernier instantané reçu, non compressé
+        self.__new_state = False  # True si le dernier instantané n'a pas encore été retourné par take_state
+        self.__closed = False
+
+        self.__next_input = 1
+        self.__pending_inputs = {}  # numéro -> moment d'envoi, pour les entrées pas encore appliquées par le serveur
+        self.__latencies = []  # temps (en secondes) entre l'envoi de chaque entrée et le premier état qui l'inclut
+        self.__connected_at = time.perf_counter()
+        self.__bytes_sent = 0
+        self.__bytes_received = _MESSAGE.size + len(welcome)
+        self.__states = 0
+
+        self.__receiving = asyncio.get_running_loop().create_task(self.__receive())
+
+    @staticmethod
+    async def connect(host: str = '127.0.0.1', port: int = _DEFAULT_PORT) -> 'NetworkClient':
+        """
+        Se connecte à un serveur de partie.
+        :param host: adresse du serveur
+        :param port: port du serveur
+        :return: la connexion, avec le chef attribué par le serveur
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            message_type, welcome = await _read_message(reader)
+        except EOFError as error:
+            writer.close()
+            raise NetplayError(f"{host}:{port} : la partie est complète") from error
+        if message_type != _WELCOME_TYPE or len(welcome) < _WELCOME.size:
+            writer.close()
+            raise NetplayError(f"{host}:{port} : ce n'est pas un serveur de partie")
+        return NetworkClient(reader, writer, welcome)
+
+    def send_input(self, action: str, pressed: bool) -> None:
+        """
+        Envoie une entrée du chef au serveur.
+        :param action: 'left', 'right', 'up', 'down' ou 'interact'
+        :param pressed: True si la touche est enfoncée, False si elle est relâchée
+        :return: aucun
+        """
+        if self.__closed:
+            return
+        sequence = self.__next_input
+        self.__next_input += 1
+        data = _message(_INPUT_TYPE, _INPUT.pack(sequence, _CHEF_ACTIONS.index(action), pressed))
+        self.__writer.write(data)
+        self.__bytes_sent += len(data)
+        self.__pending_inputs[sequence] = time.perf_counter()
+
+    def take_state(self) -> bytes or None:
+        """
+        Retourne le dernier instantané reçu, s'il n'a pas déjà été retourné.
+        :return: instantané (voir Game.restore), None s'il n'y a rien de nouveau
+        """
+        if not self.__new_state:
+            return None
+        self.__new_state = False
+        return snapshot.shrink(self.__state)
+
+    def close(self) -> None:
+        """ Ferme la connexion. """
+        self.__closed = True
+        self.__receiving.cancel()
+        self.__writer.close()
+
+    def statistics(self) -> dict:
+        """ Statistiques de la connexion, du point de vue du client. """
+        seconds = time.perf_counter() - self.__connected_at
+        return {
+            'chef': self.__chef_index,
+            'seconds': seconds,
+            'states_per_second': self.__states / seconds,
+            'received_kb_per_second': self.__bytes_received / seconds / 1000.0,
+            'sent_bytes_per_second': self.__bytes_sent / seconds,
+            'wire_bytes': self.__bytes_received / self.__states if self.__states else 0.0,
+            'inputs': len(self.__latencies),
+            'latency_mean_ms': sum(self.__latencies) / len(self.__latencies) * 1000.0 if self.__latencies else 0.0,
+            'latency_p50_ms': _percentile(self.__latencies, 50) * 1000.0,
+            'latency_p99_ms': _percentile(self.__latencies, 99) * 1000.0,
+        }
+
+    async def __receive(self) -> None:
+        """ Coroutine de réception des instantanés. """
+        try:
+            while True:
+                message_type, payload = await _read_message(self.__reader)
+                received = time.perf_counter()
+                self.__bytes_received += _MESSAGE.size + len(payload)
+
+                tick, last_input, full = _STATE.unpack_from(payload)
+                if message_type != _STATE_TYPE or (not full and self.__state is None):
+                    raise NetplayError("message invalide du serveur")
+                self.__state = _decode_state(payload[_STATE.size:], None if full else self.__state)
+                self.__new_state = True
+                self.__states += 1
+
+                for sequence in [sequence for sequence in self.__pending_inputs if sequence <= last_input]:
+                    self.__latencies.append(received - self.__pending_inputs.pop(sequence))
+        except (EOFError, ConnectionError, struct.error, zlib.error):
+            pass
+        finally:
+            self.__closed = True
+
+    @property
+    def closed(self) -> bool:
+        """ True si la connexion est terminée (départ du serveur ou close). """
+        return self.__closed
+
+    @property
+    def chef_index(self) -> int:
+        return self.__chef_index
+
+    @property
+    def chef_count(self) -> int:
+        return self.__chef_count
+
+    @property
+    def layout(self) -> str:
+        return self.__layout
+
+
+class ClientScene(scenes.Scene):
+    """
+    Partie jouée à distance : affiche la partie du serveur et prédit les déplacements du chef du joueur.
+    """
+
+    FRAME_RATE = settings.MAX_FPS
+    RECONCILE_DISTANCE = 24  # écart (en pixels) avec le serveur au-delà duquel la position prédite est corrigée
+
+    # touche -> action : flèches ou WASD pour se déplacer, barre d'espacement pour interagir
+    __KEY_ACTIONS = {key: direction for keys in Game.CHEF_KEYS for direction, key in keys.items()}
+    __KEY_ACTIONS[pygame.K_SPACE] = 'interact'
+
+    def __init__(self, game: Game, client: NetworkClient) -> None:
+        """
+        Initialise la scène.
+        :param game: partie locale (même disposition et même nombre de chefs que celle du serveur)
+        :param client: connexion au serveur
+        """
+        self.__game = game
+        self.__client = client
+
+    def enter(self) -> None:
+        timers.use(timers.SimulatedTimers())  # rien n'avance localement : le serveur fait foi
+        self.__game.start()
+
+    def update(self, elapsed: float) -> scenes.Scene or None:
+        chef_index = self.__client.chef_index
+        # seulement les touches : les prédictions (Game.CHEF_EVENT) restent dans la file pour Game.step
+        for event in pygame.event.get((pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT)):
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return None
+            if event.type not in (pygame.KEYDOWN, pygame.KEYUP) or event.key not in ClientScene.__KEY_ACTIONS:
+                continue
+
+            action, pressed = ClientScene.__KEY_ACTIONS[event.key], event.type == pygame.KEYDOWN
+            if action != 'interact':
+                self.__client.send_input(action, pressed)
+                # prédiction : le déplacement est appliqué aussitôt à la partie locale
+                pygame.event.post(pygame.event.Event(Game.CHEF_EVENT, chef=chef_index, action=action, pressed=pressed))
+            elif pressed:
+                self.__client.send_input(action, pressed)  # les interactions ne sont faites que par le serveur
+
+        if self.__client.closed:
+            return None
+        if (state := self.__client.take_state()) is not None:
+            self.__apply(state)
+
+        self.__game.step(elapsed)
+        return self
+
+    def close(self) -> None:
+        self.__game.stop()
+
+    def __apply(self, state: bytes) -> None:
+        """ Rétablit l'instantané du serveur, en gardant la position prédite du chef du joueur si elle est proche. """
+        chef_index = self.__client.chef_index
+        server_position, server_walking = snapshot.loads(state)[5][chef_index][:2]
+        local_position, local_walking = self.__game.chefs[chef_index].snapshot()[:2]
+
+        # chef immobile des deux côtés : la position du serveur est reprise (les petits écarts ne s'accumulent pas)
+        keep = (any(local_walking) or any(server_walking)) and \
+            math.dist(local_position, server_position) <= ClientScene.RECONCILE_DISTANCE
+
+        timers.use(timers.SimulatedTimers())  # les routines rétablies repartent d'un moteur neuf, l'ancien est oublié
+        self.__game.restore(state, keep_chef=chef_index if keep else None)
+
+
+async def __join(host: str, port: int) -> dict:
+    """ Joue une partie à distance, dans une fenêtre. Retourne les statistiques de la connexion. """
+    client = await NetworkClient.connect(host, port)
+    print(f"Connecté à {host}:{port} : chef {client.chef_index + 1} sur {client.chef_count}")
+
+    screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT), pygame.SCALED)
+    pygame.display.set_caption(f'Undercooked - chef {client.chef_index + 1}')
+    game = Game(screen, layout=client.layout, chef_count=client.chef_count)
+    try:
+        await scenes.run_async(ClientScene(game, client))
+    finally:
+        client.close()
+    return client.statistics()
+
+
+async def __wander(host: str, port: int, duration: float, seed: int) -> dict:
+    """ Client de mesure : se promène au hasard dans la cuisine (et interagit parfois) pendant la durée spécifiée. """
+    client = await NetworkClient.connect(host, port)
+    generator = random.Random(seed)
+    end_time = time.perf_counter() + duration
+    held = None
+    try:
+        while time.perf_counter() < end_time and not client.closed:
+            if held:
+                client.send_input(held, False)
+            held = generator.choice(_DIRECTIONS + [None])
+            if held:
+                client.send_input(held, True)
+            else:
+                client.send_input('interact', True)
+
+            if (state := client.take_state()) is not None:
+                snapshot.loads(state)  # l'instantané reconstruit doit être valide
+            await asyncio.sleep(generator.uniform(0.05, 0.25))
+    finally:
+        client.close()
+    return client.statistics()
+
+
+async def __bench(host: str, port: int, clients: int, duration: float) -> list:
+    """ Lance plusieurs clients de mesure en même temps. Retourne leurs statistiques. """
+    return list(await asyncio.gather(*[__wander(host, port, duration, seed) for seed in range(clients)]))
+
+
+def __print_statistics(title: str, statistics: list) -> None:
+    """ Affiche les statistiques de chaque client, une ligne par client. """
+    print(title)
+    for client_statistics in statistics:
+        print('  ' + ', '.join(f"{key} {value:.1f}" if isinstance(value, float) else f"{key} {value}"
+                               for key, value in client_statistics.items()))
+
+
+def __netplay() -> None:
+    """ Point d'entrée de la ligne de commande. """
+    parser = argparse.ArgumentParser(description='Partie en réseau : serveur, client et mesures')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='héberge une partie (sans affichage)')
+    serve.add_argument('--layout', default=settings.KITCHEN_LAYOUT, help='fichier de disposition de la cuisine')
+    serve.add_argument('--chefs', type=int, default=2, help='nombre de chefs cuisiniers (un par client)')
+    serve.add_argument('--duration', type=float, help='durée (en secondes) de la partie, illimitée par défaut')
+
+    join = commands.add_parser('join', help='joue une partie hébergée')
+
+    bench = commands.add_parser('bench', help='mesure la bande passante et la latence de plusieurs clients')
+    bench.add_argument('--clients', type=int, default=2, help='nombre de clients')
+    bench.add_argument('--duration', type=float, default=10.0, help='durée (en secondes) de la mesure')
+    bench.add_argument('--json', action='store_true', help='affiche les statistiques en JSON')
+
+    for command in (serve, join, bench):
+        command.add_argument('--host', default='127.0.0.1', help='adresse du serveur')
+        command.add_argument('--port', type=int, default=_DEFAULT_PORT, help='port du serveur')
+    arguments = parser.parse_args()
+
+    if arguments.command == 'serve':
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'  # aucune fenêtre : la partie du serveur n'est pas affichée
+        pygame.display.init()
+        pygame.font.init()
+        screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+        server = GameServer(screen, arguments.layout, arguments.chefs, arguments.host, arguments.port)
+        try:
+            asyncio.run(server.run(arguments.duration))
+        except KeyboardInterrupt:
+            pass
+        __print_statistics('Clients (vus du serveur) :', server.statistics())
+
+    elif arguments.command == 'join':
+        pygame.display.init()
+        pygame.font.init()
+        __print_statistics('Connexion :', [asyncio.run(__join(arguments.host, arguments.port))])
+        pygame.quit()
+
+    else:
+        statistics = asyncio.run(__bench(arguments.host, arguments.port, arguments.clients, arguments.duration))
+        if arguments.json:
+            print(json.dumps(statistics, indent=2))
+        else:
+            __print_statistics('Clients :', statistics)
+
+
+if __name__ == '__main__':
+    __netplay()
@@ -1,5 +1,6 @@
 import pygame
 
+import metrics
 from orders import Order
 from order_sprite import OrderSprite
 
@@ -18,23 +19,48 @@ class OrderBoard:
 
         self.__waiting_orders_sprite_group = pygame.sprite.Group()
         self.__waiting_orders = []
-        self.__expired_orders = []
 
     def reset(self):
         """
         Réinitialise le tableau d'affichage des commandes.
-        Supprime toutes les commandes en attente et expirées, 
-        et réinitialise l'état des sprites associés.
+        Supprime toutes les commandes en attente et réinitialise l'état des sprites associés.
         """
 
         for _, order_sprite in self.__waiting_orders:
             order_sprite.kill()
         self.__waiting_orders.clear()
-        self.__expired_orders.clear()
         self.__left_pos = OrderBoard.__LEFT_OFFSET
         self.__pack()
 
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état du tableau d'affichage (voir Game.snapshot).
+        :return: état du tableau, y compris les commandes en attente et leur position à l'écran
+        """
+        waiting = tuple((order.snapshot(), order_sprite.rect.x) for order, order_sprite in self.__waiting_orders)
+        return self.__left_pos, waiting
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état du tableau d'affichage (voir Game.restore). Les commandes actuelles sont arrêtées.
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        for order, _ in self.__waiting_orders:
+            order.stop()
+        self.reset()
+
+        left_pos, waiting = state
+        for order_state, x in waiting:
+            order_sprite = OrderSprite(Order.from_snapshot(order_state))
+            order_sprite.rect.x = x
+            self.__waiting_orders_sprite_group.add(order_sprite)
+            self.__waiting_orders.append((order_sprite.order, order_sprite))
+
+        self.__left_pos = left_pos
+        self.__pack()
+
     def __del__(self) -> None:
         """
         Destructeur : arrête les tâches associées aux commandes et détruit les sprites.
@@ -71,13 +97,23 @@ class OrderBoard:
 
         return None
 
-    def draw(self, surface: pygame.Surface) -> None:
+    def draw(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
         """
-        Dessine toutes les commandes du tableau d'affichage.
+        Dessine toutes les commandes du tableau d'affichage, entre leurs deux dernières positions.
         :param surface: surface sur laquelle dessiner le tableau
+        :param alpha: fraction du chemin parcouru depuis la position précédente (1.0 pour la position actuelle)
         :return: aucun
         """
-        self.__waiting_orders_sprite_group.draw(surface)
+        surface.blits(self.blits(alpha), doreturn=False)
+
+    def blits(self, alpha: float = 1.0) -> list:
+        """
+        Retourne les paires (image, position) des commandes, entre leurs deux dernières positions (voir draw).
+        :param alpha: fraction du chemin parcouru depuis la position précédente (1.0 pour la position actuelle)
+        :return: paires à soumettre à Surface.blits
+        """
+        return [(order_sprite.image, (order_sprite.interpolated_x(alpha), order_sprite.rect.y))
+                for _, order_sprite in self.__waiting_orders]
 
     def remove_order(self, order_id: int) -> None:
         """
@@ -95,29 +131,57 @@ class OrderBoard:
                 
         self.__pack()
 
-    def update(self) -> None:
+    def expire(self, order: Order) -> bool:
         """
-        Met à jour le tableau d'affichage : retire les commandes expirées et
-        met à jour l'affichage des commandes en attente.
-        :return: aucun
+        Retire une commande expirée du tableau d'affichage (voir events.EventType.ORDER_EXPIRED).
+        :param order: commande dont le compte à rebours est terminé
+        :return: True si la commande était en attente, False si elle a déjà été retirée (livrée entre-temps, ou
+                 commande d'une partie précédente)
         """
-        # retirer les commandes expirées
-        for order, _ in self.__waiting_orders:
-            if order.has_expired():
-                self.__expired_orders.append(order)
-                self.remove_order(order.order_id)
+        if not any(waiting_order is order for waiting_order, _ in self.__waiting_orders):
+            return False
 
-        # mettre à jour tous les sprites
+        self.remove_order(order.order_id)
+        return True
+
+    def update(self, animate: bool = True) -> None:
+        """
+        Met à jour l'affichage des commandes en attente.
+        :param animate: False pour ne pas mettre à jour l'affichage (partie sans affichage)
+        :return: aucun
+        """
         for _, order_sprite in self.__waiting_orders:
-            order_sprite.update()
+            order_sprite.update(animate)
+
+        metrics.ORDERS_WAITING.set(len(self.__waiting_orders))
 
-    def get_expired_orders(self):
+    def get_order_rect(self, order_id: int) -> pygame.Rect or None:
         """
-        Retourne une liste des commandes expirées.
-        :return: Liste des commandes expirées
+        Retourne le rectangle où est affichée une commande en attente.
+        :param order_id: identifiant unique de la commande
+        :return: copie du rectangle de la commande, None si elle n'est pas en attente
         """
-        expired_orders, self.__expired_orders = self.__expired_orders, []
-        return expired_orders
+        for order, order_sprite in self.__waiting_orders:
+            if order.order_id == order_id:
+                return order_sprite.rect.copy()
+
+        return None
+
+    @property
+    def waiting_orders(self) -> list:
+        """ Commandes en attente, de la plus ancienne à la plus récente. """
+        return [order for order, _ in self.__waiting_orders]
+
+    @property
+    def displayed_orders(self) -> list:
+        """ Commandes en attente dont l'affichage a rejoint sa place sur le tableau. """
+        return [order for order, order_sprite in self.__waiting_orders if order_sprite.is_in_place()]
+
+    @property
+    def sliding(self) -> bool:
+        """ True si une commande glisse encore vers sa place sur le tableau (ou vient tout juste de l'atteindre). """
+        return any(not order_sprite.is_in_place() or order_sprite.interpolated_x(0.0) != order_sprite.rect.x
+                   for _, order_sprite in self.__waiting_orders)
 
     def __pack(self) -> None:
         """
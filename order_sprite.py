@@ -1,13 +1,18 @@
 import pygame
 
 from orders import Order
+import events
+import metrics
+import surface_pool
 import settings
 
 
-class OrderSprite(pygame.sprite.Sprite):
+class OrderSprite(surface_pool.PooledSprite):
     """
     Sprite représentant une commande en attente.
     """
+
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('OrderSprite')  # compteur des reconstructions d'images
     __SPEED = 8
 
     def __init__(self, order: Order) -> None:
@@ -20,7 +25,7 @@ class OrderSprite(pygame.sprite.Sprite):
         self.__order = order
 
         self.__time_percentage = order.get_remaining_time_percentage()
-        self.__previous_time_percentage = self.__time_percentage + 1
+        self.__bar_width = OrderSprite.__time_bar_width(self.__time_percentage)
 
         self.image = self.__build_surface()
 
@@ -29,6 +34,7 @@ class OrderSprite(pygame.sprite.Sprite):
         self.rect.y = 10
 
         self.__left_align = settings.SCREEN_WIDTH
+        self.__previous_x = self.rect.x  # position avant la dernière mise à jour (interpolation)
 
     def push_to(self, x: int) -> None:
         """
@@ -38,20 +44,52 @@ class OrderSprite(pygame.sprite.Sprite):
         """
         self.__left_align = x
 
-    def update(self) -> None:
+    def is_in_place(self) -> bool:
+        """
+        Vérifie si le sprite a fini d'être poussé vers la gauche.
+        :return: True si le sprite est à sa place, False s'il se déplace encore
+        """
+        return self.rect.x <= self.__left_align
+
+    def update(self, animate: bool = True) -> None:
         """
         Met à jour le sprite: ajuste la position s'il doit être poussé et ajuste l'affichage
         du temps qui reste avant l'expiration de la commande.
+        :param animate: False pour déplacer le sprite sans refaire son image (partie sans affichage)
         :return: aucun
         """
+        self.__previous_x = self.rect.x
         if self.rect.x > self.__left_align:
             self.rect.x = max(self.__left_align, self.rect.x - OrderSprite.__SPEED)
+            if self.is_in_place():
+                events.bus.publish(events.EventType.ORDER_DISPLAYED, order=self.__order)
+
+        if not animate:
+            return
 
         self.__time_percentage = self.__order.get_remaining_time_percentage()
-        if self.__time_percentage != self.__previous_time_percentage:
-            self.__previous_time_percentage = self.__time_percentage
+        bar_width = OrderSprite.__time_bar_width(self.__time_percentage)
+        if bar_width != self.__bar_width:  # l'image ne change qu'avec la largeur de la barre du temps restant
+            self.__bar_width = bar_width
             self.image = self.__build_surface()
 
+    def kill(self) -> None:
+        """
+        Retire le sprite de ses groupes et rend son image à la réserve (voir surface_pool).
+        :return: aucun
+        """
+        if self.alive():  # une seule fois : l'image rendue peut déjà servir à un autre sprite
+            super().kill()
+            surface_pool.pool.release(self.image)
+
+    def interpolated_x(self, alpha: float) -> int:
+        """
+        Retourne la position horizontale où dessiner le sprite, entre ses deux dernières positions.
+        :param alpha: fraction du chemin parcouru depuis la position précédente (1.0 pour la position actuelle)
+        :return: position horizontale
+        """
+        return round(self.__previous_x + (self.rect.x - self.__previous_x) * alpha)
+
     def get_color_from_percentage(self, percentage: float) -> tuple:
         """
         Retourne une couleur allant du vert au rouge en fonction du pourcentage.
@@ -74,7 +112,8 @@ class OrderSprite(pygame.sprite.Sprite):
         indicateur du temps qui reste avant son expiration.
         :return: l'image construite
         """
-        surface = pygame.Surface((60, 70), flags=pygame.SRCALPHA)
+        OrderSprite.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((60, 70))
         surface.fill((250, 255, 225))
 
         self.__draw_beverage(surface)
@@ -85,10 +124,9 @@ class OrderSprite(pygame.sprite.Sprite):
         y = surface.get_height() - 4 - burger.height()
         burger.draw(surface, (x, y))
 
-        rect = pygame.Rect(4, 4, 52, 10)
+        rect = pygame.Rect(4, 4, settings.ORDER_TIME_BAR_WIDTH + 4, 10)
         pygame.draw.rect(surface, (0, 0, 0), rect)
-        w = round(48 * self.__time_percentage / 100.0)
-        rect = pygame.Rect(6, 6, w, 6)
+        rect = pygame.Rect(6, 6, self.__bar_width, 6)
         
         couleur = self.get_color_from_percentage(self.__time_percentage)
         pygame.draw.rect(surface, couleur, rect)
@@ -125,6 +163,11 @@ class OrderSprite(pygame.sprite.Sprite):
         fries = self.__order.fries
         fries.draw(surface, (x, y))
 
+    @staticmethod
+    def __time_bar_width(time_percentage: float) -> int:
+        """ Largeur (en pixels) de la barre du temps restant (voir Order.get_remaining_time). """
+        return round(settings.ORDER_TIME_BAR_WIDTH * time_percentage / 100.0)
+
     @property
     def order(self) -> Order:
         return self.__order
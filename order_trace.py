@@ -0,0 +1,330 @@
+"""
+Traces de commandes : rejoue un flux de commandes enregistrées au lieu de les tirer au hasard.
+
+Une trace est un fichier CSV (avec une ligne d'en-tête) ou JSONL (un objet JSON par ligne, extension .jsonl), lue
+commande par commande au fil de la partie : une trace de plusieurs heures n'est jamais chargée en mémoire. Chaque
+commande a les champs suivants :
+    time        instant de la commande (en secondes depuis le début de la trace, jamais décroissant)
+    burger      ingrédients du hambourgeois, de bas en haut, séparés par des espaces (une liste en JSONL), par exemple
+                'BOTTOM_BUN COOKED_PATTY CHEESE_SLICE TOP_BUN' (voir ingredients.IngredientType), vide pour aucun
+    beverage    type de boisson (ex.: COLA, voir beverage.BeverageType), vide pour aucune boisson
+    fries       1 pour un cornet de frites, 0 ou vide pour aucun
+    deadline    délai de livraison (en secondes), vide pour le tirer du modèle de délais de la partie
+
+Le modèle d'arrivée trace:path=FICHIER,scale=ÉCHELLE (voir arrivals) crée les commandes de la trace à leurs instants
+multipliés par l'échelle : 0.5 rejoue la trace deux fois plus vite. Les délais de livraison ne sont pas mis à l'échelle
+et l'accélération de la partie est ignorée, pour que la même charge soit rejouée d'une disposition ou d'une version du
+jeu à l'autre. Une fois la trace épuisée, plus aucune commande n'arrive.
+
+Exemple : python batch_simulation.py --arrivals trace:path=peak.csv,scale=0.5 --layout layouts/stress.json
+
+Le module offre aussi :
+    python order_trace.py info peak.csv         résume une trace (commandes, durée, taux d'arrivée)
+    python order_trace.py generate peak.csv --arrivals bursty --duration 3600
+                                                produit une trace à partir d'un modèle d'arrivée (voir arrivals)
+"""
+import argparse
+import collections
+import csv
+import io
+import json
+import os
+import random
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
+
+import arrivals
+from arrivals import ArrivalModel, ModelError
+from beverage import Beverage, BeverageType
+from burger import Burger
+from fries import Fries
+from ingredients import Ingredient, IngredientType
+from meal import Meal
+
+
+COLUMNS = ('time', 'burger', 'beverage', 'fries', 'deadline')  # colonnes d'une trace CSV (voir le module)
+
+_TRUE = ('1', 'true', 'yes', 'oui')
+_FALSE = ('', '0', 'false', 'no', 'non')
+
+
+class TraceArrivals(ArrivalModel):
+    """
+    Modèle d'arrivée qui rejoue une trace de commandes (voir le module). Son état est la position dans le fichier de
+    la prochaine commande : un instantané rétabli reprend la lecture sans relire la trace depuis le début.
+    """
+
+    NAME = 'trace'
+
+    def __init__(self, path: str, scale: float = 1.0) -> None:
+        """
+        Initialise le modèle. La trace est parcourue une fois pour la valider, sans être gardée en mémoire.
+        :param path: fichier de la trace (CSV ou JSONL)
+        :param scale: facteur appliqué aux instants des commandes (0.5 pour rejouer la trace deux fois plus vite)
+        """
+        if not isinstance(path, str) or not path:
+            raise ModelError(f"fichier de trace invalide : {path!r}")
+        if scale <= 0.0:
+            raise ModelError(f"échelle invalide : {scale}")
+        super().__init__(None, path=path, scale=scale)
+        self.__path = path
+        self.__scale = scale
+        self.__order_count, self.__duration = summarize(path)[:2]
+
+        self.__reader = None  # lecture en cours (ouverte à la première commande)
+        self.__position = None, None  # (position dans le fichier, numéro de ligne) de la prochaine commande
+        self.__pending = None  # prochaine commande, déjà lue, et la position qui la suit
+        self.__time = 0.0  # instant (dans la trace) de la dernière commande créée
+
+    def first_gap(self, acceleration: float) -> float or None:
+        return self._gap(acceleration)  # la première commande arrive à son instant dans la trace
+
+    def next_order(self) -> tuple:
+        if not (pending := self.__peek()):
+            return None, None
+
+        (time, burger, beverage, fries, deadline), self.__position = pending
+        self.__pending = None
+        self.__time = time
+
+        meal = Meal()
+        if ingredient_types := burger:
+            burger = Burger()
+            burger.add_ingredients([Ingredient(ingredient_type) for ingredient_type in ingredient_types])
+            meal.add_burger(burger)
+        if beverage:
+            meal.add_beverage(Beverage(beverage))
+        if fries:
+            meal.add_fries(Fries())
+        return meal, deadline
+
+    def snapshot(self) -> tuple:
+        return self.__position + (self.__time,)
+
+    def restore(self, state: tuple) -> None:
+        offset, line, self.__time = state
+        self.__seek(offset, line)
+
+    def reset(self) -> None:
+        self.__time = 0.0
+        self.__seek(None, None)
+
+    def _gap(self, acceleration: float) -> float or None:
+        if not (pending := self.__peek()):
+            return None
+        return (pending[0][0] - self.__time) * self.__scale
+
+    def __peek(self) -> tuple or None:
+        """ Lit (au besoin) la prochaine commande de la trace, sans l'utiliser. """
+        if self.__pending is None:
+            if self.__reader is None:
+                self.__reader = read(self.__path, *self.__position)
+            self.__pending = next(self.__reader, None)
+        return self.__pending
+
+    def __seek(self, offset: int or None, line: int or None) -> None:
+        """ Reprend la lecture de la trace à la position spécifiée (None pour le début). """
+        if self.__reader is not None:
+            self.__reader.close()  # ferme le fichier
+        self.__reader = None
+        self.__position = offset, line
+        self.__pending = None
+
+    @property
+    def order_count(self) -> int:
+        """ Nombre de commandes dans la trace. """
+        return self.__order_count
+
+    @property
+    def duration(self) -> float:
+        """ Durée de la trace (en secondes, avant mise à l'échelle). """
+        return self.__duration
+
+
+def read(path: str, offset: int = None, line: int = None):
+    """
+    Lit une trace commande par commande (voir le module).
+    :param path: fichier de la trace (CSV ou JSONL)
+    :param offset: position dans le fichier où reprendre la lecture (None pour le début)
+    :param line: numéro de la ligne à cette position (pour les messages d'erreur)
+    :return: itérateur de ((instant, ingrédients, type de boisson, frites, délai de livraison), (position, ligne)) où
+             (position, ligne) suit la commande
+    """
+    try:
+        file = open(path, 'rb')
+    except OSError as error:
+        raise ModelError(f"trace illisible : {error}") from None
+
+    with file:
+        columns = None
+        if not path.lower().endswith('.jsonl'):
+            columns = [column.strip() for column in next(csv.reader([file.readline().decode()]), [])]
+            if missing := {'time'}.difference(columns):
+                raise ModelError(f"{path} : colonnes manquantes dans l'en-tête : {', '.join(sorted(missing))}")
+        if offset is None:
+            offset, line = file.tell(), 2 if columns else 1
+        file.seek(offset)
+
+        for text in iter(file.readline, b''):
+            offset += len(text)
+            text = text.decode().strip()
+            if text:
+                try:
+                    if columns:
+                        fields = dict(zip(columns, next(csv.reader(io.StringIO(text)))))
+                    else:
+                        fields = json.loads(text)
+                    order = _parse_order(fields)
+                except (ValueError, TypeError, AttributeError) as error:
+                    raise ModelError(f"{path}, ligne {line} : commande invalide ({error})") from None
+                yield order, (offset, line + 1)
+            line += 1
+
+
+def summarize(path: str) -> tuple:
+    """
+    Parcourt une trace en entier pour la valider et la résumer, sans la garder en mémoire.
+    :param path: fichier de la trace (CSV ou JSONL)
+    :return: (nombre de commandes, durée en secondes, commandes par minute au plus fort d'une minute, commandes avec
+             boisson, commandes avec frites, commandes avec délai de livraison)
+    """
+    count = beverages = fries_count = deadlines = peak = 0
+    previous = 0.0
+    window = collections.deque()  # instants des commandes de la dernière minute
+    for (time, _, beverage, fries, deadline), (_, line) in read(path):
+        if time < previous:
+            raise ModelError(f"{path}, ligne {line - 1} : instant {time} antérieur à la commande précédente")
+        previous = time
+
+        window.append(time)
+        while window[0] <= time - 60.0:
+            window.popleft()
+        peak = max(peak, len(window))
+
+        count += 1
+        beverages += beverage is not None
+        fries_count += fries
+        deadlines += deadline is not None
+    return count, previous, peak, beverages, fries_count, deadlines
+
+
+def write(path: str, orders) -> int:
+    """
+    Écrit une trace (CSV, ou JSONL selon l'extension du fichier).
+    :param path: fichier de la trace
+    :param orders: itérable de (instant, repas, délai de livraison)
+    :return: nombre de commandes écrites
+    """
+    count = 0
+    with open(path, 'w', newline='') as file:
+        writer = None
+        if not path.lower().endswith('.jsonl'):
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+
+        for time, meal, deadline in orders:
+            burger = [ingredient.ingredient_type().name for ingredient in meal.burger.ingredients] if meal.burger \
+                else []
+            beverage = meal.beverage.beverage_type().name if meal.beverage else None
+            fries = 1 if meal.fries else 0
+            if writer:
+                writer.writerow((f'{time:.3f}', ' '.join(burger), beverage or '', fries, f'{deadline:.3f}'))
+            else:
+                file.write(json.dumps(dict(zip(COLUMNS, (round(time, 3), burger, beverage, fries,
+                                                         round(deadline, 3))))) + '\n')
+            count += 1
+    return count
+
+
+def _parse_order(fields: dict) -> tuple:
+    """ Valide les champs d'une commande et les convertit (voir read). """
+    if fields.get('time') in (None, ''):
+        raise ValueError("instant manquant")
+    time = float(fields['time'])
+    if time < 0.0:
+        raise ValueError(f"instant négatif : {time}")
+
+    burger = fields.get('burger') or ()
+    if isinstance(burger, str):
+        burger = burger.split()
+    burger = tuple(_member(IngredientType, name) for name in burger)
+
+    beverage = fields.get('beverage') or ''
+    beverage = _member(BeverageType, beverage) if beverage.strip() else None
+
+    fries = str(fields.get('fries') or '').strip().lower()
+    if fries not in _TRUE + _FALSE:
+        raise ValueError(f"frites invalides : {fries!r}")
+    fries = fries in _TRUE
+
+    deadline = fields.get('deadline')
+    deadline = float(deadline) if deadline not in (None, '') else None
+    if deadline is not None and deadline <= 0.0:
+        raise ValueError(f"délai de livraison invalide : {deadline}")
+
+    return time, burger, beverage, fries, deadline
+
+
+def _member(enum: type, name: str):
+    """ Membre d'une énumération à partir de son nom (sans égard à la casse). """
+    try:
+        return enum[name.strip().upper()]
+    except KeyError:
+        raise ValueError(f"{enum.__name__} inconnu : {name!r}") from None
+
+
+def _generate(model: ArrivalModel, deadlines: arrivals.DeadlineModel, duration: float):
+    """ Génère les commandes d'une trace à partir de modèles, jusqu'à la durée spécifiée (voir write). """
+    time = model.first_gap(1.0)
+    while time is not None and time <= duration:
+        meal = Meal()
+        if burger := Burger.random():
+            meal.add_burger(burger)
+        if beverage := Beverage.random():
+            meal.add_beverage(beverage)
+        if fries := Fries.random():
+            meal.add_fries(fries)
+        yield time, meal, deadlines.draw()
+
+        gap = model.next_gap(1.0)
+        time = time + gap if gap is not None else None
+
+
+def __order_trace() -> None:
+    """ Résume une trace de commandes, ou en produit une à partir d'un modèle d'arrivée. """
+    parser = argparse.ArgumentParser(description='Traces de commandes (voir --arrivals trace:path=FICHIER)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    info = commands.add_parser('info', help='résume une trace')
+    info.add_argument('trace', help='fichier de la trace (CSV ou JSONL)')
+
+    generate = commands.add_parser('generate', help="produit une trace à partir d'un modèle d'arrivée")
+    generate.add_argument('trace', help='fichier de la trace à produire (CSV, ou JSONL selon son extension)')
+    generate.add_argument('--arrivals', default='uniform', help="modèle d'arrivée (voir arrivals.py)")
+    generate.add_argument('--deadlines', default='uniform', help='modèle de délais de livraison (voir arrivals.py)')
+    generate.add_argument('--duration', type=float, default=3600.0, help='durée de la trace (en secondes)')
+    generate.add_argument('--seed', type=int, default=0, help='germe du générateur aléatoire')
+
+    arguments = parser.parse_args()
+    try:
+        if arguments.command == 'generate':
+            model = arrivals.parse_arrivals(arguments.arrivals)
+            deadlines = arrivals.parse_deadlines(arguments.deadlines)
+            random.seed(arguments.seed)
+            count = write(arguments.trace, _generate(model, deadlines, arguments.duration))
+            print(f"{count} commandes écrites dans {arguments.trace}")
+        else:
+            count, duration, peak, beverages, fries, deadlines = summarize(arguments.trace)
+            print(f"Commandes                {count}")
+            print(f"Durée                    {duration / 60.0:.1f} min")
+            print(f"Taux moyen               {count / duration * 60.0 if duration else 0.0:.2f} commandes/min")
+            print(f"Taux maximal             {peak} commandes/min")
+            for label, value in (('Avec boisson', beverages), ('Avec frites', fries),
+                                 ('Avec délai de livraison', deadlines)):
+                print(f"{label:24} {value / count * 100.0 if count else 0.0:5.1f} %")
+    except ModelError as error:
+        parser.error(str(error))
+
+
+if __name__ == '__main__':
+    __order_trace()
@@ -1,72 +1,127 @@
-import random
-import time
-
 from queue import Queue
-from threading import Thread, Event
+from threading import Event
 
+import events
+import settings
+import snapshot
+import timers
+from arrivals import ArrivalModel, DeadlineModel, UniformArrivals, UniformDeadlines
 from beverage import Beverage
 from burger import Burger
 from fries import Fries
 from meal import Meal
 
 
-ORDER_TICK = 0.20  # en secondes
-
-
-class Order(Thread):
+class Order:
     """
     Commande. Une commande contient un hambourgeois et peut-être une boisson et peut-être un cornet de frites.
     Chaque commande doit être préparée et livrée dans un temps aléatoire déterminé au moment de sa création.
     """
 
-    __MIN_EXPIRATION_TIME = 60.0  # en secondes
-    __MAX_EXPIRATION_TIME = 240.0  # en secondes
+    __DEFAULT_DEADLINES = UniformDeadlines()  # de 60 à 240 secondes
+    __MIN_DELAY = 1e-6  # attente minimale (en secondes) du compte à rebours : en deçà, le temps n'avance plus
 
-    def __init__(self, order_id: int) -> None:
+    def __init__(self, order_id: int, meal: Meal = None, expiration_time: float = None,
+                 deadlines: DeadlineModel = None) -> None:
         """
         Initialise la commande.
         :param order_id: identifiant de la commande (unique et créé par le générateur de commandes)
+        :param meal: repas commandé, None pour un repas aléatoire
+        :param expiration_time: temps (en secondes) pour compléter la commande, None pour un temps aléatoire
+        :param deadlines: modèle dont est tiré le temps aléatoire (voir arrivals), None pour le modèle par défaut
         """
-        super().__init__()
-
         self.__order_id = order_id
 
-        self.__meal = Meal()
-        burger = Burger.random()
-        if burger:
-            self.__meal.add_burger(burger)
-        beverage = Beverage.random()
-        if beverage:
-            self.__meal.add_beverage(beverage)
-        fries = Fries.random()
-        if fries:
-            self.__meal.add_fries(fries)
-
-        self.__expiration_time = random.uniform(Order.__MIN_EXPIRATION_TIME, Order.__MAX_EXPIRATION_TIME)
+        if meal is None:
+            meal = Meal()
+            burger = Burger.random()
+            if burger:
+                meal.add_burger(burger)
+            beverage = Beverage.random()
+            if beverage:
+                meal.add_beverage(beverage)
+            fries = Fries.random()
+            if fries:
+                meal.add_fries(fries)
+        self.__meal = meal
+
+        if expiration_time is None:
+            expiration_time = (deadlines or Order.__DEFAULT_DEADLINES).draw()
+        self.__expiration_time = expiration_time
         self.__remaining_time = self.__expiration_time
 
-        self.__event = Event()  # événement servant à arrêter la tâche (va aussi la réveiller si nécessaire)
+        self.__timer = None  # minuterie du compte à rebours (None tant que la commande n'est pas démarrée)
 
-    def run(self) -> None:
-        """ Méthode principale exécutée par la tâche de commande. """
-        previous_time = time.time()
-
-        while not self.__event.is_set():
-            now = time.time()
-            self.__remaining_time = max(0, self.__remaining_time - (now - previous_time))
-            previous_time = now
-            self.__event.wait(ORDER_TICK)
+    def start(self) -> None:
+        """ Démarre le compte à rebours de la commande. """
+        if not self.__timer:
+            self.__timer = timers.start(self.__count_down())
 
     def stop(self) -> None:
-        """ Arrête la tâche de commande. """
-        self.__event.set()
+        """ Arrête le compte à rebours de la commande. """
+        if self.__timer:
+            self.__timer.cancel()
+
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de la commande (voir Game.snapshot).
+        :return: état de la commande
+        """
+        return (self.__order_id, snapshot.encode_food(self.__meal), self.__expiration_time, self.__remaining_time,
+                self.__timer is not None, self.__timer.progress() if self.__timer else None)
+
+    @classmethod
+    def from_snapshot(cls, state: tuple) -> 'Order':
+        """
+        Reconstruit une commande, y compris son compte à rebours (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: la commande reconstruite
+        """
+        order_id, meal, expiration_time, remaining_time, started, wait = state
+        order = cls(order_id, snapshot.decode_food(meal), expiration_time)
+        order.__remaining_time = remaining_time
+        if started:
+            order.__timer = timers.start(order.__count_down(), resume=wait)
+        return order
+
+    def __count_down(self) -> timers.Routine:
+        """
+        Routine qui décompte le temps restant pour compléter la commande. Elle ne se réveille que lorsque la barre du
+        temps restant (voir OrderSprite) perd un pixel, puis à l'expiration; entre deux réveils, le temps restant est
+        calculé à partir de l'attente en cours (voir get_remaining_time).
+        """
+        step = self.__expiration_time / settings.ORDER_TIME_BAR_WIDTH
+        while self.__remaining_time > 0:
+            # la largeur de la barre est arrondie : elle change à mi-chemin entre deux multiples du pas
+            delay = (self.__remaining_time - step / 2) % step
+            if delay < Order.__MIN_DELAY:
+                delay += step
+            elapsed = yield min(delay, self.__remaining_time)
+            remaining_time = self.__remaining_time - elapsed
+            self.__remaining_time = remaining_time if remaining_time >= Order.__MIN_DELAY else 0
+        events.bus.publish(events.EventType.ORDER_EXPIRED, order=self)
+
+    def get_remaining_time(self) -> float:
+        """
+        Récupère le temps qui reste pour compléter la commande, y compris l'attente en cours de son compte à rebours.
+        :return: temps restant (en secondes)
+        """
+        progress = self.__timer.progress() if self.__timer else None
+        return max(0.0, self.__remaining_time - progress[0]) if progress else self.__remaining_time
 
     def get_remaining_time_percentage(self) -> float:
         """
         Récupère le temps qui reste pour compléter la commande (en pourcentage).
         :return: pourcentage du temps restant (de 0.0 à 100.0)
         """
-        return self.__remaining_time / self.__expiration_time * 100.0
+        return self.get_remaining_time() / self.__expiration_time * 100.0
+
+    def get_elapsed_time(self) -> float:
+        """
+        Récupère le temps écoulé depuis le démarrage de la commande.
+        :return: temps écoulé (en secondes)
+        """
+        return self.__expiration_time - self.get_remaining_time()
 
     def has_expired(self) -> bool:
         return self.__remaining_time == 0
@@ -111,38 +166,94 @@ class Order(Thread):
     def order_id(self) -> int:
         return self.__order_id
 
+    @property
+    def expiration_time(self) -> float:
+        """ Temps (en secondes) accordé pour compléter la commande. """
+        return self.__expiration_time
+
 
-class __OrderSpawner(Thread):
+class __OrderSpawner:
     """
-    Générateur de commandes.
+    Générateur de commandes. Les délais entre les commandes et les délais de livraison sont tirés de modèles
+    interchangeables (voir arrivals).
     """
-    __DEFAULT_MIN_TIME_BETWEEN_ORDERS = 20  # en secondes
-    __DEFAULT_MAX_TIME_BETWEEN_ORDERS = 45  # en secondes
-
-    __TIME_BEFORE_FIRST_ORDER = 2  # en secondes
-
     __next_order_id = 1
 
-    def __init__(self) -> None:
-        super().__init__()
-
+    def __init__(self, arrivals: ArrivalModel = None, deadlines: DeadlineModel = None) -> None:
+        """
+        Initialise le générateur de commandes.
+        :param arrivals: modèle d'arrivée des commandes, None pour des délais uniformes de 20 à 45 secondes
+        :param deadlines: modèle de délais de livraison, None pour des délais uniformes de 60 à 240 secondes
+        """
         self.__queue = Queue()  # queue dans laquelle on place les commandes générées
-        self.__event = Event()  # événement servant à arrêter la tâche (va aussi la réveiller si nécessaire)
+        self.__event = Event()  # événement indiquant que le générateur est arrêté
+        self.__timer = None
 
-        self.__min_time_between = self.__DEFAULT_MIN_TIME_BETWEEN_ORDERS
-        self.__max_time_between = self.__DEFAULT_MAX_TIME_BETWEEN_ORDERS
+        self.__arrivals = arrivals or UniformArrivals()
+        self.__deadlines = deadlines or UniformDeadlines()
 
         self.__acceleration_factor = 1.0
         self.__creating_orders = True  # va créer des incidents seulement si __creating_incidents est True
+        self.__first_order = True  # la première commande n'a pas encore été générée
+
+    def start(self) -> None:
+        """ Démarre le générateur de commandes (sans effet s'il est déjà démarré, par exemple par restore). """
+        if not self.__timer:
+            self.__timer = timers.start(self.__spawn())
 
-    def run(self) -> None:
-        """ Méthode principale exécutée par la tâche du générateur de commandes. """
-        # attendre un certain temps avant de générer la première commande
-        self.__create_and_send_next_order(self.__TIME_BEFORE_FIRST_ORDER, self.__TIME_BEFORE_FIRST_ORDER + 2)
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état du générateur de commandes (voir Game.snapshot).
+        :return: état du générateur
+        """
+        queued = tuple(order.snapshot() for order in list(self.__queue.queue))
+        return (queued, self.__acceleration_factor, self.__creating_orders, self.__first_order,
+                self.__next_order_id, self.__timer.progress() if self.__timer else None, self.__arrivals.snapshot())
 
-        # tant que la tâche exécute, on génère des commandes
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état du générateur de commandes, y compris l'attente de la prochaine commande (voir Game.restore).
+        La routine reprise ne tire pas de nouveau délai : elle termine l'attente rétablie.
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
+
+        (queued, self.__acceleration_factor, self.__creating_orders, self.__first_order, next_order_id, wait,
+         arrivals) = state
+        self.__next_order_id = next_order_id
+        self.__arrivals.restore(arrivals)
+        self.__queue = Queue()
+        for order_state in queued:
+            order = Order.from_snapshot(order_state)
+            self.__queue.put(order)
+            events.bus.publish(events.EventType.ORDER_SPAWNED, order=order)
+
+        if wait and not self.__event.is_set():
+            self.__timer = timers.start(self.__spawn(resumed=True), resume=wait)
+
+    def __spawn(self, resumed: bool = False) -> timers.Routine:
+        """
+        Routine principale du générateur de commandes.
+        :param resumed: True si la routine reprend une attente rétablie (voir restore) : son premier délai n'est pas
+                        tiré du modèle d'arrivée, ce qui ferait avancer l'état rétabli du modèle
+        :return: routine qui génère les commandes
+        """
+        # tant que le générateur n'est pas arrêté (ou que le modèle a des commandes), on génère des commandes; la
+        # première commande a son propre délai
         while not self.__event.is_set():
-            self.__create_and_send_next_order(self.__min_time_between, self.__max_time_between)
+            if resumed:
+                delay, resumed = 0.0, False
+            elif self.__first_order:
+                delay = self.__arrivals.first_gap(self.__acceleration_factor)
+            else:
+                delay = self.__arrivals.next_gap(self.__acceleration_factor)
+            if delay is None:
+                break
+            yield from self.__create_and_send_next_order(delay)
+            self.__first_order = False
 
     def pause(self) -> None:
         """ Pause la génération de commandes. """
@@ -155,6 +266,12 @@ class __OrderSpawner(Thread):
     def stop(self) -> None:
         """ Arrête le générateur de commandes. """
         self.__event.set()
+        if self.__timer:
+            self.__timer.cancel()
+
+    def is_stopped(self) -> bool:
+        """ Indique si le générateur de commandes a été arrêté (il ne peut plus être redémarré). """
+        return self.__event.is_set()
 
     def get(self) -> list:
         """
@@ -179,34 +296,61 @@ class __OrderSpawner(Thread):
             self.__queue.put(order)
 
 
-    def __create_and_send_next_order(self, min_delay: int, max_delay: int) -> None:
+    def __create_and_send_next_order(self, delay: float) -> timers.Routine:
         """
         Crée et envoie la prochaine commande.
-        :param min_delay: délai minimum à respecter avant de créer la commande
-        :param max_delay: délai maximal pour créer la commande
-        :return: aucun
+        :param delay: délai (en secondes) à attendre avant de créer la commande
+        :return: routine qui attend le délai puis crée la commande
         """
+        yield delay
 
-        time_to_order = random.uniform(min_delay, max_delay) / self.__acceleration_factor
-        self.__event.wait(time_to_order)
-
-        if self.__creating_orders:
-            self.__queue.put(Order(self.__next_order_id))
+        # la composition est récupérée même si la génération est en pause, pour qu'une trace avance quand même
+        meal, expiration_time = self.__arrivals.next_order()
+        if self.__creating_orders and not self.__event.is_set():
+            order = Order(self.__next_order_id, meal, expiration_time, deadlines=self.__deadlines)
+            self.__queue.put(order)
             self.__next_order_id += 1
+            events.bus.publish(events.EventType.ORDER_SPAWNED, order=order)
 
     def increase_acceleration(self, increment: float) -> None:
         self.__acceleration_factor *= increment
 
     def reset(self):
         self.__acceleration_factor = 1.0
+        self.__arrivals.reset()
+
+    def configure(self, arrivals: ArrivalModel = None, deadlines: DeadlineModel = None) -> None:
+        """
+        Remplace les modèles du générateur (voir __init__), par exemple pour une nouvelle partie.
+        :param arrivals: modèle d'arrivée des commandes, None pour le modèle par défaut
+        :param deadlines: modèle de délais de livraison, None pour le modèle par défaut
+        :return: aucun
+        """
+        self.__arrivals = arrivals or UniformArrivals()
+        self.__deadlines = deadlines or UniformDeadlines()
+
+    @property
+    def arrivals(self) -> ArrivalModel:
+        return self.__arrivals
+
+    @property
+    def deadlines(self) -> DeadlineModel:
+        return self.__deadlines
 
 # générateur de commandes (singleton implémenté avec un Global Object Pattern de python)
 spawner = None
 
 
-def init() -> None:
-    """ Initialise le spawner, mais ne le démarre pas. """
+def init(arrivals: ArrivalModel = None, deadlines: DeadlineModel = None) -> None:
+    """
+    Initialise le spawner, mais ne le démarre pas. Un spawner arrêté est remplacé par un nouveau.
+    :param arrivals: modèle d'arrivée des commandes (voir arrivals), None pour le modèle par défaut
+    :param deadlines: modèle de délais de livraison (voir arrivals), None pour le modèle par défaut
+    :return: aucun
+    """
 
     global spawner
-    if not spawner:
-        spawner = __OrderSpawner()
+    if not spawner or spawner.is_stopped():
+        spawner = __OrderSpawner(arrivals, deadlines)
+    else:
+        spawner.configure(arrivals, deadlines)
@@ -1,6 +1,9 @@
 import pygame
 
+import metrics
+import surface_pool
 import settings
+import snapshot
 from beverage import Beverage
 from burger import Burger
 from food import Food
@@ -8,11 +11,13 @@ from fries import Fries
 from meal import Meal
 
 
-class Platter(pygame.sprite.Sprite):
+class Platter(surface_pool.PooledSprite):
     """
     Assiette de service. On y place la nourriture pour confectionner un repas avant de l'emballer et de le livrer.
     """
 
+    __SURFACE_REBUILDS = metrics.SURFACE_REBUILDS.labels('Platter')  # compteur des reconstructions d'images
+
     WIDTH = 60
     HEIGHT = 60
 
@@ -44,6 +49,22 @@ class Platter(pygame.sprite.Sprite):
 
         self.image = self.__build_surface()
 
+    def snapshot(self) -> tuple:
+        """
+        Produit l'état de l'assiette de service (voir Game.snapshot).
+        :return: état de l'assiette
+        """
+        return tuple(snapshot.encode_food(food) for food in (self.__burger, self.__beverage, self.__fries))
+
+    def restore(self, state: tuple) -> None:
+        """
+        Rétablit l'état de l'assiette de service (voir Game.restore).
+        :param state: état produit par snapshot
+        :return: aucun
+        """
+        self.__burger, self.__beverage, self.__fries = (snapshot.decode_food(food) for food in state)
+        self.image = self.__build_surface()
+
 
     def add_food(self, food: Food) -> bool:
         """
@@ -91,12 +112,25 @@ class Platter(pygame.sprite.Sprite):
 
         return meal
 
+    @property
+    def burger(self) -> Burger or None:
+        return self.__burger
+
+    @property
+    def beverage(self) -> Beverage or None:
+        return self.__beverage
+
+    @property
+    def fries(self) -> Fries or None:
+        return self.__fries
+
     def __build_surface(self) -> pygame.Surface:
         """
         Construit l'image représentant l'assiette de service et le repas en cours de confection.
         :return: surface représentant l'assiette
         """
-        surface = pygame.Surface((Platter.WIDTH, Platter.HEIGHT), flags=pygame.SRCALPHA)
+        Platter.__SURFACE_REBUILDS.inc()
+        surface = surface_pool.pool.acquire((Platter.WIDTH, Platter.HEIGHT))
 
         pygame.draw.circle(surface, settings.PLATTER_COLOR, (30, 30), 30)
         pygame.draw.circle(surface, settings.PLATTER_DARK_COLOR, (30, 30), 26)
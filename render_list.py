@@ -0,0 +1,64 @@
+"""
+Liste de rendu.
+
+Tout ce qui est dessiné à chaque trame est rangé par couches, de la plus basse à la plus haute. Chaque couche est
+soumise en un seul appel à Surface.blits, au lieu d'un appel de dessin (et d'une boucle Python) par groupe de sprites.
+"""
+import pygame
+
+
+class RenderList:
+    """
+    Liste de rendu. Une couche contient soit des sprites, ajoutés une fois pour toutes (la liste n'est pas reconstruite
+    à chaque trame; l'image et la position courantes de chaque sprite sont lues au moment du dessin), soit une source
+    qui fournit ses paires (image, position) au moment du dessin (sprites interpolés, textes).
+    """
+
+    def __init__(self) -> None:
+        self.__sprites = {}  # couche -> sprites, dans l'ordre de dessin
+        self.__sources = {}  # couche -> fonction (alpha) -> [(image, position), ...]
+        self.__layers = []  # couches, de la plus basse à la plus haute
+
+    def add(self, layer: int, *sprites: pygame.sprite.Sprite) -> None:
+        """
+        Ajoute des sprites à une couche (dessinés après ceux qui y sont déjà).
+        :param layer: couche (les couches plus hautes sont dessinées par-dessus)
+        :param sprites: sprites à ajouter
+        :return: aucun
+        """
+        if layer in self.__sources:
+            raise ValueError(f"la couche {layer} a déjà une source")
+        self.__add_layer(layer)
+        self.__sprites.setdefault(layer, []).extend(sprites)
+
+    def set_source(self, layer: int, source) -> None:
+        """
+        Associe une source à une couche.
+        :param layer: couche (les couches plus hautes sont dessinées par-dessus)
+        :param source: fonction qui reçoit alpha (voir draw) et retourne les paires (image, position) à dessiner
+        :return: aucun
+        """
+        if layer in self.__sprites:
+            raise ValueError(f"la couche {layer} contient déjà des sprites")
+        self.__add_layer(layer)
+        self.__sources[layer] = source
+
+    def draw(self, surface: pygame.Surface, alpha: float = 1.0) -> None:
+        """
+        Dessine toutes les couches, un appel à Surface.blits par couche.
+        :param surface: surface sur laquelle dessiner
+        :param alpha: fraction de mise à jour écoulée depuis la dernière mise à jour de la simulation, transmise aux
+                      sources (1.0 pour les positions actuelles)
+        :return: aucun
+        """
+        for layer in self.__layers:
+            if source := self.__sources.get(layer):
+                surface.blits(source(alpha), doreturn=False)
+            else:
+                surface.blits([(sprite.image, sprite.rect) for sprite in self.__sprites[layer]], doreturn=False)
+
+    def __add_layer(self, layer: int) -> None:
+        """ Ajoute une couche, à sa place, si elle n'existe pas encore. """
+        if layer not in self.__layers:
+            self.__layers.append(layer)
+            self.__layers.sort()
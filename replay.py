@@ -0,0 +1,443 @@
+"""
+Enregistrement et relecture de parties.
+
+L'enregistreur capture le germe aléatoire de la partie, puis, trame par trame, le temps écoulé et les événements
+traités par la partie (touches et commandes de chefs cuisiniers) dans un journal binaire compact. Pendant
+l'enregistrement, les minuteries du jeu avancent au rythme des trames (temps simulé) : la partie devient ainsi
+entièrement déterminée par son germe et son journal.
+
+Le journal est découpé en segments compressés. Chaque segment commence par une image clé (numéro de trame, temps de
+jeu, empreinte et instantané de l'état de la partie) qui permet de se positionner dans le journal sans rejouer ce qui
+précède et de vérifier que la relecture ne diverge pas de la partie enregistrée.
+
+La relecture se fait sans affichage et aussi vite que possible.
+
+Exemple : python undercooked.py --record partie.ucr, puis python replay.py partie.ucr --profile
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import random
+import struct
+import time
+import zlib
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
+import pygame
+
+import arrivals
+import settings
+import snapshot
+import surface_pool
+import timers
+from game import Game
+
+
+class ReplayError(ValueError):
+    """
+    Journal de partie invalide.
+    """
+    pass
+
+
+_MAGIC = b'UCRP'
+_VERSION = 4  # 2 : modèles d'arrivée et de délais des commandes (voir arrivals) après la disposition
+              # 3 : trames précédées d'une attente de la boucle principale (voir Game.idle_time)
+              # 4 : instantané de la partie dans chaque image clé
+
+_HEADER = struct.Struct('<4sHQdH')  # signature, version, germe, accélération des commandes, nombre de chefs
+_TEXT_LENGTH = struct.Struct('<H')  # taille d'un texte (disposition, modèles)
+_KEYFRAME = struct.Struct('<IdII')  # trame, temps de jeu, empreinte de l'état, taille du segment compressé
+_KEYFRAME_STATE = struct.Struct('<dddIIII')  # temps pas encore simulé, durée, pourboires, commandes livrées et
+                                             # ratées, fins de partie (voir Game.stats), taille de l'instantané
+
+_FRAME = struct.Struct('<d')  # temps écoulé
+_KEY = struct.Struct('<Bi')  # 0 pour une touche enfoncée, 1 pour une touche relâchée; touche
+_CHEF = struct.Struct('<HBB')  # indice du chef, action, enfoncée
+
+_FRAME_TAG = b'F'
+_IDLE_FRAME_TAG = b'I'  # trame précédée d'une attente : le retard de simulation est écrêté (voir Game.step)
+_KEY_TAG = b'K'
+_CHEF_TAG = b'C'
+
+_CHEF_ACTIONS = ['left', 'right', 'up', 'down', 'interact']
+
+
+def state_digest(game: Game) -> int:
+    """
+    Calcule l'empreinte de l'état d'une partie : chefs cuisiniers, commandes en attente, pourboires,
+    statistiques et état du générateur aléatoire.
+    :param game: partie
+    :return: empreinte (CRC-32)
+    """
+    state = [game.total_tips, game.stats.delivered_orders, game.stats.missed_orders, game.stats.game_overs,
+             hash(random.getstate()[1])]  # état interne du générateur aléatoire (entiers seulement)
+    for chef in game.chefs:
+        state.extend([chef.rect.x, chef.rect.y, type(chef.food).__name__])
+    for order in game.order_board.waiting_orders:
+        state.extend([order.order_id, order.get_remaining_time_percentage()])
+
+    return zlib.crc32(repr(state).encode())
+
+
+class Recorder:
+    """
+    Enregistreur de partie. S'attache à une partie (voir le paramètre recorder de Game) qui lui transmet son
+    démarrage, ses trames, ses événements et son arrêt.
+    """
+
+    KEYFRAME_INTERVAL = 10.0  # temps de jeu (en secondes) entre deux images clés
+
+    def __init__(self, path: str, seed: int = None) -> None:
+        """
+        Initialise l'enregistreur.
+        :param path: fichier du journal à écrire
+        :param seed: germe aléatoire de la partie (tiré au hasard si None)
+        """
+        self.__path = path
+        self.__seed = random.randrange(2 ** 63) if seed is None else seed
+
+        self.__file = None
+        self.__simulated_timers = None
+        self.__previous_scheduler = None
+
+        self.__records = bytearray()  # enregistrements du segment en cours
+        self.__keyframe = None  # (trame, temps de jeu, empreinte, état de la partie) du segment en cours
+        self.__frame_count = 0
+
+    def start(self, game: Game) -> None:
+        """
+        Commence l'enregistrement : écrit l'en-tête du journal, fixe le germe aléatoire et fait avancer les
+        minuteries du jeu au rythme des trames.
+        :param game: partie enregistrée
+        :return: aucun
+        """
+        self.__file = open(self.__path, 'wb')
+        self.__file.write(_HEADER.pack(_MAGIC, _VERSION, self.__seed, game.order_acceleration, len(game.chefs)))
+        for text in (game.layout, game.arrivals.spec, game.deadlines.spec):
+            self.__file.write(_TEXT_LENGTH.pack(len(text.encode())) + text.encode())
+
+        random.seed(self.__seed)
+        self.__simulated_timers = timers.SimulatedTimers()
+        self.__previous_scheduler = timers.use(self.__simulated_timers)
+
+        self.__keyframe = None
+
+    def frame(self, game: Game, elapsed: float, idle: bool = False) -> None:
+        """
+        Enregistre le début d'une trame et fait avancer les minuteries du jeu du temps écoulé.
+        :param game: partie enregistrée
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :param idle: True si la boucle principale a dormi avant cette trame (voir Game.idle_time)
+        :return: aucun
+        """
+        if self.__keyframe and self.__simulated_timers.now - self.__keyframe[1] >= Recorder.KEYFRAME_INTERVAL:
+            self.__write_segment()
+            self.__keyframe = None
+        if not self.__keyframe:
+            self.__keyframe = self.__frame_count, self.__simulated_timers.now, state_digest(game), \
+                Recorder.__keyframe_state(game)
+
+        self.__records += (_IDLE_FRAME_TAG if idle else _FRAME_TAG) + _FRAME.pack(elapsed)
+        self.__frame_count += 1
+        self.__simulated_timers.advance(elapsed)
+
+    def event(self, event: pygame.event.Event) -> None:
+        """
+        Enregistre un événement traité par la partie.
+        :param event: touche enfoncée ou relâchée, ou commande de chef cuisinier (Game.CHEF_EVENT)
+        :return: aucun
+        """
+        if event.type == Game.CHEF_EVENT:
+            action = _CHEF_ACTIONS.index(event.action)
+            self.__records += _CHEF_TAG + _CHEF.pack(event.chef, action, bool(event.pressed))
+        else:
+            self.__records += _KEY_TAG + _KEY.pack(0 if event.type == pygame.KEYDOWN else 1, event.key)
+
+    def stop(self) -> None:
+        """
+        Termine l'enregistrement : écrit le dernier segment et rétablit le moteur de minuteries précédent.
+        :return: aucun
+        """
+        if not self.__file:
+            return
+
+        self.__write_segment()
+        self.__file.close()
+        self.__file = None
+        timers.use(self.__previous_scheduler)
+
+    def __write_segment(self) -> None:
+        """ Écrit le segment en cours (image clé, puis enregistrements compressés). """
+        if not self.__keyframe:
+            return
+        data = zlib.compress(bytes(self.__records))
+        frame, game_time, digest, state = self.__keyframe
+        self.__file.write(_KEYFRAME.pack(frame, game_time, digest, len(data)) + state + data)
+        self.__records.clear()
+
+    @staticmethod
+    def __keyframe_state(game: Game) -> bytes:
+        """ État de la partie au début d'un segment : instantané et ce qu'il ne contient pas (voir Player.seek). """
+        stats = game.stats
+        data = game.snapshot()
+        return _KEYFRAME_STATE.pack(game.tick_lag, stats.duration, stats.tips, stats.delivered_orders,
+                                    stats.missed_orders, stats.game_overs, len(data)) + data
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+
+class Player:
+    """
+    Lecteur de journal : rejoue une partie enregistrée sans affichage, en temps simulé.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Ouvre un journal et lit son en-tête et ses images clés.
+        :param path: fichier du journal
+        """
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError as error:
+            raise ReplayError(f"{path} : impossible de lire le journal ({error})") from error
+
+        try:
+            magic, version, self.__seed, self.__acceleration, self.__chef_count = _HEADER.unpack_from(data)
+            if magic != _MAGIC or not 1 <= version <= _VERSION:
+                raise ReplayError(f"{path} : ce n'est pas un journal de partie (version {_VERSION})")
+            offset = _HEADER.size
+            texts = []
+            for _ in range(3 if version >= 2 else 1):  # version 1 : modèles d'origine
+                text_length, = _TEXT_LENGTH.unpack_from(data, offset)
+                offset += _TEXT_LENGTH.size
+                texts.append(data[offset:offset + text_length].decode())
+                offset += text_length
+            self.__layout = texts[0]
+            self.__arrivals, self.__deadlines = texts[1:] or ('uniform', 'uniform')
+
+            self.__segments = []  # (trame, temps de jeu, empreinte, début des données, taille des données,
+                                  #  début de l'état de la partie ou None avant la version 4)
+            while offset < len(data):
+                frame, game_time, digest, length = _KEYFRAME.unpack_from(data, offset)
+                offset += _KEYFRAME.size
+                state = None
+                if version >= 4:
+                    state = offset
+                    *_, snapshot_length = _KEYFRAME_STATE.unpack_from(data, offset)
+                    offset += _KEYFRAME_STATE.size + snapshot_length
+                self.__segments.append((frame, game_time, digest, offset, length, state))
+                offset += length
+        except struct.error as error:
+            raise ReplayError(f"{path} : journal tronqué ({error})") from error
+
+        self.__data = data
+        self.__divergences = []
+        self.__verified_keyframes = 0
+
+    def play(self, screen: pygame.Surface, until: float = None) -> Game:
+        """
+        Rejoue la partie aussi vite que possible, jusqu'à la fin du journal ou jusqu'au temps de jeu demandé.
+        L'état de la partie est comparé à chaque image clé (voir divergences).
+        :param screen: écran virtuel de la partie
+        :param until: temps de jeu (en secondes) où s'arrêter (None pour rejouer tout le journal)
+        :return: la partie rejouée, arrêtée au temps demandé
+        """
+        pygame.event.clear()
+        simulated_timers = timers.SimulatedTimers()
+        previous_scheduler = timers.use(simulated_timers)
+
+        game = self.__new_game(screen)
+        self.__divergences = []
+        self.__verified_keyframes = 0
+
+        try:
+            random.seed(self.__seed)
+            game.start()
+            for frame, game_time, digest, offset, length, _ in self.__segments:
+                if until is not None and game_time >= until:
+                    break
+                if state_digest(game) != digest:
+                    self.__divergences.append((frame, game_time))
+                self.__verified_keyframes += 1
+
+                records = zlib.decompress(self.__data[offset:offset + length])
+                if not Player.__play_segment(game, simulated_timers, records, until):
+                    break
+            game.stop()
+        finally:
+            timers.use(previous_scheduler)
+
+        return game
+
+    def seek(self, screen: pygame.Surface, game_time: float) -> Game:
+        """
+        Se positionne à un temps de jeu donné : la partie est rétablie à la dernière image clé qui le précède, puis
+        le reste de son segment est rejoué. Seule cette image clé est vérifiée (voir divergences) et les statistiques
+        détaillées (latences, occupation des appareils) ne couvrent que le segment rejoué. Les journaux sans
+        instantanés (avant la version 4) sont rejoués depuis le début.
+        :param screen: écran virtuel de la partie
+        :param game_time: temps de jeu (en secondes) à rejoindre
+        :return: la partie rejouée jusqu'à ce temps
+        """
+        segments = [segment for segment in self.__segments if segment[1] < game_time]
+        if not segments or segments[-1][5] is None:
+            return self.play(screen, until=game_time)
+
+        frame, keyframe_time, digest, offset, length, state = segments[-1]
+        tick_lag, duration, tips, delivered_orders, missed_orders, game_overs, snapshot_length = \
+            _KEYFRAME_STATE.unpack_from(self.__data, state)
+        state += _KEYFRAME_STATE.size
+
+        pygame.event.clear()
+        simulated_timers = timers.SimulatedTimers(keyframe_time)
+        previous_scheduler = timers.use(simulated_timers)
+
+        game = self.__new_game(screen)
+        self.__divergences = []
+        self.__verified_keyframes = 0
+
+        try:
+            random.seed(self.__seed)
+            game.start()
+            stats = game.stats  # avant l'instantané : les appareils occupés le sont à partir de ce temps de jeu
+            stats.duration, stats.tips = duration, tips
+            stats.delivered_orders, stats.missed_orders, stats.game_overs = delivered_orders, missed_orders, game_overs
+            try:
+                game.restore(self.__data[state:state + snapshot_length])
+            except snapshot.SnapshotError as error:
+                raise ReplayError(f"image clé de la trame {frame} illisible ({error})") from error
+            game.tick_lag = tick_lag
+
+            if state_digest(game) != digest:
+                self.__divergences.append((frame, keyframe_time))
+            self.__verified_keyframes = 1
+
+            records = zlib.decompress(self.__data[offset:offset + length])
+            Player.__play_segment(game, simulated_timers, records, game_time)
+            game.stop()
+        finally:
+            timers.use(previous_scheduler)
+
+        return game
+
+    def __new_game(self, screen: pygame.Surface) -> Game:
+        """ Partie sans affichage configurée comme la partie enregistrée. """
+        return Game(screen, headless=True, order_acceleration=self.__acceleration, layout=self.__layout,
+                    chef_count=self.__chef_count, arrivals=arrivals.parse_arrivals(self.__arrivals),
+                    deadlines=arrivals.parse_deadlines(self.__deadlines))
+
+    @staticmethod
+    def __play_segment(game: Game, simulated_timers: timers.SimulatedTimers, records: bytes,
+                       until: float or None) -> bool:
+        """
+        Rejoue les trames d'un segment.
+        :return: False si le temps de jeu demandé est atteint, True sinon
+        """
+        offset = 0
+        elapsed = None
+        idle = False
+        while True:
+            tag = records[offset:offset + 1]
+            if tag == _KEY_TAG:
+                key_up, key = _KEY.unpack_from(records, offset + 1)
+                pygame.event.post(pygame.event.Event(pygame.KEYUP if key_up else pygame.KEYDOWN, key=key))
+                offset += 1 + _KEY.size
+                continue
+            if tag == _CHEF_TAG:
+                chef, action, pressed = _CHEF.unpack_from(records, offset + 1)
+                pygame.event.post(pygame.event.Event(Game.CHEF_EVENT, chef=chef, action=_CHEF_ACTIONS[action],
+                                                     pressed=bool(pressed)))
+                offset += 1 + _CHEF.size
+                continue
+
+            # début d'une trame (ou fin du segment) : on joue la trame précédente avec ses événements
+            if elapsed is not None:
+                game.step(elapsed, idle)
+            if not tag:
+                return True
+            if until is not None and simulated_timers.now >= until:
+                pygame.event.clear()
+                return False
+
+            idle = tag == _IDLE_FRAME_TAG
+            elapsed, = _FRAME.unpack_from(records, offset + 1)
+            offset += 1 + _FRAME.size
+            simulated_timers.advance(elapsed)
+
+    @property
+    def seed(self) -> int:
+        return self.__seed
+
+    @property
+    def layout(self) -> str:
+        return self.__layout
+
+    @property
+    def keyframes(self) -> list:
+        """ Images clés du journal : (trame, temps de jeu) du début de chaque segment. """
+        return [(frame, game_time) for frame, game_time, *_ in self.__segments]
+
+    @property
+    def verified_keyframes(self) -> int:
+        """ Nombre d'images clés vérifiées lors de la dernière relecture. """
+        return self.__verified_keyframes
+
+    @property
+    def divergences(self) -> list:
+        """ Images clés (trame, temps de jeu) où la dernière relecture différait de la partie enregistrée. """
+        return self.__divergences
+
+
+def __replay() -> None:
+    """ Point d'entrée de la ligne de commande. """
+    parser = argparse.ArgumentParser(description="Relecture sans affichage d'une partie enregistrée")
+    parser.add_argument('path', help='journal de la partie (voir undercooked.py --record)')
+    parser.add_argument('--until', type=float, help="temps de jeu (en secondes) où arrêter la relecture")
+    parser.add_argument('--profile', action='store_true', help='profile la relecture')
+    arguments = parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+
+    player = Player(arguments.path)
+    profiler = cProfile.Profile() if arguments.profile else None
+
+    start_time = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    game = player.play(screen, arguments.until)
+    if profiler:
+        profiler.disable()
+    wall_time = time.perf_counter() - start_time
+
+    stats = game.stats
+    print(f"Partie rejouée : {stats.duration:.1f} s de jeu en {wall_time:.2f} s "
+          f"({stats.duration / wall_time if wall_time > 0 else 0.0:.0f}x le temps réel), germe {player.seed}")
+    print(f"Pourboires {stats.tips:.2f}, commandes livrées {stats.delivered_orders}, "
+          f"manquées {stats.missed_orders}, fins de partie {stats.game_overs}")
+
+    if player.divergences:
+        frame, game_time = player.divergences[0]
+        print(f"DIVERGENCE : {len(player.divergences)} image(s) clé(s) sur {player.verified_keyframes} "
+              f"ne correspondent pas, la première à la trame {frame} ({game_time:.1f} s)")
+    else:
+        print(f"Aucune divergence ({player.verified_keyframes} images clés vérifiées)")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+        pool = surface_pool.pool.statistics()
+        print(f"Réserve d'images : {pool['allocated']} allouée(s), {pool['reused']} réutilisée(s), "
+              f"{pool['free']} libre(s)")
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    __replay()
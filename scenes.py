@@ -0,0 +1,337 @@
+"""
+Scènes du jeu.
+
+Le jeu passe d'une scène à l'autre : écran titre -> partie -> fin de partie -> partie -> ... Chaque scène est
+exécutée une trame à la fois par la boucle principale (run ou run_async), qui ne bloque jamais : les événements
+continuent d'être traités pendant les écrans de transition (on peut quitter à tout moment).
+
+Pendant l'écran titre, la partie est construite et les images sont décodées. Pendant l'écran de fin de partie, les
+minuteries sont suspendues (voir timers.pause) : les commandes n'expirent pas et n'arrivent pas pendant que le
+joueur ne peut pas jouer; la partie suivante est préparée (état initial rétabli) pendant que l'écran est affiché.
+
+La pause (voir Game.PAUSE_KEY) suspend aussi les minuteries, puis la boucle principale dort en attendant une touche :
+rien n'est mis à jour ni dessiné tant que la partie est en pause.
+
+Après chaque trame, la scène indique pendant combien de temps rien de visible ne peut changer (voir Scene.idle_time) :
+la boucle principale dort jusque-là, ou jusqu'à ce que le joueur agisse, plutôt que de redessiner la même image.
+"""
+import asyncio
+import math
+import time
+
+import pygame
+
+import assets
+import settings
+import timers
+
+_WAKE_MARGIN = 0.002  # réveil un peu après l'échéance attendue : les routines arrivées à échéance ont déjà agi
+
+
+class Scene:
+    """
+    Scène : un état de la boucle principale.
+    """
+
+    FRAME_RATE = 30  # nombre maximal de trames par seconde (les écrans de transition n'ont pas besoin de plus)
+    INPUT_POLL_INTERVAL = 1 / 60  # intervalle (en secondes) de vérification des événements pendant une attente asyncio
+
+    @property
+    def frame_rate(self) -> int:
+        return self.FRAME_RATE
+
+    def enter(self) -> None:
+        """ Appelé lorsque la scène devient la scène courante. """
+        pass
+
+    def exit(self) -> None:
+        """ Appelé lorsque la scène cède sa place à une autre scène. """
+        pass
+
+    def update(self, elapsed: float) -> 'Scene' or None:
+        """
+        Exécute une trame de la scène.
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :return: la scène suivante (la scène elle-même pour y rester), None pour quitter le jeu
+        """
+        return self
+
+    def idle_time(self) -> float:
+        """
+        Délai pendant lequel l'affichage de la scène ne changera pas, à moins que le joueur agisse.
+        :return: délai (en secondes), 0.0 pour exécuter la trame suivante à la cadence de la scène
+        """
+        return 0.0
+
+    def close(self) -> None:
+        """ Appelé lorsque le jeu se termine pendant que la scène est la scène courante. """
+        pass
+
+
+class TitleScene(Scene):
+    """
+    Écran titre. La partie est construite pendant qu'il est affiché.
+    """
+
+    def __init__(self, screen: pygame.Surface, prepare) -> None:
+        """
+        Initialise l'écran titre.
+        :param screen: écran où afficher le titre
+        :param prepare: fonction sans paramètre qui construit et retourne la partie
+        """
+        self.__screen = screen
+        self.__prepare = prepare
+        self.__game = None
+        self.__elapsed = 0.0
+
+    def enter(self) -> None:
+        self.__screen.blit(assets.get('title', self.__screen.get_size()), (0, 0))
+        pygame.display.flip()
+        assets.preload(self.__screen.get_size())
+
+    def update(self, elapsed: float) -> Scene or None:
+        if _quit_requested():
+            return None
+
+        self.__elapsed += elapsed
+        if not self.__game:
+            self.__game = self.__prepare()  # à la première trame : le titre est déjà affiché
+
+        if self.__elapsed * 1000 < settings.IMAGES_TRANSITION_TIME_MS:
+            return self
+        return GameScene(self.__game)
+
+    def idle_time(self) -> float:
+        if not self.__game:
+            return 0.0
+        return max(0.0, settings.IMAGES_TRANSITION_TIME_MS / 1000 - self.__elapsed)
+
+
+class GameScene(Scene):
+    """
+    Partie en cours.
+    """
+
+    FRAME_RATE = settings.MAX_FPS
+
+    def __init__(self, game) -> None:
+        """
+        Initialise la scène.
+        :param game: partie à jouer (voir game.Game)
+        """
+        self.__game = game
+        self.__started = False
+        self.__returning = False  # True au retour d'une autre scène, jusqu'à la trame suivante
+
+    def enter(self) -> None:
+        if not self.__started:  # au retour de la fin de partie ou de la pause, la partie continue
+            self.__game.start()
+            self.__started = True
+        else:
+            self.__returning = True
+
+    def update(self, elapsed: float) -> Scene or None:
+        if self.__returning:  # le temps passé dans l'autre scène (pause, fin de partie) ne compte pas
+            elapsed = 0.0
+            self.__returning = False
+
+        self.__game.step(elapsed)
+        if self.__game.user_requested_quit():
+            return None
+        if self.__game.over:
+            return GameOverScene(self.__game, self)
+        if self.__game.paused:
+            return PauseScene(self.__game, self)
+        return self
+
+    def idle_time(self) -> float:
+        return self.__game.idle_time()
+
+    def close(self) -> None:
+        self.__game.stop()
+
+
+class GameOverScene(Scene):
+    """
+    Écran de fin de partie. Les minuteries sont suspendues et la partie suivante est préparée pendant qu'il est
+    affiché.
+    """
+
+    def __init__(self, game, game_scene: GameScene) -> None:
+        """
+        Initialise l'écran de fin de partie.
+        :param game: partie terminée (voir game.Game)
+        :param game_scene: scène de la partie, à laquelle revenir
+        """
+        self.__game = game
+        self.__game_scene = game_scene
+        self.__elapsed = 0.0
+
+    def enter(self) -> None:
+        timers.pause()
+        self.__game.restart()
+
+        screen = pygame.display.get_surface()
+        screen.blit(assets.get('game_over', screen.get_size()), (0, 0))
+        pygame.display.flip()
+
+    def exit(self) -> None:
+        timers.resume()
+
+    def update(self, elapsed: float) -> Scene or None:
+        if _quit_requested():
+            return None
+
+        self.__elapsed += elapsed
+        if self.__elapsed * 1000 < settings.IMAGES_TRANSITION_TIME_MS:
+            return self
+        return self.__game_scene
+
+    def idle_time(self) -> float:
+        return max(0.0, settings.IMAGES_TRANSITION_TIME_MS / 1000 - self.__elapsed)
+
+    def close(self) -> None:
+        self.exit()
+        self.__game_scene.close()
+
+
+class PauseScene(Scene):
+    """
+    Partie en pause. Les minuteries sont suspendues et la boucle principale attend la prochaine touche sans rien
+    mettre à jour ni dessiner.
+    """
+
+    __SHADE = 0, 0, 0, 160  # voile posé sur la dernière image de la partie
+    __FONT_SIZE = 64
+
+    def __init__(self, game, game_scene: GameScene) -> None:
+        """
+        Initialise la pause.
+        :param game: partie en pause (voir game.Game)
+        :param game_scene: scène de la partie, à laquelle revenir
+        """
+        self.__game = game
+        self.__game_scene = game_scene
+        self.__key_releases = []  # touches relâchées pendant la pause, rendues à la partie à la reprise
+
+    def enter(self) -> None:
+        timers.pause()
+
+        screen = pygame.display.get_surface()
+        shade = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        shade.fill(PauseScene.__SHADE)
+        screen.blit(shade, (0, 0))
+        text = pygame.font.Font(pygame.font.get_default_font(), PauseScene.__FONT_SIZE).render('PAUSE', True,
+                                                                                              (255, 255, 255))
+        screen.blit(text, text.get_rect(center=screen.get_rect().center))
+        pygame.display.flip()
+
+    def exit(self) -> None:
+        for event in self.__key_releases:  # les chefs cuisiniers s'arrêtent si leur touche a été relâchée
+            pygame.event.post(event)
+        self.__game.unpause()
+        timers.resume()
+
+    def update(self, elapsed: float) -> Scene or None:
+        event = pygame.event.wait()  # dort jusqu'au prochain événement
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            return None
+        if event.type == pygame.KEYDOWN and event.key == self.__game.PAUSE_KEY:
+            return self.__game_scene
+        if event.type == pygame.KEYUP:
+            self.__key_releases.append(event)
+        elif event.type == pygame.WINDOWEXPOSED:
+            pygame.display.flip()
+        return self
+
+    def close(self) -> None:
+        timers.resume()
+        self.__game_scene.close()
+
+
+def _quit_requested() -> bool:
+    """ Traite les événements en attente : seule la demande de quitter (fenêtre ou Échap) compte. """
+    quit_requested = False
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            quit_requested = True
+    return quit_requested
+
+
+def __wait_for_input(timeout: float) -> None:
+    """ Dort jusqu'au prochain événement Pygame (laissé dans la file pour la scène) ou jusqu'à la fin du délai. """
+    event = pygame.event.wait(math.ceil((timeout + _WAKE_MARGIN) * 1000))
+    if event.type != pygame.NOEVENT:
+        for pending_event in [event] + pygame.event.get():  # remis dans la file, dans le même ordre
+            pygame.event.post(pending_event)
+
+
+async def __wait_for_input_async(timeout: float) -> None:
+    """ Comme __wait_for_input, sans bloquer la boucle d'événements : la file est vérifiée à intervalles réguliers. """
+    end_time = time.monotonic() + timeout + _WAKE_MARGIN
+    while not pygame.event.peek() and (remaining := end_time - time.monotonic()) > 0:
+        await asyncio.sleep(min(remaining, Scene.INPUT_POLL_INTERVAL))
+
+
+def __switch(scene: Scene, next_scene: Scene or None) -> Scene or None:
+    """ Passe d'une scène à la suivante, si elle change. """
+    if next_scene is not scene:
+        if next_scene:
+            scene.exit()
+            next_scene.enter()
+        else:
+            scene.close()
+    return next_scene
+
+
+def run(scene: Scene) -> None:
+    """
+    Boucle principale : exécute les scènes une trame à la fois jusqu'à ce que le joueur quitte.
+    :param scene: première scène
+    :return: aucun
+    """
+    clock = pygame.time.Clock()
+    scene.enter()
+    try:
+        while scene:
+            elapsed = clock.tick(scene.frame_rate) / 1000.0  # limite le nombre de trames par seconde
+            scene = __switch(scene, scene.update(elapsed))
+
+            if scene and (idle_time := scene.idle_time()) > 1.0 / scene.frame_rate:
+                __wait_for_input(idle_time)  # rien ne changera à l'écran d'ici là
+    finally:
+        if scene:  # interruption (exception)
+            scene.close()
+
+
+async def run_async(scene: Scene) -> None:
+    """
+    Boucle principale sur une boucle d'événements asyncio. Les minuteries (commandes, générateur de commandes,
+    appareils) deviennent des coroutines de cette même boucle : aucune tâche secondaire n'est utilisée.
+    :param scene: première scène
+    :return: aucun
+    """
+    loop = asyncio.get_running_loop()
+    previous_scheduler = timers.use(timers.AsyncioTimers(loop))
+
+    clock = pygame.time.Clock()
+    next_frame_time = loop.time()
+    scene.enter()
+    try:
+        while scene:
+            elapsed = clock.tick() / 1000.0  # mesure seulement le temps écoulé
+            scene = __switch(scene, scene.update(elapsed))
+
+            if scene:
+                if (idle_time := scene.idle_time()) > 1.0 / scene.frame_rate:
+                    await __wait_for_input_async(idle_time)  # rien ne changera à l'écran d'ici là
+                    next_frame_time = loop.time()
+                    continue
+
+                # prochaine trame à la cadence visée; si on est en retard, on ne tente pas de rattraper
+                next_frame_time = max(next_frame_time + 1.0 / scene.frame_rate, loop.time())
+                await asyncio.sleep(next_frame_time - loop.time())
+    finally:
+        if scene:
+            scene.close()
+        timers.use(previous_scheduler)
@@ -0,0 +1,140 @@
+from cutting_station import CuttingStation
+from filling_station import FillingStation
+from fryer import Fryer
+from grill import Grill
+from orders import Order
+
+
+class SessionStats:
+    """
+    Statistiques cumulées d'une session de jeu. Contrairement au pourboire et aux commandes manquées affichés
+    à l'écran, elles ne sont pas remises à zéro lorsque la partie recommence après une fin de partie.
+    """
+
+    # appareils dont on mesure l'utilisation (ceux qui peuvent être occupés)
+    __BUSY_STATIONS = (Grill, Fryer, CuttingStation, FillingStation)
+
+    FRAME_TIME_BUCKET = 0.0001  # largeur (en secondes) des classes de l'histogramme des temps de trame
+    FRAME_TIME_BUCKETS = 1000  # la dernière classe regroupe toutes les trames de 100 ms et plus
+
+    def __init__(self) -> None:
+        self.duration = 0.0  # temps de jeu écoulé (en secondes)
+        self.tips = 0.0
+        self.delivered_orders = 0
+        self.missed_orders = 0
+        self.game_overs = 0
+        self.order_latencies = []  # temps (en secondes) entre l'arrivée et la livraison de chaque commande
+
+        self.station_busy_time = {}  # type d'appareil -> temps occupé cumulé (en secondes)
+        self.station_count = {}  # type d'appareil -> nombre d'appareils de ce type
+        self.__busy_since = {}  # appareil occupé -> temps de jeu au début de la période occupée
+
+        self.frame_time_histogram = [0] * SessionStats.FRAME_TIME_BUCKETS  # temps réel de calcul des trames
+        self.max_frame_time = 0.0
+
+    def order_delivered(self, order: Order, tip: float) -> None:
+        """
+        Comptabilise une commande livrée.
+        :param order: commande livrée
+        :param tip: pourboire reçu pour la commande
+        :return: aucun
+        """
+        self.delivered_orders += 1
+        self.tips += tip
+        self.order_latencies.append(order.get_elapsed_time())
+
+    def order_expired(self, order: Order) -> None:
+        """
+        Comptabilise une commande expirée.
+        :param order: commande expirée
+        :return: aucun
+        """
+        self.missed_orders += 1
+
+    def game_over(self) -> None:
+        """ Comptabilise une fin de partie. """
+        self.game_overs += 1
+
+    def frame(self, elapsed: float) -> None:
+        """
+        Fait avancer le temps de jeu (le temps occupé des appareils est mesuré par les événements, voir
+        station_started et food_picked).
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :return: aucun
+        """
+        self.duration += elapsed
+
+    def track_stations(self, stations: list) -> None:
+        """
+        Relit l'état des appareils, au départ de la partie ou après le rétablissement d'un instantané (qui ne produit
+        pas d'événements) : ceux qui ne sont pas disponibles sont occupés à partir de maintenant.
+        :param stations: appareils de la cuisine
+        :return: aucun
+        """
+        counting = not self.station_count  # on compte les appareils la première fois seulement
+        for station in stations:
+            if not isinstance(station, SessionStats.__BUSY_STATIONS):
+                continue
+
+            name = type(station).__name__
+            if counting:
+                self.station_count[name] = self.station_count.get(name, 0) + 1
+                self.station_busy_time.setdefault(name, 0.0)
+            if station.is_available():
+                self.__release(station)
+            else:
+                self.__busy_since.setdefault(station, self.duration)
+
+    def station_started(self, station) -> None:
+        """
+        Comptabilise le début d'une préparation : l'appareil est occupé jusqu'à ce qu'on le vide.
+        :param station: appareil
+        :return: aucun
+        """
+        if isinstance(station, SessionStats.__BUSY_STATIONS):
+            self.__busy_since.setdefault(station, self.duration)
+
+    def food_picked(self) -> None:
+        """
+        Comptabilise de la nourriture ramassée : les appareils occupés qu'elle a vidés redeviennent disponibles.
+        :return: aucun
+        """
+        for station in [station for station in self.__busy_since if station.is_available()]:
+            self.__release(station)
+
+    def untrack_stations(self) -> None:
+        """
+        Termine les périodes occupées en cours, à l'arrêt de la partie : les statistiques ne gardent alors plus de
+        référence aux appareils (et peuvent être transmises à un autre processus, voir batch_simulation).
+        :return: aucun
+        """
+        for station in list(self.__busy_since):
+            self.__release(station)
+
+    def __release(self, station) -> None:
+        """ Ajoute la période occupée d'un appareil (s'il l'était) à son temps occupé. """
+        if (since := self.__busy_since.pop(station, None)) is not None:
+            self.station_busy_time[type(station).__name__] += self.duration - since
+
+    def record_frame_time(self, frame_time: float) -> None:
+        """
+        Comptabilise le temps réel pris pour calculer une trame.
+        :param frame_time: temps de calcul de la trame (en secondes)
+        :return: aucun
+        """
+        bucket = min(SessionStats.FRAME_TIME_BUCKETS - 1, int(frame_time / SessionStats.FRAME_TIME_BUCKET))
+        self.frame_time_histogram[bucket] += 1
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+
+    def station_utilization(self) -> dict:
+        """
+        Calcule l'utilisation moyenne de chaque type d'appareil.
+        :return: type d'appareil -> fraction du temps où un appareil de ce type est occupé (de 0.0 à 1.0)
+        """
+        if self.duration <= 0:
+            return {name: 0.0 for name in self.station_busy_time}
+
+        busy_time = dict(self.station_busy_time)
+        for station, since in self.__busy_since.items():  # périodes pas encore terminées
+            busy_time[type(station).__name__] += self.duration - since
+        return {name: busy / (self.duration * self.station_count[name]) for name, busy in busy_time.items()}
@@ -1,10 +1,26 @@
+# résolution logique du jeu (l'affichage est mis à l'échelle de l'écran, voir undercooked.py)
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 
+ASSET_BUNDLE = 'img/assets.bundle'  # paquet d'images pré-décodées (voir assets.py), facultatif
+
 PROBABILITY_FOR_TWO_PATTIES = 15  # pourcentage de chances d'avoir deux boulettes
 PROBABILITY_FOR_BEVERAGE = 60  # pourcentage de chances d'avoir une boisson
 PROBABILITY_FOR_FRIES = 40  # pourcentage de chances d'avoir des frites
 
+# durées des préparations (en secondes), lues par les appareils et par le planificateur (voir capacity_planner.py)
+GRILL_COOKING_TIME = 4.0  # cuisson d'une boulette
+GRILL_OVERCOOKING_TIME = 10.0  # attente avant que la boulette cuite commence à brûler, puis durée jusqu'à brûlée
+FRYING_TIME = 7.0  # friture des frites (en secondes entières)
+OVERFRYING_TIME = 10.0  # attente avant que les frites commencent à brûler, puis durée jusqu'à brûlées
+CUTTING_TIME = 1.5  # découpe d'un ingrédient
+FILLING_TIME = 4.0  # remplissage d'une boisson
+
+TICK_RATE = 90  # pas (mises à jour) de la simulation par seconde, lue par le jeu, le contrôle et le planificateur
+CHEF_SPEED = 3  # déplacement du chef cuisinier (en pixels par pas de simulation, sur chaque axe)
+
+ORDER_TIME_BAR_WIDTH = 48  # largeur (en pixels) de la barre du temps restant d'une commande (voir order_sprite.py)
+
 # couleurs pour le chef cuisinier
 UNIFORM_COLOR = 240, 240, 240
 SKIN_COLOR = 105, 88, 59
@@ -58,5 +74,11 @@ CUTTING_STATION_DARK_COLOR = 70, 70, 70
 BURNT_PATTY_COLOR = 45, 25, 15
 BURNT_FRIES_COLOR = 100, 55, 0
 
+# nombre maximal de trames affichées par seconde (la simulation a sa propre cadence fixe, voir Game.step)
+MAX_FPS = 144
+
 # temps de transition entre image
-IMAGES_TRANSITION_TIME_MS = 2500
\ No newline at end of file
+IMAGES_TRANSITION_TIME_MS = 2500
+
+# disposition de la cuisine
+KITCHEN_LAYOUT = 'layouts/default.json'
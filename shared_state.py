@@ -0,0 +1,320 @@
+"""
+État de la partie en mémoire partagée.
+
+La partie publie, une fois par trame, un état de disposition fixe (en-tête, chefs cuisiniers, appareils, commandes)
+dans un segment de mémoire partagée (multiprocessing.shared_memory). Les tableaux de bord d'autres processus lisent
+cet état directement, par des vues NumPy sur le segment : aucune requête, aucune copie et aucune sérialisation.
+
+La cohérence est assurée par un verrou de séquence : l'écrivain rend le numéro de séquence impair avant d'écrire et
+pair après. Le lecteur note le numéro (pair) avant de lire et recommence si le numéro a changé pendant sa lecture
+(voir SharedStateReader.read_begin et read_retry). L'écrivain n'attend jamais après les lecteurs.
+
+La boucle de jeu dort quand rien de visible ne peut changer (voir Game.idle_time) : les trames, donc les
+publications, peuvent alors être espacées d'une seconde. Le temps restant des commandes est publié avec le moment
+de la publication (horloge time.monotonic, commune à tous les processus) : le lecteur peut le décompter entre deux
+publications, sauf si la partie est en pause.
+
+Exemple : python undercooked.py --shared-state undercooked, puis python shared_state.py undercooked
+"""
+import argparse
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame (appareils)
+
+from assembly_station import AssemblyStation
+from cutting_station import CuttingStation
+from filling_station import FillingStation
+from fridge import Fridge
+from fryer import Fryer
+from grill import Grill
+from platter import Platter
+from telemetry import FOODS, ITEM_BEVERAGE, ITEM_BURGER, ITEM_FRIES, food_code
+from trash import Trash
+
+
+class SharedStateError(ValueError):
+    """
+    Segment de mémoire partagée invalide.
+    """
+    pass
+
+
+MAGIC = 0x4D534355  # 'UCSM'
+VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ('sequence', '<u8'),  # verrou de séquence : impair pendant une écriture
+    ('magic', '<u4'),
+    ('version', '<u2'),
+    ('chef_capacity', '<u2'),
+    ('station_capacity', '<u2'),
+    ('order_capacity', '<u2'),
+    ('chef_count', '<u2'),
+    ('station_count', '<u2'),
+    ('order_count', '<u2'),
+    ('missed_orders', 'u1'),
+    ('over', 'u1'),
+    ('paused', 'u1'),
+    ('frame', '<u8'),  # numéro de la trame publiée
+    ('written_at', '<f8'),  # moment de la publication (time.monotonic)
+    ('tips', '<f8'),
+], align=True)
+
+CHEF_DTYPE = np.dtype([
+    ('x', '<f4'),
+    ('y', '<f4'),
+    ('walking_x', 'i1'),  # -1 (gauche), 0 ou 1 (droite)
+    ('walking_y', 'i1'),  # -1 (haut), 0 ou 1 (bas)
+    ('facing', 'u1'),
+    ('food', '<i2'),  # indice dans FOODS, -1 si aucune
+], align=True)
+
+STATION_DTYPE = np.dtype([
+    ('type', 'u1'),  # indice dans STATION_TYPES
+    ('status', 'u1'),  # indice dans STATION_STATUSES
+    ('x', '<i2'),
+    ('y', '<i2'),
+], align=True)
+
+ORDER_DTYPE = np.dtype([
+    ('order_id', '<u4'),
+    ('remaining_time', '<f4'),  # temps restant (en secondes) au moment de la publication
+    ('expiration_time', '<f4'),  # temps alloué (en secondes)
+    ('items', 'u1'),  # somme des éléments présents (telemetry.ITEM_BURGER, ITEM_BEVERAGE et ITEM_FRIES)
+    ('displayed', 'u1'),  # 1 si la commande a rejoint sa place sur le tableau
+], align=True)
+
+STATION_TYPES = [Trash, Platter, FillingStation, Fryer, Grill, Fridge, AssemblyStation, CuttingStation]
+STATION_STATUSES = ['idle', 'busy', 'ready', 'burnt']
+_STATION_TYPE_CODES = {station_type: code for code, station_type in enumerate(STATION_TYPES)}
+_STATUS_IDLE, _STATUS_BUSY, _STATUS_READY, _STATUS_BURNT = range(len(STATION_STATUSES))
+
+
+def _layout(chef_capacity: int, station_capacity: int, order_capacity: int) -> tuple:
+    """ Positions des tableaux dans le segment, et taille du segment. """
+    offsets = []
+    offset = HEADER_DTYPE.itemsize
+    for dtype, capacity in ((CHEF_DTYPE, chef_capacity), (STATION_DTYPE, station_capacity),
+                            (ORDER_DTYPE, order_capacity)):
+        offset = -(-offset // 8) * 8  # chaque tableau commence sur 8 octets
+        offsets.append(offset)
+        offset += dtype.itemsize * capacity
+    return offsets, offset
+
+
+def _views(buffer, chef_capacity: int, station_capacity: int, order_capacity: int) -> tuple:
+    """ Vues NumPy (en-tête, chefs, appareils, commandes) sur le segment. """
+    (chefs_offset, stations_offset, orders_offset), _ = _layout(chef_capacity, station_capacity, order_capacity)
+    header = np.ndarray((), HEADER_DTYPE, buffer, 0)
+    chefs = np.ndarray((chef_capacity,), CHEF_DTYPE, buffer, chefs_offset)
+    stations = np.ndarray((station_capacity,), STATION_DTYPE, buffer, stations_offset)
+    orders = np.ndarray((order_capacity,), ORDER_DTYPE, buffer, orders_offset)
+    return header, chefs, stations, orders
+
+
+class SharedStateWriter:
+    """
+    Publication de l'état de la partie en mémoire partagée. S'attache à une partie (voir le paramètre shared_state
+    de Game), qui la fait publier à chaque trame.
+    """
+
+    CHEF_CAPACITY = 64
+    STATION_CAPACITY = 128
+    ORDER_CAPACITY = 32
+
+    def __init__(self, name: str, chef_capacity: int = CHEF_CAPACITY, station_capacity: int = STATION_CAPACITY,
+                 order_capacity: int = ORDER_CAPACITY) -> None:
+        """
+        Crée le segment de mémoire partagée.
+        :param name: nom du segment (les lecteurs s'y attachent par ce nom)
+        :param chef_capacity: nombre maximal de chefs cuisiniers publiés
+        :param station_capacity: nombre maximal d'appareils publiés
+        :param order_capacity: nombre maximal de commandes publiées (les plus anciennes en premier)
+        """
+        _, size = _layout(chef_capacity, station_capacity, order_capacity)
+        self.__memory = shared_memory.SharedMemory(name, create=True, size=size)
+        self.__header, self.__chefs, self.__stations, self.__orders = _views(
+            self.__memory.buf, chef_capacity, station_capacity, order_capacity)
+
+        self.__header[()] = 0
+        self.__header['magic'] = MAGIC
+        self.__header['version'] = VERSION
+        self.__header['chef_capacity'] = chef_capacity
+        self.__header['station_capacity'] = station_capacity
+        self.__header['order_capacity'] = order_capacity
+
+    def frame(self, game, elapsed: float) -> None:
+        """
+        Publie l'état de la partie (appelée à la fin de chaque trame).
+        :param game: partie publiée
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :return: aucun
+        """
+        chefs = []
+        for chef in game.chefs[:len(self.__chefs)]:
+            position, walking, facing, _, _ = chef.snapshot()
+            chefs.append((*position, *walking, facing, _food(chef.food)))
+        stations = [(_STATION_TYPE_CODES[type(station)], station_status(station), *station.rect.topleft)
+                    for station in game.stations[:len(self.__stations)]]
+        displayed = game.order_board.displayed_orders
+        orders = [(order.order_id, order.expiration_time - order.get_elapsed_time(), order.expiration_time,
+                   (ITEM_BURGER if order.burger else 0) + (ITEM_BEVERAGE if order.beverage else 0)
+                   + (ITEM_FRIES if order.fries else 0), order in displayed)
+                  for order in game.order_board.waiting_orders[:len(self.__orders)]]
+
+        header = self.__header
+        header['sequence'] += 1  # impair : écriture en cours
+        self.__chefs[:len(chefs)] = chefs
+        self.__stations[:len(stations)] = stations
+        self.__orders[:len(orders)] = orders
+        header['chef_count'] = len(chefs)
+        header['station_count'] = len(stations)
+        header['order_count'] = len(orders)
+        header['missed_orders'] = game.missed_orders
+        header['over'] = game.over
+        header['paused'] = game.paused
+        header['tips'] = game.total_tips
+        header['frame'] += 1
+        header['written_at'] = time.monotonic()
+        header['sequence'] += 1  # pair : état cohérent
+
+    def close(self) -> None:
+        """ Détruit le segment de mémoire partagée (les lecteurs déjà attachés gardent leur vue). """
+        del self.__header, self.__chefs, self.__stations, self.__orders  # les vues retiennent le segment
+        self.__memory.close()
+        self.__memory.unlink()
+
+
+class SharedStateReader:
+    """
+    Lecture de l'état publié par SharedStateWriter, depuis un autre processus. Les vues (header, chefs, stations,
+    orders) donnent directement sur le segment; seules les lignes [:count] de l'en-tête sont valides.
+
+    Exemple :
+        while True:
+            sequence = reader.read_begin()
+            positions = reader.chefs[:reader.header['chef_count']][['x', 'y']].copy()
+            if not reader.read_retry(sequence):
+                break
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        S'attache au segment de mémoire partagée.
+        :param name: nom du segment (voir SharedStateWriter)
+        """
+        self.__memory = shared_memory.SharedMemory(name)
+        # le segment appartient à l'écrivain : le lecteur ne doit pas le détruire à sa sortie (sous POSIX, le suivi
+        # des ressources nomme le segment avec sa barre oblique initiale, que name n'a pas)
+        if os.name == 'posix':
+            resource_tracker.unregister('/' + self.__memory.name, 'shared_memory')
+
+        header = np.ndarray((), HEADER_DTYPE, self.__memory.buf, 0)
+        if header['magic'] != MAGIC or header['version'] != VERSION:
+            raise SharedStateError(f"{name} : ce n'est pas un état de partie (version {VERSION})")
+        self.header, self.chefs, self.stations, self.orders = _views(
+            self.__memory.buf, int(header['chef_capacity']), int(header['station_capacity']),
+            int(header['order_capacity']))
+
+    def read_begin(self, timeout: float = 1.0) -> int:
+        """
+        Début d'une lecture : attend que l'écrivain ait terminé sa publication.
+        :param timeout: temps (en secondes) d'attente maximal, au-delà duquel l'écrivain est tenu pour arrêté
+        :return: numéro de séquence à passer à read_retry
+        """
+        deadline = None
+        while (sequence := int(self.header['sequence'])) % 2:
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise SharedStateError("publication inachevée : l'écrivain s'est arrêté pendant son écriture")
+            time.sleep(0)  # l'écriture dure quelques microsecondes : on cède seulement le processeur
+        return sequence
+
+    def read_retry(self, sequence: int) -> bool:
+        """
+        Fin d'une lecture.
+        :param sequence: numéro retourné par read_begin
+        :return: True si l'état a changé pendant la lecture (elle est à recommencer), False si elle est cohérente
+        """
+        return int(self.header['sequence']) != sequence
+
+    def read(self) -> dict:
+        """
+        Copie cohérente de l'état publié.
+        :return: en-tête, chefs, appareils et commandes (tableaux NumPy structurés, copiés)
+        """
+        while True:
+            sequence = self.read_begin()
+            header = self.header.copy()
+            state = {'header': header,
+                     'chefs': self.chefs[:header['chef_count']].copy(),
+                     'stations': self.stations[:header['station_count']].copy(),
+                     'orders': self.orders[:header['order_count']].copy()}
+            if not self.read_retry(sequence):
+                return state
+
+    def close(self) -> None:
+        """ Se détache du segment de mémoire partagée. """
+        del self.header, self.chefs, self.stations, self.orders  # les vues retiennent le segment
+        self.__memory.close()
+
+
+def _food(food) -> int:
+    """ Code de la nourriture transportée (indice dans FOODS), -1 si aucune. """
+    return -1 if food is None else food_code(food)
+
+
+def station_status(station) -> int:
+    """ État d'un appareil : libre, occupé, préparation prête ou en surcuisson. """
+    if not isinstance(station, (Grill, Fryer, CuttingStation, FillingStation)) or station.is_available():
+        return _STATUS_IDLE
+    if isinstance(station, Grill):
+        if station.has_overcooked_or_burnt_patty():
+            return _STATUS_BURNT
+        return _STATUS_READY if station.has_cooked_patty() else _STATUS_BUSY
+    if isinstance(station, Fryer):
+        if station.has_overfryed_or_burnt_fries():
+            return _STATUS_BURNT
+        return _STATUS_READY if station.has_fryed_fries() else _STATUS_BUSY
+    return _STATUS_READY if station.is_ready() else _STATUS_BUSY
+
+
+def __shared_state() -> None:
+    """ Point d'entrée de la ligne de commande : affiche l'état publié, à intervalles réguliers. """
+    parser = argparse.ArgumentParser(description="Affiche l'état d'une partie publié en mémoire partagée")
+    parser.add_argument('name', help='nom du segment (voir undercooked.py --shared-state)')
+    parser.add_argument('--interval', type=float, default=1.0, help='temps (en secondes) entre deux affichages')
+    arguments = parser.parse_args()
+
+    reader = SharedStateReader(arguments.name)
+    try:
+        while True:
+            state = reader.read()
+            header = state['header']
+            age = time.monotonic() - header['written_at']
+            paused = bool(header['paused'])
+            print(f"trame {header['frame']} (il y a {age * 1000:.0f} ms) : {header['tips']:.0f} $ de pourboires, "
+                  f"{header['missed_orders']} commande(s) ratée(s){', pause' if paused else ''}")
+            for index, chef in enumerate(state['chefs']):
+                food = FOODS[chef['food']] if chef['food'] >= 0 else '-'
+                print(f"  chef {index} : ({chef['x']:.0f}, {chef['y']:.0f}), {food}")
+            busy = [f"{STATION_TYPES[station['type']].__name__} {STATION_STATUSES[station['status']]}"
+                    for station in state['stations'] if station['status'] != _STATUS_IDLE]
+            print(f"  appareils : {', '.join(busy) or 'tous libres'}")
+            for order in state['orders']:
+                remaining = max(0.0, order['remaining_time'] - (0.0 if paused else age))
+                print(f"  commande {order['order_id']} : {remaining:.1f} s sur {order['expiration_time']:.0f}")
+            time.sleep(arguments.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    __shared_state()
@@ -0,0 +1,150 @@
+"""
+Instantanés de partie.
+
+Un instantané est l'état complet d'une partie (chefs cuisiniers et nourriture transportée, appareils et leurs
+minuteries, tableau des commandes, générateur de commandes et générateur aléatoire) réduit à des tuples de valeurs
+simples, puis sérialisé dans un format binaire compact. Chaque classe sait produire son état (méthode snapshot) et
+le rétablir (méthode restore); ce module s'occupe de la nourriture, partagée par tous, et de la sérialisation.
+
+Voir Game.snapshot et Game.restore.
+"""
+import io
+import pickle
+import zlib
+
+from beverage import Beverage, BeverageType
+from burger import Burger
+from food import Food
+from fries import Fries
+from ingredients import Ingredient, IngredientType
+from meal import Meal
+
+
+class SnapshotError(ValueError):
+    """
+    Instantané invalide.
+    """
+    pass
+
+
+class _Unpickler(pickle.Unpickler):
+    """
+    Désérialiseur qui n'accepte que des valeurs simples : un instantané ne peut pas créer d'objets arbitraires.
+    """
+
+    def find_class(self, module: str, name: str) -> None:
+        raise SnapshotError(f"instantané invalide : {module}.{name} n'est pas une valeur simple")
+
+
+_VERSION = 3
+
+_INGREDIENT_TYPES = list(IngredientType)
+_INGREDIENT_INDEXES = {ingredient_type: i for i, ingredient_type in enumerate(_INGREDIENT_TYPES)}
+_BEVERAGE_TYPES = list(BeverageType)
+_BEVERAGE_INDEXES = {beverage_type: i for i, beverage_type in enumerate(_BEVERAGE_TYPES)}
+
+
+def encode_food(food: Food or None) -> tuple or None:
+    """
+    Réduit de la nourriture à un tuple de valeurs simples.
+    :param food: nourriture (ingrédient, hambourgeois, boisson, frites ou repas), None si aucune
+    :return: état de la nourriture, None si aucune
+    """
+    if food is None:
+        return None
+    if isinstance(food, Ingredient):
+        return 'I', _INGREDIENT_INDEXES[food.ingredient_type()]
+    if isinstance(food, Burger):
+        return 'B', tuple(_INGREDIENT_INDEXES[ingredient.ingredient_type()] for ingredient in food.ingredients)
+    if isinstance(food, Beverage):
+        return 'V', _BEVERAGE_INDEXES[food.beverage_type()]
+    if isinstance(food, Fries):
+        return 'F', tuple(food.color)
+    if isinstance(food, Meal):
+        return 'M', encode_food(food.burger), encode_food(food.beverage), encode_food(food.fries)
+
+    raise SnapshotError(f"nourriture inconnue : {type(food).__name__}")
+
+
+def decode_food(state: tuple or None) -> Food or None:
+    """
+    Reconstruit de la nourriture à partir de son état.
+    :param state: état produit par encode_food
+    :return: nourriture reconstruite, None si aucune
+    """
+    if state is None:
+        return None
+
+    match state[0]:
+        case 'I':
+            return Ingredient(_INGREDIENT_TYPES[state[1]])
+        case 'B':
+            burger = Burger()
+            burger.add_ingredients([Ingredient(_INGREDIENT_TYPES[i]) for i in state[1]])
+            return burger
+        case 'V':
+            return Beverage(_BEVERAGE_TYPES[state[1]])
+        case 'F':
+            fries = Fries()
+            fries.color = state[1]
+            return fries
+        case 'M':
+            meal = Meal()
+            if burger := decode_food(state[1]):
+                meal.add_burger(burger)
+            if beverage := decode_food(state[2]):
+                meal.add_beverage(beverage)
+            if fries := decode_food(state[3]):
+                meal.add_fries(fries)
+            return meal
+
+    raise SnapshotError(f"nourriture inconnue : {state[0]!r}")
+
+
+def dumps(state: tuple) -> bytes:
+    """
+    Sérialise l'état d'une partie.
+    :param state: état (tuples de valeurs simples)
+    :return: instantané binaire
+    """
+    return bytes([_VERSION]) + zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def loads(data: bytes) -> tuple:
+    """
+    Désérialise l'état d'une partie.
+    :param data: instantané binaire produit par dumps
+    :return: état (tuples de valeurs simples)
+    """
+    if not data or data[0] != _VERSION:
+        raise SnapshotError(f"instantané invalide (version {_VERSION} attendue)")
+
+    try:
+        return _Unpickler(io.BytesIO(zlib.decompress(data[1:]))).load()
+    except (zlib.error, pickle.UnpicklingError, EOFError) as error:
+        raise SnapshotError(f"instantané illisible ({error})") from error
+
+
+def expand(data: bytes) -> bytes:
+    """
+    Retire la compression d'un instantané. Deux instantanés successifs d'une même partie diffèrent alors de peu
+    d'octets, aux mêmes positions (voir netplay).
+    :param data: instantané binaire produit par dumps
+    :return: instantané non compressé
+    """
+    if not data or data[0] != _VERSION:
+        raise SnapshotError(f"instantané invalide (version {_VERSION} attendue)")
+
+    try:
+        return data[:1] + zlib.decompress(data[1:])
+    except zlib.error as error:
+        raise SnapshotError(f"instantané illisible ({error})") from error
+
+
+def shrink(data: bytes) -> bytes:
+    """
+    Compresse un instantané non compressé (l'inverse de expand).
+    :param data: instantané non compressé
+    :return: instantané binaire, comme produit par dumps
+    """
+    return data[:1] + zlib.compress(data[1:], 1)
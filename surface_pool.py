@@ -0,0 +1,137 @@
+"""
+Réserve d'images.
+
+Les appareils et les commandes refont leur image chaque fois que leur état change (parfois à chaque trame pendant
+une cuisson). Plutôt que d'allouer une nouvelle surface à chaque fois, ils la demandent à la réserve, qui leur
+remet une surface libre de la même taille et du même format (celui de l'écran, avec transparence) et reprend
+l'image remplacée une fois la nouvelle affectée (voir PooledSprite). Une image rendue n'est réutilisée qu'après le
+dessin de la trame (voir SurfacePool.end_frame) : la liste de rendu de la trame peut encore l'afficher. Une fois la
+réserve garnie, les trames n'allouent plus aucune surface.
+
+Les demandes (allouées ou réutilisées) et le nombre d'images libres sont exposés dans les métriques (voir metrics)
+et affichés par replay.py --profile.
+"""
+import collections
+import threading
+
+import pygame
+
+import metrics
+
+
+class SurfacePool:
+    """
+    Réserve d'images, par taille et par format. Peut être utilisée depuis les tâches des minuteries.
+    """
+
+    __TRANSPARENT = 0, 0, 0, 0
+
+    def __init__(self) -> None:
+        self.__free = {}  # (taille, format) -> images libres (la plus anciennement rendue en premier)
+        self.__free_ids = set()  # identités des images libres (une image rendue deux fois n'est gardée qu'une fois)
+        self.__released = []  # images rendues depuis la fin de la trame précédente (voir end_frame)
+        self.__lock = threading.Lock()
+        self.__allocated = 0
+        self.__reused = 0
+        self.__display = None  # écran pour lequel le format des nouvelles images a été déterminé
+        self.__format = None  # format des nouvelles images (voir __current_format)
+
+    def acquire(self, size: tuple) -> pygame.Surface:
+        """
+        Retourne une image transparente de la taille demandée, réutilisée si possible.
+        :param size: taille de l'image (largeur, hauteur)
+        :return: image au format de l'écran (si l'écran est ouvert), avec transparence
+        """
+        size = int(size[0]), int(size[1])
+        with self.__lock:
+            free = self.__free.get((size, self.__current_format()))
+            surface = free.popleft() if free else None
+            if surface is not None:
+                self.__free_ids.discard(id(surface))
+                self.__reused += 1
+            else:
+                self.__allocated += 1
+            metrics.SURFACES_POOLED.set(len(self.__free_ids))
+
+        if surface is not None:
+            metrics.SURFACE_POOL_REQUESTS.labels('reused').inc()
+            surface.fill(SurfacePool.__TRANSPARENT)
+            return surface
+
+        metrics.SURFACE_POOL_REQUESTS.labels('allocated').inc()
+        surface = pygame.Surface(size, flags=pygame.SRCALPHA)
+        return surface.convert_alpha() if pygame.display.get_surface() else surface
+
+    def release(self, *surfaces: pygame.Surface) -> None:
+        """
+        Rend des images à la réserve. Elles ne doivent plus être affichées ni modifiées par celui qui les rend; elles
+        ne sont réutilisables qu'à la fin de la trame (voir end_frame).
+        :param surfaces: images à rendre
+        :return: aucun
+        """
+        with self.__lock:
+            self.__released.extend(surfaces)
+
+    def end_frame(self) -> None:
+        """
+        Fin de la trame, une fois dessinée : les images rendues depuis la trame précédente deviennent réutilisables.
+        Une image d'un autre format que les nouvelles (allouée avant l'ouverture de l'écran, par exemple) n'est pas
+        gardée.
+        :return: aucun
+        """
+        with self.__lock:
+            surfaces, self.__released = self.__released, []
+            current_format = self.__current_format()
+            for surface in surfaces:
+                if id(surface) not in self.__free_ids and SurfacePool.__format_of(surface) == current_format:
+                    self.__free_ids.add(id(surface))
+                    self.__free.setdefault((surface.get_size(), current_format), collections.deque()).append(surface)
+            metrics.SURFACES_POOLED.set(len(self.__free_ids))
+
+    def statistics(self) -> dict:
+        """
+        Retourne les statistiques de la réserve.
+        :return: images allouées, images réutilisées et images libres
+        """
+        with self.__lock:
+            return {'allocated': self.__allocated, 'reused': self.__reused, 'free': len(self.__free_ids)}
+
+    def __current_format(self) -> tuple:
+        """ Format des nouvelles images, déterminé de nouveau lorsque l'écran est ouvert, fermé ou remplacé. """
+        display = pygame.display.get_surface()
+        if self.__format is None or display is not self.__display:
+            sample = pygame.Surface((1, 1), flags=pygame.SRCALPHA)
+            self.__display = display
+            self.__format = SurfacePool.__format_of(sample.convert_alpha() if display else sample)
+        return self.__format
+
+    @staticmethod
+    def __format_of(surface: pygame.Surface) -> tuple:
+        """ Format d'une image : profondeur et masques des couleurs et de la transparence. """
+        return surface.get_bitsize(), surface.get_masks()
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """
+    Sprite dont l'image vient de la réserve. L'image remplacée n'est rendue à la réserve qu'une fois la nouvelle
+    affectée : une routine qui refait l'image depuis la tâche d'une minuterie ne libère jamais l'image encore
+    affichée par le sprite (ni celle que la trame en cours dessine, voir SurfacePool.end_frame).
+    """
+
+    def __init__(self, *groups: pygame.sprite.AbstractGroup) -> None:
+        super().__init__(*groups)
+        self.__image = None
+
+    @property
+    def image(self) -> pygame.Surface or None:
+        return self.__image
+
+    @image.setter
+    def image(self, surface: pygame.Surface) -> None:
+        previous, self.__image = self.__image, surface
+        if previous is not None and previous is not surface:
+            pool.release(previous)
+
+
+# réserve partagée par tous les sprites (Global Object Pattern, comme orders.spawner)
+pool = SurfacePool()
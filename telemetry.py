@@ -0,0 +1,373 @@
+"""
+Télémétrie du cycle de vie des commandes.
+
+La télémétrie s'attache à une partie (voir le paramètre telemetry de Game) et produit des événements
+structurés : arrivée, affichage, livraison (avec le pourboire) et expiration des commandes, début, fin et
+surcuisson des préparations des appareils, nourriture ramassée et déposée par les chefs cuisiniers.
+
+Les événements sont placés dans un tampon borné en mémoire et écrits sur disque par une tâche d'écriture en
+arrière-plan : la boucle de jeu n'attend jamais après le disque. Si le tampon est plein, les nouveaux événements sont
+abandonnés et l'écrivain le signale dans le fichier lui-même (événement events_dropped) dès qu'il a de la place.
+
+Deux formats sont offerts :
+ - JSONL : un objet JSON par ligne, la première ligne décrit la session (disposition, appareils, événements);
+ - binaire : une en-tête (signature, version et description JSON de la session), puis des enregistrements de taille
+   fixe (temps, type d'événement, sujet, détail, valeur).
+
+Exemple : python undercooked.py --telemetry quart.uctl, puis python telemetry.py quart.uctl pour le lire en JSONL
+"""
+import argparse
+import json
+import queue
+import struct
+import sys
+import threading
+
+import events
+from ingredients import Ingredient, IngredientType
+
+
+class TelemetryError(ValueError):
+    """
+    Fichier de télémétrie invalide.
+    """
+    pass
+
+
+_MAGIC = b'UCTL'
+_VERSION = 1
+
+_HEADER = struct.Struct('<4sHI')  # signature, version, taille de la description JSON de la session
+_RECORD = struct.Struct('<dBiid')  # temps de session, type d'événement, sujet, détail, valeur
+
+# type d'événement -> noms des champs sujet, détail et valeur (None si le champ n'est pas utilisé)
+EVENTS = {
+    'session_started': ('game', None, None),
+    'order_spawned': ('order', 'items', 'expiration'),
+    'order_displayed': ('order', None, None),
+    'order_delivered': ('order', 'chef', 'tip'),
+    'order_expired': ('order', None, None),
+    'station_started': ('station', None, None),
+    'station_finished': ('station', None, None),
+    'station_burnt': ('station', None, None),
+    'chef_picked': ('chef', 'food', None),
+    'chef_dropped': ('chef', 'food', None),
+    'events_dropped': ('count', None, None),
+}
+_EVENT_NAMES = list(EVENTS)
+_EVENT_CODES = {name: code for code, name in enumerate(_EVENT_NAMES)}
+
+# contenu d'une commande (champ items de order_spawned) : somme des éléments présents
+ITEM_BURGER = 1
+ITEM_BEVERAGE = 2
+ITEM_FRIES = 4
+
+# nourriture transportée (champ food de chef_picked et chef_dropped) : indice dans cette liste
+FOODS = [ingredient_type.name for ingredient_type in IngredientType] + ['Burger', 'Beverage', 'Fries', 'Meal']
+_FOOD_CODES = {name: code for code, name in enumerate(FOODS)}
+
+
+class TelemetryWriter:
+    """
+    Écrivain d'événements. Les événements sont placés dans un tampon borné sans jamais attendre; une tâche en
+    arrière-plan les retire du tampon par lots et les écrit dans le fichier.
+    """
+
+    CAPACITY = 8192  # nombre maximal d'événements en attente d'écriture
+
+    def __init__(self, path: str, binary: bool, session: dict, capacity: int = CAPACITY) -> None:
+        """
+        Ouvre le fichier, écrit la description de la session et démarre la tâche d'écriture.
+        :param path: fichier à écrire
+        :param binary: True pour le format binaire, False pour le format JSONL
+        :param session: description de la session (disposition, appareils, etc.)
+        :param capacity: nombre maximal d'événements en attente d'écriture
+        """
+        self.__binary = binary
+        self.__buffer = queue.Queue(capacity)
+        self.__dropped = 0  # événements abandonnés (tampon plein)
+        self.__reported_dropped = 0  # événements abandonnés déjà signalés dans le fichier
+        self.__written = 0
+
+        session = dict(session, events=EVENTS, foods=FOODS)
+        self.__file = open(path, 'wb')
+        if binary:
+            description = json.dumps(session).encode()
+            self.__file.write(_HEADER.pack(_MAGIC, _VERSION, len(description)) + description)
+        else:
+            self.__file.write(json.dumps(dict(event='telemetry', version=_VERSION, **session)).encode() + b'\n')
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def write(self, event: tuple) -> bool:
+        """
+        Place un événement dans le tampon, sans attendre.
+        :param event: (temps de session, type d'événement, sujet, détail, valeur)
+        :return: True si l'événement a été placé, False s'il a été abandonné parce que le tampon est plein
+        """
+        try:
+            self.__buffer.put_nowait(event)
+            return True
+        except queue.Full:
+            self.__dropped += 1
+            return False
+
+    def close(self) -> None:
+        """
+        Écrit les événements en attente, puis ferme le fichier.
+        :return: aucun
+        """
+        if self.__thread.is_alive():
+            self.__buffer.put(None)  # fin des événements (attend, au besoin, que le tampon se libère)
+            self.__thread.join()
+
+    def __run(self) -> None:
+        """ Méthode principale de la tâche d'écriture. """
+        last_time = 0.0
+        while True:
+            batch = [self.__buffer.get()]
+            while len(batch) < 1024:
+                try:
+                    batch.append(self.__buffer.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = batch[-1] is None
+            if closing:
+                batch.pop()
+
+            if batch:
+                last_time = batch[-1][0]
+            if self.__dropped > self.__reported_dropped:
+                dropped = self.__dropped
+                batch.append((last_time, _EVENT_CODES['events_dropped'], dropped - self.__reported_dropped, 0, 0.0))
+                self.__reported_dropped = dropped
+
+            self.__file.write(b''.join(self.__encode(event) for event in batch))
+            self.__file.flush()
+            self.__written += len(batch)
+
+            if closing:
+                self.__file.close()
+                return
+
+    def __encode(self, event: tuple) -> bytes:
+        """ Encode un événement dans le format du fichier. """
+        if self.__binary:
+            return _RECORD.pack(*event)
+
+        return (json.dumps(_to_dict(event)) + '\n').encode()
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    @property
+    def written(self) -> int:
+        return self.__written
+
+
+class Telemetry:
+    """
+    Télémétrie d'une session de jeu. S'attache à chaque partie de la session (voir le paramètre telemetry de Game)
+    qui lui transmet son démarrage, ses trames, ses livraisons et ses commandes expirées. Les changements d'état des
+    appareils, des chefs cuisiniers et du tableau des commandes lui parviennent par le bus d'événements (voir events).
+    """
+
+    # événement de télémétrie produit par chaque événement d'appareil
+    __STATION_EVENTS = {
+        events.EventType.STATION_STARTED: 'station_started',
+        events.EventType.STATION_READY: 'station_finished',
+        events.EventType.FOOD_BURNT: 'station_burnt',
+    }
+
+    def __init__(self, path: str, binary: bool = False, capacity: int = TelemetryWriter.CAPACITY) -> None:
+        """
+        Initialise la télémétrie. Le fichier est ouvert au démarrage de la première partie.
+        :param path: fichier à écrire
+        :param binary: True pour le format binaire, False pour le format JSONL
+        :param capacity: nombre maximal d'événements en attente d'écriture
+        """
+        self.__path = path
+        self.__binary = binary
+        self.__capacity = capacity
+        self.__writer = None
+
+        self.__time = 0.0  # temps de session (en secondes), cumulé sur toutes les parties
+        self.__game_count = 0
+
+        self.__station_indexes = {}  # appareil -> indice dans la partie suivie
+        self.__chef_indexes = {}  # chef cuisinier -> indice dans la partie suivie
+        self.__known_orders = set()  # commandes vues sur le tableau
+        self.__displayed_orders = set()  # commandes arrivées à leur place sur le tableau
+
+    def start(self, game) -> None:
+        """
+        Commence le suivi d'une partie.
+        :param game: partie suivie
+        :return: aucun
+        """
+        if not self.__writer:
+            session = dict(layout=game.layout, chefs=len(game.chefs),
+                           stations=[type(station).__name__ for station in game.stations])
+            self.__writer = TelemetryWriter(self.__path, self.__binary, session, self.__capacity)
+            for event_type in Telemetry.__STATION_EVENTS:
+                events.bus.subscribe(event_type, self.__on_station)
+            events.bus.subscribe(events.EventType.FOOD_PICKED, self.__on_food)
+            events.bus.subscribe(events.EventType.FOOD_DROPPED, self.__on_food)
+            events.bus.subscribe(events.EventType.ORDER_SPAWNED, self.__on_order_spawned)
+            events.bus.subscribe(events.EventType.ORDER_DISPLAYED, self.__on_order_displayed)
+
+        self.__game_count += 1
+        self.__emit('session_started', self.__game_count)
+
+        self.__station_indexes = {station: index for index, station in enumerate(game.stations)}
+        self.__chef_indexes = {chef: index for index, chef in enumerate(game.chefs)}
+        self.__known_orders.clear()
+        self.__displayed_orders.clear()
+
+    def frame(self, game, elapsed: float) -> None:
+        """
+        Fait avancer le temps de session (les événements sont produits par les abonnements, voir start).
+        :param game: partie suivie
+        :param elapsed: temps écoulé (en secondes) depuis la trame précédente
+        :return: aucun
+        """
+        self.__time += elapsed
+
+    def __on_station(self, event: events.Event) -> None:
+        """ Préparation commencée, prête ou en surcuisson sur un appareil. """
+        if (index := self.__station_indexes.get(event.station)) is not None:
+            self.__emit(Telemetry.__STATION_EVENTS[event.type], index)
+
+    def __on_food(self, event: events.Event) -> None:
+        """ Nourriture ramassée ou déposée par un chef cuisinier. """
+        if (index := self.__chef_indexes.get(event.chef)) is not None:
+            name = 'chef_picked' if event.type == events.EventType.FOOD_PICKED else 'chef_dropped'
+            self.__emit(name, index, food_code(event.food))
+
+    def __on_order_spawned(self, event: events.Event) -> None:
+        """ Commande créée par le générateur de commandes. """
+        order = event.order
+        if order.order_id not in self.__known_orders:
+            self.__known_orders.add(order.order_id)
+            items = ((ITEM_BURGER if order.burger else 0) + (ITEM_BEVERAGE if order.beverage else 0)
+                     + (ITEM_FRIES if order.fries else 0))
+            self.__emit('order_spawned', order.order_id, items, order.expiration_time)
+
+    def __on_order_displayed(self, event: events.Event) -> None:
+        """ Commande arrivée à sa place sur le tableau. """
+        if event.order.order_id not in self.__displayed_orders:
+            self.__displayed_orders.add(event.order.order_id)
+            self.__emit('order_displayed', event.order.order_id)
+
+    def order_delivered(self, order, tip: float, chef_index: int) -> None:
+        """
+        Signale une commande livrée.
+        :param order: commande livrée
+        :param tip: pourboire reçu (voir Order.calculate_tip)
+        :param chef_index: indice du chef cuisinier qui a livré la commande
+        :return: aucun
+        """
+        self.__emit('order_delivered', order.order_id, chef_index, tip)
+        self.__forget(order)
+
+    def order_expired(self, order) -> None:
+        """
+        Signale une commande expirée.
+        :param order: commande expirée
+        :return: aucun
+        """
+        self.__emit('order_expired', order.order_id)
+        self.__forget(order)
+
+    def close(self) -> None:
+        """
+        Écrit les événements en attente et ferme le fichier.
+        :return: aucun
+        """
+        if self.__writer:
+            self.__writer.close()
+
+    def __emit(self, name: str, subject: int, detail: int = 0, value: float = 0.0) -> None:
+        """ Produit un événement au temps de session courant. """
+        self.__writer.write((self.__time, _EVENT_CODES[name], subject, detail, value))
+
+    def __forget(self, order) -> None:
+        """ Oublie une commande retirée du tableau. """
+        self.__known_orders.discard(order.order_id)
+        self.__displayed_orders.discard(order.order_id)
+
+    @property
+    def dropped(self) -> int:
+        """ Nombre d'événements abandonnés parce que le tampon était plein. """
+        return self.__writer.dropped if self.__writer else 0
+
+
+def food_code(food) -> int:
+    """ Code de la nourriture transportée (indice dans FOODS). """
+    if isinstance(food, Ingredient):
+        return _FOOD_CODES[food.ingredient_type().name]
+    return _FOOD_CODES[type(food).__name__]
+
+
+def _to_dict(event: tuple) -> dict:
+    """ Convertit un événement (temps, type, sujet, détail, valeur) en objet aux champs nommés. """
+    session_time, code, subject, detail, value = event
+    name = _EVENT_NAMES[code]
+    subject_name, detail_name, value_name = EVENTS[name]
+
+    fields = {'t': round(session_time, 4), 'event': name, subject_name: subject}
+    if detail_name:
+        fields[detail_name] = FOODS[detail] if detail_name == 'food' else detail
+    if value_name:
+        fields[value_name] = round(value, 4)
+    return fields
+
+
+def read(path: str):
+    """
+    Lit un fichier de télémétrie, dans l'un ou l'autre des formats.
+    :param path: fichier à lire
+    :return: générateur de la description de la session, puis de chaque événement (objets aux champs nommés)
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    if not data.startswith(_MAGIC):
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise TelemetryError(f"{path} : ligne JSON invalide ({error})") from error
+        return
+
+    magic, version, description_length = _HEADER.unpack_from(data)
+    if version != _VERSION:
+        raise TelemetryError(f"{path} : version {version} non supportée (version {_VERSION} attendue)")
+    offset = _HEADER.size
+    yield dict(event='telemetry', version=version, **json.loads(data[offset:offset + description_length]))
+
+    offset += description_length
+    if (len(data) - offset) % _RECORD.size:
+        raise TelemetryError(f"{path} : fichier tronqué")
+    for event in _RECORD.iter_unpack(data[offset:]):
+        yield _to_dict(event)
+
+
+def __telemetry() -> None:
+    """ Point d'entrée de la ligne de commande : affiche un fichier de télémétrie en JSONL. """
+    parser = argparse.ArgumentParser(description='Lecture d\'un fichier de télémétrie')
+    parser.add_argument('path', help='fichier de télémétrie (voir undercooked.py --telemetry)')
+    arguments = parser.parse_args()
+
+    try:
+        for event in read(arguments.path):
+            print(json.dumps(event))
+    except TelemetryError as error:
+        sys.exit(str(error))
+
+
+if __name__ == '__main__':
+    __telemetry()
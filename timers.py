@@ -0,0 +1,442 @@
+"""
+Minuteries du jeu.
+
+Les traitements qui s'étalent dans le temps (commandes, générateur de commandes, cuisson, friture, découpe et
+remplissage) sont écrits sous forme de routines : des générateurs qui produisent le délai (en secondes) à attendre
+avant d'être repris. À la reprise, l'expression yield vaut le délai réellement écoulé.
+
+Une routine en attente peut être interrompue puis reprise plus tard (instantanés de partie, voir Game.snapshot) :
+la minuterie indique où en est l'attente (Timer.progress) et une nouvelle routine, reconstruite dans le même état,
+peut être démarrée en reprenant cette attente là où elle était (paramètre resume de start).
+
+Toutes les minuteries peuvent être suspendues d'un coup (pause) : le temps ne s'écoule plus pour les routines
+jusqu'à la reprise (resume), et le délai écoulé qu'elles reçoivent n'inclut pas la pause.
+
+Le moteur connaît la prochaine échéance de toutes ses routines (time_until_next) : rien de ce qu'elles font (décompte
+des commandes, cuisson, nouvelles commandes) ne peut arriver avant.
+
+Le moteur de minuteries décide comment attendre :
+ - ThreadedTimers : une tâche (thread) par routine, comme le jeu l'a toujours fait;
+ - AsyncioTimers : une coroutine par routine, toutes sur la boucle d'événements asyncio du jeu;
+ - SimulatedTimers : temps simulé qui n'avance que sur demande (parties sans affichage, simulations en lot).
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+from typing import Generator
+
+
+Routine = Generator[float, float, None]
+
+
+class Timer:
+    """
+    Minuterie associée à une routine en cours d'exécution.
+    """
+
+    def cancel(self) -> None:
+        """ Annule la routine : elle ne sera plus jamais reprise. """
+        pass
+
+    def progress(self) -> tuple or None:
+        """
+        Indique où en est l'attente de la routine.
+        :return: (temps déjà attendu, temps qui reste à attendre) en secondes, None si la routine est terminée
+        """
+        return None
+
+
+class _ThreadTimer(Timer):
+    """
+    Routine exécutée dans sa propre tâche.
+    """
+
+    def __init__(self, routine: Routine, resume: tuple or None, scheduler: 'ThreadedTimers') -> None:
+        self.__routine = routine
+        self.__resume = resume
+        self.__scheduler = scheduler
+        self.__event = threading.Event()  # événement servant à annuler la routine (va aussi la réveiller)
+        self.__wait = None  # (début de l'attente en cours, délai)
+
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.start()
+
+    def cancel(self) -> None:
+        self.__event.set()
+        self.__scheduler.wake()
+
+    def progress(self) -> tuple or None:
+        if not (wait := self.__wait):
+            return None
+        waited = self.__scheduler.now() - wait[0]
+        return waited, max(0.0, wait[1] - waited)
+
+    def __run(self) -> None:
+        """ Méthode principale exécutée par la tâche de la routine. """
+        try:
+            delay = total = next(self.__routine)
+            start_time = self.__scheduler.now()
+            if self.__resume:
+                waited, delay = self.__resume
+                start_time -= waited
+                total = waited + delay
+            while True:
+                self.__wait = start_time, total
+                if self.__scheduler.wait_until(start_time + total, self.__event):
+                    return
+                delay = total = self.__routine.send(self.__scheduler.now() - start_time)
+                start_time = self.__scheduler.now()
+        except StopIteration:
+            pass
+        finally:
+            self.__wait = None
+
+
+class _AsyncioTimer(Timer):
+    """
+    Routine exécutée comme coroutine sur une boucle d'événements asyncio.
+    """
+
+    def __init__(self, scheduler: 'AsyncioTimers', routine: Routine, resume: tuple or None) -> None:
+        self.__scheduler = scheduler
+        self.__wait = None  # (début de l'attente en cours, délai)
+        self.__task = scheduler.loop.create_task(self.__run(routine, resume))
+
+    def cancel(self) -> None:
+        self.__task.cancel()
+
+    def progress(self) -> tuple or None:
+        if not (wait := self.__wait) or self.__task.done():
+            return None
+        waited = self.__scheduler.now() - wait[0]
+        return waited, max(0.0, wait[1] - waited)
+
+    async def __run(self, routine: Routine, resume: tuple or None) -> None:
+        """ Coroutine qui fait avancer la routine. """
+        try:
+            delay = total = next(routine)
+            start_time = self.__scheduler.now()
+            if resume:
+                waited, delay = resume
+                start_time -= waited
+                total = waited + delay
+            while True:
+                self.__wait = start_time, total
+                await self.__scheduler.sleep_until(start_time + total)
+                delay = total = routine.send(self.__scheduler.now() - start_time)
+                start_time = self.__scheduler.now()
+        except StopIteration:
+            pass
+        finally:
+            self.__wait = None
+
+
+class _SimulatedTimer(Timer):
+    """
+    Routine exécutée en temps simulé.
+    """
+
+    def __init__(self, routine: Routine, simulated_timers: 'SimulatedTimers') -> None:
+        self.routine = routine
+        self.cancelled = False
+        self.wait = None  # (début de l'attente en cours, échéance), None si la routine est terminée
+        self.__simulated_timers = simulated_timers
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def progress(self) -> tuple or None:
+        if self.cancelled or not self.wait:
+            return None
+        now = self.__simulated_timers.now
+        return now - self.wait[0], self.wait[1] - now
+
+
+class ThreadedTimers:
+    """
+    Moteur de minuteries par défaut : chaque routine a sa propre tâche.
+    """
+
+    def __init__(self) -> None:
+        self.__condition = threading.Condition()  # réveille les tâches en pause (reprise ou annulation)
+        self.__paused_at = None  # moment où la pause a commencé, None si les minuteries ne sont pas en pause
+        self.__paused_time = 0.0  # durée cumulée des pauses terminées
+        self.__deadlines = {}  # événement d'annulation de chaque routine en attente -> échéance
+
+    def start(self, routine: Routine, resume: tuple = None) -> Timer:
+        """
+        Démarre une routine.
+        :param routine: générateur produisant les délais à attendre
+        :param resume: attente à reprendre au lieu du premier délai de la routine (voir Timer.progress)
+        :return: la minuterie associée à la routine
+        """
+        return _ThreadTimer(routine, resume, self)
+
+    def time_until_next(self) -> float or None:
+        """
+        Délai avant la prochaine échéance d'une routine.
+        :return: délai (en secondes, 0.0 si une échéance est déjà passée), None s'il n'y en a aucune ou si les
+                 minuteries sont en pause
+        """
+        with self.__condition:
+            if self.__paused_at is not None or not self.__deadlines:
+                return None
+            return max(0.0, min(self.__deadlines.values()) - self.now())
+
+    def pause(self) -> None:
+        """ Suspend toutes les minuteries : le temps ne s'écoule plus pour les routines. """
+        with self.__condition:
+            if self.__paused_at is None:
+                self.__paused_at = time.monotonic()
+
+    def resume(self) -> None:
+        """ Relance les minuteries suspendues là où elles en étaient. """
+        with self.__condition:
+            if self.__paused_at is not None:
+                self.__paused_time += time.monotonic() - self.__paused_at
+                self.__paused_at = None
+                self.__condition.notify_all()
+
+    def now(self) -> float:
+        """
+        Temps des minuteries : temps monotone dont on retire la durée des pauses.
+        :return: temps (en secondes)
+        """
+        paused_at = self.__paused_at
+        return (time.monotonic() if paused_at is None else paused_at) - self.__paused_time
+
+    def wait_until(self, deadline: float, cancelled: threading.Event) -> bool:
+        """
+        Attend (dans la tâche d'une routine) que le temps des minuteries atteigne une échéance. Une tâche dont
+        l'attente se termine pendant une pause dort jusqu'à la reprise, sans consommer de processeur.
+        :param deadline: échéance (voir now)
+        :param cancelled: événement d'annulation de la routine
+        :return: True si la routine a été annulée, False si l'échéance est atteinte
+        """
+        with self.__condition:
+            self.__deadlines[cancelled] = deadline
+        try:
+            while True:
+                with self.__condition:
+                    while self.__paused_at is not None and not cancelled.is_set():
+                        self.__condition.wait()
+                    remaining = deadline - self.now()
+                if cancelled.is_set():
+                    return True
+                if remaining <= 0:
+                    return False
+                if cancelled.wait(remaining):
+                    return True
+        finally:
+            with self.__condition:
+                del self.__deadlines[cancelled]
+
+    def wake(self) -> None:
+        """ Réveille les tâches en pause pour qu'elles vérifient si leur routine a été annulée. """
+        with self.__condition:
+            self.__condition.notify_all()
+
+
+class AsyncioTimers:
+    """
+    Moteur de minuteries asyncio : chaque routine devient une coroutine de la boucle d'événements.
+    Doit être utilisé à partir de la tâche qui exécute la boucle.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Initialise le moteur de minuteries.
+        :param loop: boucle d'événements sur laquelle exécuter les routines
+        """
+        self.loop = loop
+        self.__resumed = asyncio.Event()  # levé lorsque les minuteries ne sont pas en pause
+        self.__resumed.set()
+        self.__paused_at = None
+        self.__paused_time = 0.0
+        self.__deadlines = {}  # coroutine de chaque routine en attente -> échéance
+
+    def start(self, routine: Routine, resume: tuple = None) -> Timer:
+        """
+        Démarre une routine.
+        :param routine: générateur produisant les délais à attendre
+        :param resume: attente à reprendre au lieu du premier délai de la routine (voir Timer.progress)
+        :return: la minuterie associée à la routine
+        """
+        return _AsyncioTimer(self, routine, resume)
+
+    def time_until_next(self) -> float or None:
+        """
+        Délai avant la prochaine échéance d'une routine.
+        :return: délai (en secondes, 0.0 si une échéance est déjà passée), None s'il n'y en a aucune ou si les
+                 minuteries sont en pause
+        """
+        if self.__paused_at is not None or not self.__deadlines:
+            return None
+        return max(0.0, min(self.__deadlines.values()) - self.now())
+
+    def pause(self) -> None:
+        """ Suspend toutes les minuteries : le temps ne s'écoule plus pour les routines. """
+        if self.__paused_at is None:
+            self.__paused_at = self.loop.time()
+            self.__resumed.clear()
+
+    def resume(self) -> None:
+        """ Relance les minuteries suspendues là où elles en étaient. """
+        if self.__paused_at is not None:
+            self.__paused_time += self.loop.time() - self.__paused_at
+            self.__paused_at = None
+            self.__resumed.set()
+
+    def now(self) -> float:
+        """
+        Temps des minuteries : temps de la boucle dont on retire la durée des pauses.
+        :return: temps (en secondes)
+        """
+        return (self.loop.time() if self.__paused_at is None else self.__paused_at) - self.__paused_time
+
+    async def sleep_until(self, deadline: float) -> None:
+        """
+        Attend (dans la coroutine d'une routine) que le temps des minuteries atteigne une échéance.
+        :param deadline: échéance (voir now)
+        :return: aucun
+        """
+        task = asyncio.current_task()
+        self.__deadlines[task] = deadline
+        try:
+            while True:
+                await self.__resumed.wait()
+                remaining = deadline - self.now()
+                if remaining <= 0:
+                    return
+                await asyncio.sleep(remaining)
+        finally:
+            del self.__deadlines[task]
+
+
+class SimulatedTimers:
+    """
+    Moteur de minuteries à temps simulé : les routines ne sont reprises que lorsqu'on fait avancer le temps.
+    Tout s'exécute dans la tâche appelante, dans l'ordre des échéances; une partie peut donc être rejouée
+    exactement et bien plus vite que le temps réel.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        """
+        Initialise le moteur de minuteries.
+        :param start: temps simulé (en secondes) de départ
+        """
+        self.__now = start
+        self.__deadlines = []  # tas de (échéance, séquence, minuterie, moment de la mise en attente)
+        self.__sequence = itertools.count()  # départage les échéances égales dans l'ordre d'arrivée
+
+    def start(self, routine: Routine, resume: tuple = None) -> Timer:
+        """
+        Démarre une routine.
+        :param routine: générateur produisant les délais à attendre
+        :param resume: attente à reprendre au lieu du premier délai de la routine (voir Timer.progress)
+        :return: la minuterie associée à la routine
+        """
+        timer = _SimulatedTimer(routine, self)
+        try:
+            delay = next(routine)
+            if resume:
+                waited, delay = resume
+                self.__schedule(timer, delay, self.__now - waited)
+            else:
+                self.__schedule(timer, delay)
+        except StopIteration:
+            pass
+        return timer
+
+    def advance(self, duration: float) -> None:
+        """
+        Fait avancer le temps simulé et reprend, dans l'ordre, toutes les routines arrivées à échéance.
+        :param duration: durée (en secondes) dont faire avancer le temps
+        :return: aucun
+        """
+        end_time = self.__now + duration
+
+        while self.__deadlines and self.__deadlines[0][0] <= end_time:
+            deadline, _, timer, wait_start = heapq.heappop(self.__deadlines)
+            if timer.cancelled:
+                continue
+
+            self.__now = deadline
+            try:
+                self.__schedule(timer, timer.routine.send(deadline - wait_start))
+            except StopIteration:
+                timer.wait = None
+
+        self.__now = end_time
+
+    def __schedule(self, timer: _SimulatedTimer, delay: float, wait_start: float = None) -> None:
+        """ Met une minuterie en attente pour le délai spécifié (à partir de maintenant). """
+        wait_start = self.__now if wait_start is None else wait_start
+        timer.wait = wait_start, self.__now + delay
+        heapq.heappush(self.__deadlines, (self.__now + delay, next(self.__sequence), timer, wait_start))
+
+    def time_until_next(self) -> float or None:
+        """
+        Délai (en temps simulé) avant la prochaine échéance d'une routine.
+        :return: délai (en secondes), None s'il n'y en a aucune
+        """
+        deadline = min((deadline for deadline, _, timer, _ in self.__deadlines if not timer.cancelled), default=None)
+        return None if deadline is None else max(0.0, deadline - self.__now)
+
+    def pause(self) -> None:
+        """ Sans effet : le temps simulé ne s'écoule déjà que sur demande (voir advance). """
+        pass
+
+    def resume(self) -> None:
+        """ Sans effet (voir pause). """
+        pass
+
+    @property
+    def now(self) -> float:
+        return self.__now
+
+
+# moteur de minuteries utilisé par tout le jeu (Global Object Pattern de python)
+scheduler = ThreadedTimers()
+
+
+def use(new_scheduler) -> object:
+    """
+    Change le moteur de minuteries. Les routines déjà démarrées restent sur l'ancien moteur.
+    :param new_scheduler: moteur de minuteries à utiliser
+    :return: le moteur de minuteries précédent
+    """
+    global scheduler
+    previous, scheduler = scheduler, new_scheduler
+    return previous
+
+
+def start(routine: Routine, resume: tuple = None) -> Timer:
+    """
+    Démarre une routine sur le moteur de minuteries courant.
+    :param routine: générateur produisant les délais à attendre
+    :param resume: attente à reprendre au lieu du premier délai de la routine (voir Timer.progress)
+    :return: la minuterie associée à la routine
+    """
+    return scheduler.start(routine, resume)
+
+
+def pause() -> None:
+    """ Suspend toutes les minuteries du moteur courant. """
+    scheduler.pause()
+
+
+def resume() -> None:
+    """ Relance les minuteries suspendues du moteur courant. """
+    scheduler.resume()
+
+
+def time_until_next() -> float or None:
+    """
+    Délai avant la prochaine échéance d'une routine du moteur courant.
+    :return: délai (en secondes), None s'il n'y en a aucune (ou si les minuteries sont en pause)
+    """
+    return scheduler.time_until_next()
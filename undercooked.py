@@ -8,50 +8,147 @@ Il permet aussi l'ajout de fonctionnalités diverses.
 Le sujet est inspiré des jeux multijoueurs coopératifs OVERCOOKED! (2016) et OVERCOOKED!2 (2018)
 développés par Ghost Town Games et publiés par Team17.
 """
+import argparse
+import asyncio
 import os
+import time
+
+__IMPORT_START = time.perf_counter()  # début des importations (mesuré pour le rapport de démarrage)
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'  # cache le message affiché à l'initialisation de Pygame
 import pygame
 
+import arrivals
+import assets
+import metrics
+import scenes
 import settings
+from control import ControlServer
 from game import Game
-
-
-import os
-import pygame
-import settings
-from game import Game
-
-def __undercooked() -> None:
-    """ La source de tous les maux. """
-
-    pygame.init()
-
-    display_info = pygame.display.Info()
-    screen_width, screen_height = display_info.current_w, display_info.current_h
-
-    screen = pygame.display.set_mode((screen_width, screen_height), pygame.NOFRAME)
+from replay import Recorder
+from shared_state import SharedStateWriter
+from telemetry import Telemetry
+
+
+def __undercooked(engine: str, layout: str, record: str or None, checkpoint: str or None,
+                  resume: str or None, telemetry: Telemetry or None, control: ControlServer or None,
+                  shared_state: SharedStateWriter or None, arrival_model: arrivals.ArrivalModel,
+                  deadline_model: arrivals.DeadlineModel, startup_report: bool) -> None:
+    """
+    La source de tous les maux.
+    :param engine: moteur de la boucle de jeu ('threads' ou 'asyncio')
+    :param layout: fichier de disposition de la cuisine
+    :param record: fichier où enregistrer la partie (None pour ne pas l'enregistrer)
+    :param checkpoint: fichier où écrire un point de reprise chaque seconde (None pour ne pas en écrire)
+    :param resume: point de reprise à partir duquel reprendre la première partie (None pour une nouvelle partie)
+    :param telemetry: télémétrie de la session (None pour ne pas en produire)
+    :param control: interface de contrôle locale (None pour ne pas en avoir)
+    :param shared_state: publication de l'état en mémoire partagée (None pour ne pas le publier)
+    :param arrival_model: modèle d'arrivée des commandes
+    :param deadline_model: modèle de délais de livraison des commandes
+    :param startup_report: True pour afficher le temps pris par chaque phase du démarrage
+    """
+    import_time = time.perf_counter() - __IMPORT_START
+
+    resume_data = None
+    if resume:
+        with open(resume, 'rb') as file:
+            resume_data = file.read()
+
+    # seuls l'affichage et les polices servent au jeu (pas de son ni de manette)
+    init_start = time.perf_counter()
+    pygame.display.init()
+    pygame.font.init()
+
+    # le jeu est dessiné à sa résolution logique, puis mis à l'échelle de l'écran une seule fois par trame (par la
+    # carte graphique si possible) : le coût du dessin ne dépend pas de la taille de l'écran, et les coordonnées
+    # des événements de la souris sont ramenées à la résolution logique
+    screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT),
+                                     pygame.SCALED | pygame.FULLSCREEN)
     pygame.display.set_caption('Undercooked')
     pygame.mouse.set_visible(False)
+    init_time = time.perf_counter() - init_start
+
+    def prepare() -> Game:
+        """ Construit la partie pendant que l'écran titre est affiché (voir scenes.TitleScene). """
+        construction_start = time.perf_counter()
+        game = Game(screen, layout=layout, recorder=Recorder(record) if record else None, checkpoint=checkpoint,
+                    resume=resume_data, telemetry=telemetry, control=control, shared_state=shared_state,
+                    arrivals=arrival_model, deadlines=deadline_model)
+        construction_time = time.perf_counter() - construction_start
+        assets_time = assets.wait()
+
+        if startup_report:
+            print(f"Démarrage : importations {import_time * 1000:.0f} ms, initialisation {init_time * 1000:.0f} ms, "
+                  f"images {assets_time * 1000:.0f} ms, construction de la partie {construction_time * 1000:.0f} ms "
+                  f"(pendant l'écran titre de {settings.IMAGES_TRANSITION_TIME_MS} ms)")
+        return game
+
+    title = scenes.TitleScene(screen, prepare)
+    if engine == 'asyncio':
+        asyncio.run(scenes.run_async(title))
+    else:
+        scenes.run(title)
+
+    pygame.quit()
 
-    while True:
-        title_screen = pygame.image.load('img/undercooked1.png')
-        title_settings = pygame.transform.scale(title_screen, (screen_width, screen_height))
-        screen.blit(title_settings, (0, 0))
-        pygame.display.flip()
 
-        pygame.time.wait(settings.IMAGES_TRANSITION_TIME_MS)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Undercooked')
+    parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads',
+                        help='moteur de la boucle de jeu (par défaut : une tâche par minuterie)')
+    parser.add_argument('--layout', default=settings.KITCHEN_LAYOUT, help='fichier de disposition de la cuisine')
+    parser.add_argument('--arrivals', default='uniform',
+                        help="modèle d'arrivée des commandes (ex.: poisson:rate=2,cap=3, voir arrivals.py)")
+    parser.add_argument('--deadlines', default='uniform',
+                        help='modèle de délais de livraison des commandes (ex.: fixed:time=120, voir arrivals.py)')
+    parser.add_argument('--record', help='enregistre la partie dans ce fichier (voir replay.py)')
+    parser.add_argument('--checkpoint', help='écrit un point de reprise de la partie dans ce fichier chaque seconde')
+    parser.add_argument('--resume', help='reprend la partie à partir de ce point de reprise (voir --checkpoint)')
+    parser.add_argument('--telemetry', help='écrit les événements de la session dans ce fichier (voir telemetry.py)')
+    parser.add_argument('--telemetry-format', choices=['jsonl', 'binary'], default='jsonl',
+                        help='format du fichier de télémétrie')
+    parser.add_argument('--metrics-port', type=int,
+                        help='expose les métriques (format Prometheus) sur http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--metrics-file', help='réécrit les métriques (format Prometheus) dans ce fichier')
+    parser.add_argument('--control-port', type=int,
+                        help='accepte les commandes de contrôle (voir control.py) sur http://127.0.0.1:PORT/commands')
+    parser.add_argument('--shared-state', metavar='NAME',
+                        help="publie l'état de la partie dans ce segment de mémoire partagée (voir shared_state.py)")
+    parser.add_argument('--startup-report', action='store_true',
+                        help='affiche le temps pris par chaque phase du démarrage')
+    arguments = parser.parse_args()
+    try:
+        order_arrivals = arrivals.parse_arrivals(arguments.arrivals)
+        order_deadlines = arrivals.parse_deadlines(arguments.deadlines)
+    except arrivals.ModelError as error:
+        parser.error(str(error))
 
-        game = Game(screen)
-        game.run()
+    if arguments.metrics_port is not None:
+        metrics.serve(arguments.metrics_port)
+    stop_metrics_file = metrics.write_periodically(arguments.metrics_file) if arguments.metrics_file else None
 
-        if game.user_requested_quit():
-            break
+    control_server = ControlServer(arguments.control_port) if arguments.control_port is not None else None
+    shared_state_writer = SharedStateWriter(arguments.shared_state) if arguments.shared_state else None
 
-    pygame.quit()
+    session_telemetry = None
+    if arguments.telemetry:
+        session_telemetry = Telemetry(arguments.telemetry, binary=arguments.telemetry_format == 'binary')
 
-if __name__ == '__main__':
     try:
-        __undercooked()
+        __undercooked(arguments.engine, arguments.layout, arguments.record, arguments.checkpoint, arguments.resume,
+                      session_telemetry, control_server, shared_state_writer, order_arrivals, order_deadlines,
+                      arguments.startup_report)
     except KeyboardInterrupt:
         pass
+    finally:
+        if stop_metrics_file:
+            stop_metrics_file.set()
+        if control_server:
+            control_server.close()
+        if shared_state_writer:
+            shared_state_writer.close()
+        if session_telemetry:
+            session_telemetry.close()
+            if session_telemetry.dropped:
+                print(f"Télémétrie : {session_telemetry.dropped} événement(s) abandonné(s) (tampon plein)")